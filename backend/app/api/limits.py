@@ -0,0 +1,202 @@
+import asyncio
+import json
+import os
+import re
+import tempfile
+from typing import Dict, Optional, Tuple, Pattern
+from fastapi import HTTPException, UploadFile
+
+# Uploads are copied to disk in chunks of this size, never read whole
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def _megabytes(name: str, default: float) -> int:
+    return int(float(os.getenv(name, default)) * 1024 * 1024)
+
+
+# Per-endpoint upload limits in bytes, configurable in MB through the environment
+UPLOAD_LIMITS: Dict[str, int] = {
+    "upload_pnml": _megabytes("UPLOAD_LIMIT_PNML_MB", 50),
+    "preview_event_log": _megabytes("UPLOAD_LIMIT_PREVIEW_MB", 500),
+    "import_event_log": _megabytes("UPLOAD_LIMIT_IMPORT_MB", 500),
+    "append_event_log": _megabytes("UPLOAD_LIMIT_APPEND_MB", 100),
+}
+
+UPLOAD_ROUTES: Tuple[Tuple[Pattern, str], ...] = (
+    (re.compile(r"^/api/upload-pnml$"), "upload_pnml"),
+    (re.compile(r"^/api/preview-event-log$"), "preview_event_log"),
+    (re.compile(r"^/api/import-event-log$"), "import_event_log"),
+    (re.compile(r"^/api/discover-dfg$"), "import_event_log"),
+    (re.compile(r"^/api/discover-windows$"), "import_event_log"),
+    (re.compile(r"^/api/event-log/[^/]+/append$"), "append_event_log"),
+)
+
+
+def _too_large(limit: int) -> str:
+    return f"Upload exceeds the limit of {limit} bytes"
+
+
+class UploadSizeLimitMiddleware:
+    """Reject request bodies larger than the limit of their upload endpoint
+
+    Requests announcing a larger Content-Length are answered with 413 before
+    any of the body is read. Bodies without (or with a wrong) Content-Length
+    are counted while streaming; once over the limit the rest of the body is
+    dropped and the endpoint's response is replaced with the 413.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request" and not exceeded:
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def limited_send(message):
+            nonlocal response_started
+            if not exceeded:
+                await send(message)
+            elif message["type"] == "http.response.start" and not response_started:
+                response_started = True
+                await self._reject(send, limit)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send, limit)
+
+    def _limit_for(self, scope) -> Optional[int]:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        for pattern, endpoint in UPLOAD_ROUTES:
+            if pattern.match(scope["path"]):
+                return UPLOAD_LIMITS[endpoint]
+        return None
+
+    async def _reject(self, send, limit: int) -> None:
+        body = json.dumps({"detail": _too_large(limit)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def spool_upload(file: UploadFile, suffix: str, endpoint: str) -> str:
+    """Copy an upload to a named temporary file chunk by chunk
+
+    Returns the path of the file; the caller is responsible for removing it.
+    The size limit is enforced by UploadSizeLimitMiddleware while the body is
+    received, since Starlette has parsed the whole multipart body before the
+    endpoint runs; the check here is only a backstop for routes served
+    without the middleware.
+    """
+    limit = UPLOAD_LIMITS[endpoint]
+    size = 0
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix=suffix) as temp_file:
+        try:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > limit:
+                    raise HTTPException(status_code=413, detail=_too_large(limit))
+                temp_file.write(chunk)
+        except BaseException:
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+    if size == 0:
+        os.unlink(temp_file.name)
+        raise HTTPException(status_code=400, detail="File is empty")
+    return temp_file.name
+
+
+class ConcurrencyLimiter:
+    """Bounded concurrency with a bounded wait queue for CPU-heavy endpoints
+
+    Up to max_concurrent requests run at once and up to max_queue more wait
+    for a slot. A request arriving with the queue full is rejected with 429;
+    one that waits longer than queue_timeout seconds is rejected with 503.
+    Both carry a Retry-After header.
+    """
+
+    def __init__(self, max_concurrent: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def _busy(self, status_code: int, detail: str) -> HTTPException:
+        return HTTPException(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after)})
+
+    async def __aenter__(self):
+        if self._semaphore.locked():
+            if self.waiting >= self.max_queue:
+                raise self._busy(429, "Too many requests in progress, retry later")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise self._busy(503, "Server busy, retry later")
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+        self.active += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.active -= 1
+        self._semaphore.release()
+        return False
+
+    def status(self) -> Dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue
+        }
+
+
+heavy_request_limiter = ConcurrencyLimiter(
+    max_concurrent=int(os.getenv("HEAVY_MAX_CONCURRENT", os.cpu_count() or 2)),
+    max_queue=int(os.getenv("HEAVY_MAX_QUEUE", 16)),
+    queue_timeout=float(os.getenv("HEAVY_QUEUE_TIMEOUT", 30)),
+    retry_after=int(os.getenv("HEAVY_RETRY_AFTER", 5))
+)
@@ -1,21 +1,76 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Form
-from fastapi.responses import JSONResponse, Response, FileResponse
-from typing import Dict, Any, Optional, List
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Form, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, Response, FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import Dict, Any, Optional, List, Tuple
 import uuid
-import tempfile
+import json
+import asyncio
+import re
 import os
+import math
 import pandas as pd
 import pm4py
-from ..services.pm4py_service import PM4PyService
+from ..services.pm4py_service import PM4PyService, DISCOVERY_ALGORITHMS
 from ..models.petri_net import UploadResponse, ErrorResponse, PetriNetData, NodeData, EdgeData
-from ..services.petri_net_service import PetriNetService
+from ..services.pnml_writer import PNMLWriter, SUPPORTED_FORMATS
+from ..services.xes_reader import XESReader
+from ..services.simulation_service import TokenGameSession
+from ..services.variant_service import VariantIndex, SORT_KEYS, SORT_ORDERS
+from ..services.performance_service import PerformanceService
+from ..services.incremental_service import IncrementalLogState
+from ..services.fingerprint_service import (
+    FingerprintIndex, canonical_form, find_exact_duplicate, node_correspondence, structural_network_id
+)
+from ..services.reduction_service import PetriNetReducer
+from ..services.cluster_service import ClusterHierarchy
+from ..services.log_filter_service import EventLogFilterChain
+from ..services.encoded_log import EncodedEventLog
+from ..services.dfg_service import DirectlyFollowsGraph
+from ..services.window_service import SlidingWindowDiscovery
+from ..services.search_service import NetSearchIndex, SEARCH_MODES, NEIGHBORHOOD_DIRECTIONS, MAX_REGEX_LENGTH
+from ..services.bulk_export_service import BulkExporter, BULK_EXPORT_FORMATS
+from .limits import spool_upload, heavy_request_limiter
 from pydantic import BaseModel
+from pydantic_core import to_json
 
 router = APIRouter(prefix="/api", tags=["petri-net"])
 
 # Global storage for Petri nets (in production, use a database)
 petri_nets: Dict[str, Dict[str, Any]] = {}
+# Imported event logs (encoded events, import settings and cached indexes)
+event_logs: Dict[str, Dict[str, Any]] = {}
+# Structural fingerprints of stored nets
+fingerprint_index = FingerprintIndex()
+# The analysis caches below are keyed by fingerprint and hold a (net, canonical
+# order, analysis) entry per distinct stored object; a structurally identical
+# net reuses an existing entry's analysis instead of computing its own
+# Reduced versions of stored nets with their element mappings
+reduced_nets: Dict[str, List[tuple]] = {}
+# Cluster hierarchies of stored nets, built on first request
+cluster_hierarchies: Dict[str, List[tuple]] = {}
+# Label search and adjacency indexes of stored nets, built on first request
+search_indexes: Dict[str, List[tuple]] = {}
 pm4py_service = PM4PyService()
+pnml_writer = PNMLWriter()
+xes_reader = XESReader()
+performance_service = PerformanceService()
+petri_net_reducer = PetriNetReducer()
+bulk_exporter = BulkExporter(int(os.getenv("BULK_EXPORT_WORKERS", 0)) or None)
+window_discovery = SlidingWindowDiscovery(int(os.getenv("DISCOVERY_WORKERS", 0)) or None)
+
+# Supported event log formats, longest suffix first
+EVENT_LOG_SUFFIXES = ('.xes.gz', '.xes', '.csv')
+# Number of traces read from an XES file to build a preview
+XES_PREVIEW_TRACES = 100
+# Error for logs without a single row holding a case ID, activity and timestamp
+NO_VALID_EVENTS = "The event log has no events with a case ID, activity and valid timestamp"
+
+# Token game: frames pushed per second, firing cap per frame when running
+# without a rate, and default step limit for run-to-completion
+SIMULATION_FRAME_INTERVAL = 1 / 30
+SIMULATION_MAX_STEPS_PER_FRAME = 1000
+SIMULATION_DEFAULT_MAX_STEPS = 100000
+SIMULATION_MAX_RUN_STEPS = 1000000
 
 class EventLogImportConfig(BaseModel):
     """Event Log import configuration"""
@@ -27,6 +82,21 @@ class EventLogImportConfig(BaseModel):
     noise_threshold: float = 0.0
     dependency_threshold: float = 0.5
     and_threshold: float = 0.65
+    filters: List[Dict[str, Any]] = []  # applied in order before discovery, see EventLogFilterChain
+
+class BulkExportFilter(BaseModel):
+    """Selection of stored nets by their properties; all given fields must match"""
+    source: Optional[str] = None  # metadata source, e.g. event_log_import
+    name_contains: Optional[str] = None
+    event_log_id: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+class BulkExportRequest(BaseModel):
+    """Bulk export of stored nets, by ID or by filter (all nets if neither is given)"""
+    petri_net_ids: Optional[List[str]] = None
+    filter: Optional[BulkExportFilter] = None
+    format: str = "pnml"  # pnml, apnml, csv (simulated event log)
+    config: Dict[str, Any] = {}
 
 class EventLogPreview(BaseModel):
     """Event Log preview data"""
@@ -36,6 +106,14 @@ class EventLogPreview(BaseModel):
     data_types: Dict[str, str]
     statistics: Dict[str, Any]
 
+def _json_response(content: Any) -> Response:
+    """Serialize a payload (models included) to JSON in one pass
+    
+    Returning a Response skips FastAPI's response validation and its
+    dict/jsonable_encoder round trip, which dominate for large nets.
+    """
+    return Response(content=to_json(content), media_type="application/json")
+
 @router.post("/upload-pnml", response_model=UploadResponse)
 async def upload_pnml(file: UploadFile = File(...)):
     """Upload and parse a PNML or APNML file"""
@@ -47,31 +125,33 @@ async def upload_pnml(file: UploadFile = File(...)):
                 detail="File must be a PNML file (.pnml extension) or APNML file (.apnml extension)"
             )
         
-        # Read file content
-        file_content = await file.read()
-        
-        if len(file_content) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="File is empty"
-            )
-        
-        # Parse with PM4Py
-        petri_net_data = pm4py_service.parse_pnml_file(file_content, file.filename)
+        # Spool the upload to disk in chunks, then parse and fingerprint with PM4Py off the event loop
+        temp_file_path = await spool_upload(file, '.pnml', "upload_pnml")
+        try:
+            async with heavy_request_limiter:
+                petri_net_data = await run_in_threadpool(pm4py_service.parse_pnml_path, temp_file_path)
+                form = await run_in_threadpool(canonical_form, petri_net_data)
+                
+                # Every upload gets its own ID; an identical stored net is shared underneath
+                candidates = [petri_nets[i] for i in fingerprint_index.lookup(form[0])]
+                duplicate = await run_in_threadpool(find_exact_duplicate, petri_net_data, candidates)
+        finally:
+            os.unlink(temp_file_path)
         
-        # Generate unique ID and store
+        if duplicate is not None:
+            petri_net_data = duplicate
         petri_net_id = str(uuid.uuid4())
-        petri_nets[petri_net_id] = petri_net_data
+        _store_petri_net(petri_net_id, petri_net_data, form)
         
         # Determine file type for message
         file_type = "APNML" if file.filename.endswith('.apnml') else "PNML"
         
-        return UploadResponse(
+        return _json_response(UploadResponse.model_construct(
             success=True,
             message=f"Successfully parsed {file_type} file: {file.filename}",
             petri_net_id=petri_net_id,
             data=petri_net_data
-        )
+        ))
         
     except HTTPException:
         raise
@@ -94,10 +174,149 @@ async def get_petri_net(petri_net_id: str):
             detail="Petri net not found"
         )
     
+    return _json_response(petri_nets[petri_net_id])
+
+def _derive_analysis(build, rebind, petri_net_data: PetriNetData, canonical_order, entries: List[tuple]) -> Any:
+    """Carry a structurally identical net's analysis over, or build a new one"""
+    for source, source_order, analysis in entries:
+        mapping = node_correspondence(source, source_order, petri_net_data, canonical_order)
+        if mapping is not None:
+            rebound = rebind(analysis, petri_net_data, mapping)
+            if rebound is not None:
+                return rebound
+    return build(petri_net_data)
+
+async def _net_index(cache: Dict[str, List[tuple]], petri_net_id: str, build, rebind) -> Any:
+    """Analysis of a stored net cached by fingerprint, derived in a worker thread on first use
+
+    A net with the same fingerprint as an analysed one gets that analysis
+    rebound to its own elements, which is linear in the net's size; only
+    nets without such a counterpart, or with structural symmetries that
+    leave no canonical node order, are analysed from scratch. Both count as
+    heavy requests, and a result is only cached if the net was not replaced
+    or deleted in the meantime.
+    """
+    if petri_net_id not in petri_nets:
+        raise HTTPException(
+            status_code=404,
+            detail="Petri net not found"
+        )
+    petri_net_data = petri_nets[petri_net_id]
+    fingerprint = fingerprint_index.fingerprints[petri_net_id]
+    canonical_order = fingerprint_index.canonical_orders[petri_net_id]
+    entries = list(cache.get(fingerprint, ()))
+    for source, _, analysis in entries:
+        if source is petri_net_data:
+            return analysis
+    async with heavy_request_limiter:
+        analysis = await run_in_threadpool(_derive_analysis, build, rebind, petri_net_data, canonical_order, entries)
+    if petri_nets.get(petri_net_id) is petri_net_data:
+        cache.setdefault(fingerprint, []).append((petri_net_data, canonical_order, analysis))
+    return analysis
+
+async def _get_reduction(petri_net_id: str) -> Dict[str, Any]:
+    """Reduction result of a stored net, computed on first use"""
+    return await _net_index(reduced_nets, petri_net_id, petri_net_reducer.reduce, petri_net_reducer.rebind)
+
+async def _analysis_net(petri_net_id: str, reduced: bool = False) -> PetriNetData:
+    """Stored net, or its reduced version when an analysis opts into it"""
+    if reduced:
+        return (await _get_reduction(petri_net_id))["petri_net"]
+    if petri_net_id not in petri_nets:
+        raise HTTPException(
+            status_code=404,
+            detail="Petri net not found"
+        )
     return petri_nets[petri_net_id]
 
+@router.get("/reduce/{petri_net_id}")
+async def reduce_petri_net(petri_net_id: str):
+    """Get the reduced Petri net with a mapping from reduced to original elements"""
+    reduction = await _get_reduction(petri_net_id)
+    return _json_response({
+        "petri_net_id": petri_net_id,
+        "petri_net": reduction["petri_net"],
+        "mapping": reduction["mapping"],
+        "edge_mapping": reduction["edge_mapping"],
+        "absorbed_edges": reduction["absorbed_edges"],
+        "rules_applied": reduction["rules_applied"],
+        "original_statistics": reduction["original_statistics"],
+        "reduced_statistics": reduction["reduced_statistics"]
+    })
+
+@router.get("/clusters/{petri_net_id}")
+async def get_clustered_view(
+    petri_net_id: str,
+    level: Optional[int] = Query(None, ge=0),
+    expand: List[str] = Query([])
+):
+    """Get a stored net at a level of detail, with the given clusters expanded
+    
+    Level 0 is the full net; the default is the coarsest level. Collapsed
+    clusters appear as nodes of type "cluster" and arcs crossing cluster
+    boundaries are aggregated.
+    """
+    hierarchy = await _net_index(cluster_hierarchies, petri_net_id, ClusterHierarchy, ClusterHierarchy.rebind)
+    
+    unknown = [cluster_id for cluster_id in expand if hierarchy.level_of(cluster_id) is None]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Cluster not found: {', '.join(unknown)}")
+    
+    def render() -> Response:
+        view = hierarchy.view(hierarchy.levels if level is None else level, expand)
+        return _json_response({"petri_net_id": petri_net_id, **hierarchy.summary(), **view})
+    
+    # Views near level 0 hold most of the net, so build and serialize them off the loop
+    async with heavy_request_limiter:
+        return await run_in_threadpool(render)
+
+async def _get_search_index(petri_net_id: str) -> NetSearchIndex:
+    """Search index of a stored net, built on first use"""
+    return await _net_index(search_indexes, petri_net_id, NetSearchIndex, NetSearchIndex.rebind)
+
+@router.get("/search/{petri_net_id}")
+async def search_nodes(
+    petri_net_id: str,
+    q: str = Query(..., min_length=1),
+    mode: str = "substring",
+    type: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=1000)
+):
+    """Find nodes of a stored net by label or name (substring, prefix or regex)"""
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Unsupported search mode: {mode}")
+    if mode == "regex" and len(q) > MAX_REGEX_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Regular expression longer than {MAX_REGEX_LENGTH} characters")
+    index = await _get_search_index(petri_net_id)
+    try:
+        if mode == "regex":
+            # A user pattern can backtrack for a long time, so keep it off the event loop
+            async with heavy_request_limiter:
+                result = await run_in_threadpool(index.search, q, mode=mode, node_type=type, limit=limit)
+        else:
+            result = index.search(q, mode=mode, node_type=type, limit=limit)
+    except re.error as e:
+        raise HTTPException(status_code=400, detail=f"Invalid regular expression: {str(e)}")
+    return {"petri_net_id": petri_net_id, "query": q, "mode": mode, **result}
+
+@router.get("/neighborhood/{petri_net_id}/{node_id}")
+async def get_neighborhood(
+    petri_net_id: str,
+    node_id: str,
+    hops: int = Query(1, ge=0, le=20),
+    direction: str = "both",
+    limit: int = Query(1000, ge=1, le=10000)
+):
+    """Get the subgraph within k hops of a node, following pre, post or both arcs"""
+    if direction not in NEIGHBORHOOD_DIRECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported direction: {direction}")
+    index = await _get_search_index(petri_net_id)
+    if node_id not in index.position:
+        raise HTTPException(status_code=404, detail="Node not found")
+    return _json_response({"petri_net_id": petri_net_id, **index.neighborhood(node_id, hops=hops, direction=direction, limit=limit)})
+
 @router.get("/statistics/{petri_net_id}")
-async def get_statistics(petri_net_id: str):
+async def get_statistics(petri_net_id: str, reduced: bool = False):
     """Get statistics for a Petri net"""
     if petri_net_id not in petri_nets:
         raise HTTPException(
@@ -105,6 +324,9 @@ async def get_statistics(petri_net_id: str):
             detail="Petri net not found"
         )
     
+    if reduced:
+        return (await _get_reduction(petri_net_id))["reduced_statistics"]
+    
     return petri_nets[petri_net_id].statistics
 
 @router.delete("/petri-net/{petri_net_id}")
@@ -116,11 +338,75 @@ async def delete_petri_net(petri_net_id: str):
             detail="Petri net not found"
         )
     
-    del petri_nets[petri_net_id]
+    # Identical uploads share the stored object, which lives on under their own IDs
+    _unstore_petri_net(petri_net_id)
     return {"success": True, "message": "Petri net deleted successfully"}
 
+@router.get("/fingerprint/{petri_net_id}")
+async def get_fingerprint(petri_net_id: str):
+    """Get the structural fingerprint of a stored Petri net and its structural duplicates"""
+    if petri_net_id not in petri_nets:
+        raise HTTPException(
+            status_code=404,
+            detail="Petri net not found"
+        )
+    
+    fingerprint = fingerprint_index.fingerprints[petri_net_id]
+    return {
+        "petri_net_id": petri_net_id,
+        "fingerprint": fingerprint,
+        "duplicates": [i for i in fingerprint_index.lookup(fingerprint) if i != petri_net_id]
+    }
+
+@router.get("/petri-nets/by-fingerprint/{fingerprint}")
+async def find_by_fingerprint(fingerprint: str):
+    """Find stored Petri nets with the given structural fingerprint"""
+    return {
+        "fingerprint": fingerprint,
+        "petri_net_ids": fingerprint_index.lookup(fingerprint)
+    }
+
+def _unstore_petri_net(petri_net_id: str):
+    """Remove a stored net, and the analyses of its object once no other ID holds it"""
+    petri_net_data = petri_nets.pop(petri_net_id)
+    fingerprint = fingerprint_index.fingerprints[petri_net_id]
+    fingerprint_index.remove(petri_net_id)
+    if any(petri_nets[i] is petri_net_data for i in fingerprint_index.nets_by_fingerprint.get(fingerprint, ())):
+        return
+    for cache in (reduced_nets, cluster_hierarchies, search_indexes):
+        entries = [entry for entry in cache.get(fingerprint, ()) if entry[0] is not petri_net_data]
+        if entries:
+            cache[fingerprint] = entries
+        else:
+            cache.pop(fingerprint, None)
+
+def _store_petri_net(petri_net_id: str, petri_net_data: PetriNetData, form: Tuple[str, Optional[List[str]]]):
+    """Store (or replace) a Petri net under the given ID with its fingerprint and canonical order"""
+    if petri_net_id in petri_nets:
+        _unstore_petri_net(petri_net_id)
+    petri_nets[petri_net_id] = petri_net_data
+    fingerprint_index.add(petri_net_id, *form)
+
+def _pnml_stream_response(petri_net_data: PetriNetData, file_format: str) -> StreamingResponse:
+    """Build a chunked PNML/APNML download response"""
+    if file_format not in SUPPORTED_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {file_format}")
+    
+    # Generate filename
+    network_name = petri_net_data.networkName or petri_net_data.networkId or "petri_net"
+    filename = f"{network_name}.{file_format}"
+    
+    return StreamingResponse(
+        pnml_writer.iter_pnml_bytes(petri_net_data, file_format),
+        media_type="application/xml",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Type": "application/xml; charset=utf-8"
+        }
+    )
+
 @router.post("/export-pnml")
-async def export_pnml(request: Request):
+async def export_pnml(request: Request, format: str = "pnml"):
     """Export current Petri net state to PNML format"""
     try:
         # Get the request body (PetriNetData)
@@ -129,23 +415,11 @@ async def export_pnml(request: Request):
         # Convert to PetriNetData object
         petri_net_data = PetriNetData(**body)
         
-        # Export to PNML string
-        pnml_content = pm4py_service.export_to_pnml_string(petri_net_data)
-        
-        # Generate filename
-        network_name = petri_net_data.networkName or petri_net_data.networkId or "petri_net"
-        filename = f"{network_name}.pnml"
-        
-        # Return as downloadable file
-        return Response(
-            content=pnml_content,
-            media_type="application/xml",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "application/xml; charset=utf-8"
-            }
-        )
+        # Stream the document straight from the frontend data
+        return _pnml_stream_response(petri_net_data, format)
         
+    except HTTPException:
+        raise
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -156,34 +430,105 @@ async def export_pnml(request: Request):
             ).dict()
         )
 
+@router.get("/export-pnml/{petri_net_id}")
+async def export_stored_pnml(petri_net_id: str, format: str = "pnml", reduced: bool = False):
+    """Export a stored Petri net to PNML/APNML format without re-sending it"""
+    return _pnml_stream_response(await _analysis_net(petri_net_id, reduced), format)
+
+def _select_petri_nets(request: BulkExportRequest) -> List[str]:
+    """Stored net IDs selected by a bulk export request"""
+    if request.petri_net_ids is not None:
+        missing = [i for i in request.petri_net_ids if i not in petri_nets]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Petri nets not found: {', '.join(missing)}")
+        return list(dict.fromkeys(request.petri_net_ids))
+    
+    selected = list(petri_nets)
+    criteria = request.filter
+    if criteria is None:
+        return selected
+    if criteria.fingerprint is not None:
+        matches = set(fingerprint_index.lookup(criteria.fingerprint))
+        selected = [i for i in selected if i in matches]
+    if criteria.source is not None:
+        selected = [i for i in selected if (petri_nets[i].metadata or {}).get("source") == criteria.source]
+    if criteria.event_log_id is not None:
+        selected = [i for i in selected if (petri_nets[i].metadata or {}).get("event_log_id") == criteria.event_log_id]
+    if criteria.name_contains is not None:
+        needle = criteria.name_contains.lower()
+        selected = [i for i in selected if needle in (petri_nets[i].networkName or "").lower()]
+    return selected
+
+@router.post("/export-bulk")
+async def export_bulk(request: BulkExportRequest):
+    """Export many stored nets as one streamed zip archive
+    
+    Files are generated in a process pool and added to the archive as they
+    finish; the archive ends with a manifest.json of files and failures.
+    """
+    if request.format not in BULK_EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {request.format}")
+    
+    petri_net_ids = _select_petri_nets(request)
+    if not petri_net_ids:
+        raise HTTPException(status_code=404, detail="No Petri nets match the selection")
+    
+    nets = [(petri_net_id, petri_nets[petri_net_id]) for petri_net_id in petri_net_ids]
+    return StreamingResponse(
+        bulk_exporter.iter_zip(nets, request.format, request.config),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=petri_nets_{request.format}.zip"}
+    )
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
         "service": "Petri Net API",
-        "stored_nets": len(petri_nets)
+        "stored_nets": len(petri_nets),
+        "stored_event_logs": len(event_logs),
+        "heavy_requests": heavy_request_limiter.status()
     }
 
+def _event_log_suffix(filename: str) -> str:
+    """Return the event log suffix of a filename or reject unsupported formats"""
+    for suffix in EVENT_LOG_SUFFIXES:
+        if filename.lower().endswith(suffix):
+            return suffix
+    raise HTTPException(status_code=400, detail="Only CSV, XES and XES.gz files are supported")
+
+def _read_event_log(
+    file_path: str,
+    suffix: str,
+    columns: Optional[List[str]] = None,
+    max_traces: Optional[int] = None,
+    categorical: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """Load an event log file into a DataFrame
+
+    Only the requested columns are parsed; XES files are streamed. CSV
+    columns listed in categorical are parsed straight into categoricals.
+    """
+    if suffix == '.csv':
+        dtype = {col: "category" for col in categorical} if categorical else None
+        return pd.read_csv(file_path, usecols=columns, dtype=dtype)
+    return xes_reader.read(file_path, columns=columns, max_traces=max_traces)
+
 @router.post("/preview-event-log", response_model=EventLogPreview)
 async def preview_event_log(file: UploadFile = File(...)):
-    """Preview Event Log CSV file, return column information and data samples"""
+    """Preview Event Log file (CSV, XES or XES.gz), return column information and data samples"""
     try:
         # Validate file type
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
-        
-        # Read CSV file
-        contents = await file.read()
+        suffix = _event_log_suffix(file.filename)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.csv') as temp_file:
-            temp_file.write(contents)
-            temp_file_path = temp_file.name
+        # Spool the upload to a temporary file in chunks
+        temp_file_path = await spool_upload(file, suffix, "preview_event_log")
         
         try:
-            # Use pandas to read CSV
-            df = pd.read_csv(temp_file_path)
+            # XES previews only read the first traces of the log
+            async with heavy_request_limiter:
+                df = await run_in_threadpool(_read_event_log, temp_file_path, suffix, max_traces=XES_PREVIEW_TRACES)
             
             # Basic statistics
             statistics = {
@@ -193,6 +538,8 @@ async def preview_event_log(file: UploadFile = File(...)):
                 "potential_activity_columns": [],
                 "potential_timestamp_columns": []
             }
+            if suffix != '.csv':
+                statistics["previewed_traces"] = int(df['case:concept:name'].nunique()) if 'case:concept:name' in df.columns else 0
             
             # Analyze characteristics of each column
             for col in df.columns:
@@ -245,9 +592,97 @@ async def preview_event_log(file: UploadFile = File(...)):
             # Clean up temporary file
             os.unlink(temp_file_path)
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing file: {str(e)}")
 
+def _read_encoded_event_log(
+    file_path: str,
+    suffix: str,
+    config_obj: EventLogImportConfig,
+    filter_chain: Optional[EventLogFilterChain] = None
+) -> EncodedEventLog:
+    """Read the configured columns of an event log, encode and filter them"""
+    categorical = [config_obj.case_id_column, config_obj.activity_column]
+    if config_obj.resource_column:
+        categorical.append(config_obj.resource_column)
+    columns = categorical + [config_obj.timestamp_column]
+    df = _read_event_log(file_path, suffix, columns=columns, categorical=categorical)
+    log = EncodedEventLog.from_frame(
+        df,
+        config_obj.case_id_column,
+        config_obj.activity_column,
+        config_obj.timestamp_column,
+        config_obj.resource_column
+    )
+    
+    # Filter on the encoded columns so only surviving events are mined
+    if filter_chain:
+        log = filter_chain.apply(log)
+    return log
+
+def _parse_import_config(config: str) -> Tuple[EventLogImportConfig, EventLogFilterChain]:
+    """Parse an import config form field and its filter chain, failing with 400"""
+    try:
+        config_obj = EventLogImportConfig(**json.loads(config))
+        return config_obj, EventLogFilterChain(config_obj.filters)
+    except (json.JSONDecodeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid config format: {str(e)}")
+
+def _discovery_settings(config_obj: EventLogImportConfig) -> Dict[str, Any]:
+    """Discovery algorithm and thresholds of an import config"""
+    return {
+        "algorithm": config_obj.algorithm,
+        "noise_threshold": config_obj.noise_threshold,
+        "dependency_threshold": config_obj.dependency_threshold,
+        "and_threshold": config_obj.and_threshold
+    }
+
+def _discover_petri_net(
+    log: EncodedEventLog,
+    config_obj: EventLogImportConfig,
+    filename: str
+) -> Tuple[PetriNetData, Tuple[str, Optional[List[str]]]]:
+    """Run the configured discovery algorithm and convert the result to frontend format
+    
+    Returns the net with its canonical form (fingerprint and node order), from
+    which its network ID is derived so identical nets get the same one.
+    """
+    if config_obj.algorithm not in DISCOVERY_ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"Unsupported algorithm: {config_obj.algorithm}")
+    
+    # PM4Py needs string columns; they only live for the duration of discovery
+    petri_net_data = pm4py_service.discover_petri_net(log.to_frame(), **_discovery_settings(config_obj))
+    
+    # Add some metadata
+    petri_net_data.networkName = f"Discovered from {filename}"
+    petri_net_data.metadata = {
+        "source": "event_log_import",
+        "algorithm": config_obj.algorithm,
+        "original_filename": filename,
+        "case_id_column": config_obj.case_id_column,
+        "activity_column": config_obj.activity_column,
+        "timestamp_column": config_obj.timestamp_column,
+        **log.statistics()
+    }
+    if config_obj.filters:
+        petri_net_data.metadata["filters"] = config_obj.filters
+    form = canonical_form(petri_net_data)
+    petri_net_data.networkId = structural_network_id(form[0])
+    return petri_net_data, form
+
+def _discovery_statistics(petri_net_data: PetriNetData) -> Dict[str, Any]:
+    """Summary statistics returned alongside a discovered net"""
+    return {
+        "total_traces": petri_net_data.metadata["total_traces"],
+        "total_events": petri_net_data.metadata["total_events"],
+        "unique_activities": petri_net_data.metadata["unique_activities"],
+        "places_count": len(petri_net_data.nodes),
+        "transitions_count": len([n for n in petri_net_data.nodes if n.type == "transition"]),
+        "edges_count": len(petri_net_data.edges)
+    }
+
 @router.post("/import-event-log")
 async def import_event_log(
     file: UploadFile = File(...),
@@ -256,92 +691,403 @@ async def import_event_log(
     """Import Event Log using specified configuration and generate Petri net"""
     try:
         # Validate file type
-        if not file.filename.endswith('.csv'):
-            raise HTTPException(status_code=400, detail="Only CSV files are supported")
+        suffix = _event_log_suffix(file.filename)
         
         # Parse configuration
-        import json
-        try:
-            config_dict = json.loads(config)
-            config_obj = EventLogImportConfig(**config_dict)
-        except (json.JSONDecodeError, ValueError) as e:
-            raise HTTPException(status_code=400, detail=f"Invalid config format: {str(e)}")
-        
-        # Read file content
-        contents = await file.read()
+        config_obj, filter_chain = _parse_import_config(config)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.csv') as temp_file:
-            temp_file.write(contents)
-            temp_file_path = temp_file.name
+        # Spool the upload to a temporary file in chunks
+        temp_file_path = await spool_upload(file, suffix, "import_event_log")
         
         try:
-            # Use pandas to read CSV, then format with PM4Py
-            df = pd.read_csv(temp_file_path)
-            
-            # Format DataFrame to PM4Py format
-            log_df = pm4py.format_dataframe(df,
-                                          case_id=config_obj.case_id_column,
-                                          activity_key=config_obj.activity_column,
-                                          timestamp_key=config_obj.timestamp_column)
-            
-            # Discover Petri net based on selected algorithm
-            if config_obj.algorithm == "inductive":
-                net, initial_marking, final_marking = pm4py.discover_petri_net_inductive(
-                    log_df, noise_threshold=config_obj.noise_threshold
-                )
-            elif config_obj.algorithm == "alpha":
-                net, initial_marking, final_marking = pm4py.discover_petri_net_alpha(log_df)
-            elif config_obj.algorithm == "heuristics":
-                net, initial_marking, final_marking = pm4py.discover_petri_net_heuristics(
-                    log_df,
-                    dependency_threshold=config_obj.dependency_threshold,
-                    and_threshold=config_obj.and_threshold
-                )
-            else:
-                raise HTTPException(status_code=400, detail=f"Unsupported algorithm: {config_obj.algorithm}")
-            
-            # Convert to frontend format
-            petri_net_service = PetriNetService()
-            petri_net_data = petri_net_service.convert_pm4py_to_frontend(
-                net, initial_marking, final_marking
-            )
+            async with heavy_request_limiter:
+                # Read and encode only the configured columns, then filter them
+                source = await run_in_threadpool(_read_encoded_event_log, temp_file_path, suffix, config_obj)
+                if len(source) == 0:
+                    raise HTTPException(status_code=400, detail=NO_VALID_EVENTS)
+                log = await run_in_threadpool(filter_chain.apply, source)
+                if len(log) == 0 and filter_chain:
+                    raise HTTPException(status_code=400, detail="No events left after applying the filters")
+                
+                # Discover Petri net based on selected algorithm
+                petri_net_data, form = await run_in_threadpool(_discover_petri_net, log, config_obj, file.filename)
             
-            # Add some metadata
-            petri_net_data.networkName = f"Discovered from {file.filename}"
-            petri_net_data.metadata = {
-                "source": "event_log_import",
-                "algorithm": config_obj.algorithm,
-                "original_filename": file.filename,
-                "case_id_column": config_obj.case_id_column,
-                "activity_column": config_obj.activity_column,
-                "timestamp_column": config_obj.timestamp_column,
-                "total_traces": log_df['case:concept:name'].nunique(),
-                "total_events": len(log_df),
-                "unique_activities": log_df['concept:name'].nunique()
+            # Keep the encoded events server-side for variant and log queries
+            event_log_id = str(uuid.uuid4())
+            petri_net_id = str(uuid.uuid4())
+            event_logs[event_log_id] = {
+                "log": log,
+                "pending": [],
+                "filename": file.filename,
+                "config": config_obj,
+                "filters": filter_chain,
+                # Unfiltered events of a filtered log, which appended batches are merged into
+                "unfiltered": source if filter_chain else None,
+                "petri_net_id": petri_net_id,
+                "state": None,
+                # Serializes appends and rediscovery of this log
+                "lock": asyncio.Lock(),
+                "variants": None,
+                "dfg": None,
+                "overlays": {}
             }
+            petri_net_data.metadata["event_log_id"] = event_log_id
+            
+            # Store the discovered net so overlays and exports can refer to it
+            _store_petri_net(petri_net_id, petri_net_data, form)
             
-            return {
+            return _json_response({
                 "success": True,
                 "message": f"Successfully imported Event Log with {config_obj.algorithm} algorithm",
-                "petri_net": petri_net_data.dict(),
-                "statistics": {
-                    "total_traces": petri_net_data.metadata["total_traces"],
-                    "total_events": petri_net_data.metadata["total_events"],
-                    "unique_activities": petri_net_data.metadata["unique_activities"],
-                    "places_count": len(petri_net_data.nodes),
-                    "transitions_count": len([n for n in petri_net_data.nodes if n.type == "transition"]),
-                    "edges_count": len(petri_net_data.edges)
-                }
-            }
+                "event_log_id": event_log_id,
+                "petri_net_id": petri_net_id,
+                "petri_net": petri_net_data,
+                "statistics": _discovery_statistics(petri_net_data)
+            })
             
         finally:
             # Clean up temporary file
             os.unlink(temp_file_path)
             
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error importing Event Log: {str(e)}")
 
+@router.post("/discover-windows")
+async def discover_windows(
+    file: UploadFile = File(...),
+    config: str = Form(...),
+    window: str = Form(...),
+    stride: Optional[str] = Form(None),
+    assign: str = Form("events"),
+    include_nets: bool = Form(False)
+):
+    """Discover a Petri net per sliding time window of an event log, for drift analysis
+
+    window and stride are durations such as "30D" or "12h"; stride defaults
+    to the window size (non-overlapping windows). Events are assigned to
+    windows by their own timestamp, or with assign=cases whole cases by their
+    first event. Returns per-window summaries and structural diffs between
+    consecutive windows; with include_nets the nets are also stored and
+    returned.
+    """
+    suffix = _event_log_suffix(file.filename)
+    config_obj, filter_chain = _parse_import_config(config)
+    if config_obj.algorithm not in DISCOVERY_ALGORITHMS:
+        raise HTTPException(status_code=400, detail=f"Unsupported algorithm: {config_obj.algorithm}")
+    try:
+        size = pd.Timedelta(window)
+        step = pd.Timedelta(stride) if stride else size
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid window or stride: {str(e)}")
+    if pd.isna(size) or pd.isna(step):
+        raise HTTPException(status_code=400, detail="Invalid window or stride: must be a duration")
+    
+    temp_file_path = await spool_upload(file, suffix, "import_event_log")
+    try:
+        async with heavy_request_limiter:
+            log = await run_in_threadpool(_read_encoded_event_log, temp_file_path, suffix, config_obj, filter_chain)
+            result = await window_discovery.discover(
+                log, size, step, _discovery_settings(config_obj), assign=assign, include_nets=include_nets
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error discovering windows: {str(e)}")
+    finally:
+        os.unlink(temp_file_path)
+    
+    for summary in result["windows"]:
+        petri_net_data = summary.get("petri_net")
+        if petri_net_data is None:
+            continue
+        canonical_order = summary.pop("canonical_order")
+        petri_net_data.networkName = f"Window {summary['index']} of {file.filename}"
+        petri_net_data.metadata = {
+            "source": "window_discovery",
+            "algorithm": config_obj.algorithm,
+            "original_filename": file.filename,
+            "window_start": summary["start"],
+            "window_end": summary["end"],
+            "total_traces": summary["cases"],
+            "total_events": summary["events"],
+            "unique_activities": summary["activities"]
+        }
+        summary["petri_net_id"] = str(uuid.uuid4())
+        _store_petri_net(summary["petri_net_id"], petri_net_data, (summary["fingerprint"], canonical_order))
+    
+    return _json_response({
+        "window": window,
+        "stride": stride or window,
+        "assign": assign,
+        "algorithm": config_obj.algorithm,
+        **result
+    })
+
+def _get_event_log(event_log_id: str) -> Dict[str, Any]:
+    """Look up a stored event log or fail with 404"""
+    if event_log_id not in event_logs:
+        raise HTTPException(
+            status_code=404,
+            detail="Event log not found"
+        )
+    return event_logs[event_log_id]
+
+async def _encoded_event_log(entry: Dict[str, Any]) -> EncodedEventLog:
+    """Full encoded events of a stored log, folding in appended batches off the event loop"""
+    while entry["pending"]:
+        log, pending = entry["log"], list(entry["pending"])
+        merged = await run_in_threadpool(EncodedEventLog.concat, [log, *pending])
+        # Another request may have folded the same batches meanwhile
+        if entry["log"] is log:
+            entry["log"] = merged
+            entry["pending"] = entry["pending"][len(pending):]
+    return entry["log"]
+
+async def _log_index(entry: Dict[str, Any], key: str, build) -> Any:
+    """Index of a stored log cached under key, built in a worker thread on first use
+
+    Builds count as heavy requests; a result is only cached if no batch was
+    appended while it was being built.
+    """
+    if entry[key] is not None:
+        return entry[key]
+    async with heavy_request_limiter:
+        log = await _encoded_event_log(entry)
+        index = await run_in_threadpool(build, log)
+    if entry["log"] is log and not entry["pending"]:
+        entry[key] = index
+    return index
+
+async def _get_variant_index(event_log_id: str) -> VariantIndex:
+    """Variant index of a stored event log, built on first use"""
+    return await _log_index(_get_event_log(event_log_id), "variants", VariantIndex)
+
+@router.get("/variants/{event_log_id}")
+async def get_variants(
+    event_log_id: str,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=1000),
+    sort: str = "count",
+    order: str = "desc",
+    activity: Optional[str] = None,
+    min_count: int = Query(1, ge=1)
+):
+    """Get a page of trace variants with counts, coverage and durations"""
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort key: {sort} (use one of {', '.join(SORT_KEYS)})")
+    if order not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort order: {order} (use asc or desc)")
+    
+    variant_index = await _get_variant_index(event_log_id)
+    return variant_index.query(
+        page=page,
+        page_size=page_size,
+        sort=sort,
+        descending=order == "desc",
+        activity=activity,
+        min_count=min_count
+    )
+
+@router.post("/discover-dfg")
+async def discover_dfg(
+    file: UploadFile = File(...),
+    config: str = Form(...),
+    min_count: int = Form(1, ge=1),
+    edge_percentile: float = Form(0.0, ge=0, le=100),
+    activity_percentile: float = Form(0.0, ge=0, le=100)
+):
+    """Directly-follows graph of an event log with mean/median transition times
+
+    A quick first look at a log without Petri net discovery: takes the same
+    files and config as import-event-log (the algorithm settings are unused)
+    and does not store the log.
+    """
+    suffix = _event_log_suffix(file.filename)
+    config_obj, filter_chain = _parse_import_config(config)
+    
+    temp_file_path = await spool_upload(file, suffix, "import_event_log")
+    try:
+        async with heavy_request_limiter:
+            log = await run_in_threadpool(_read_encoded_event_log, temp_file_path, suffix, config_obj, filter_chain)
+            dfg = await run_in_threadpool(DirectlyFollowsGraph, log)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error discovering DFG: {str(e)}")
+    finally:
+        os.unlink(temp_file_path)
+    
+    return _json_response(dfg.graph(min_count, edge_percentile, activity_percentile))
+
+@router.get("/dfg/{event_log_id}")
+async def get_dfg(
+    event_log_id: str,
+    min_count: int = Query(1, ge=1),
+    edge_percentile: float = Query(0.0, ge=0, le=100),
+    activity_percentile: float = Query(0.0, ge=0, le=100)
+):
+    """Directly-follows graph of an imported event log, pruned like discover-dfg"""
+    dfg = await _log_index(_get_event_log(event_log_id), "dfg", DirectlyFollowsGraph)
+    return _json_response({"event_log_id": event_log_id, **dfg.graph(min_count, edge_percentile, activity_percentile)})
+
+@router.get("/performance/{petri_net_id}")
+async def get_performance_overlay(
+    petri_net_id: str,
+    event_log_id: Optional[str] = None,
+    include_net: bool = False,
+    reduced: bool = False
+):
+    """Get log-derived frequency and timing statistics for a stored Petri net
+
+    Defaults to the event log the net was discovered from. The overlay is
+    computed once per net/log pair; with include_net the net is returned with
+    the statistics attached to each Node.data and Edge.data.
+    """
+    petri_net_data = await _analysis_net(petri_net_id, reduced)
+    
+    event_log_id = event_log_id or (petri_net_data.metadata or {}).get("event_log_id")
+    if not event_log_id:
+        raise HTTPException(status_code=400, detail="No event log associated with this Petri net")
+    entry = _get_event_log(event_log_id)
+    
+    overlay_key = f"{petri_net_id}:reduced" if reduced else petri_net_id
+    overlay = entry["overlays"].get(overlay_key)
+    if overlay is None:
+        overlays = entry["overlays"]
+        async with heavy_request_limiter:
+            log = await _encoded_event_log(entry)
+            overlay = await run_in_threadpool(performance_service.compute_overlay, petri_net_data, log)
+        # Appends and rediscovery replace the overlay cache, dropping stale results
+        overlays[overlay_key] = overlay
+    
+    if include_net:
+        return _json_response({
+            "event_log_id": event_log_id,
+            "petri_net": performance_service.apply_overlay(petri_net_data, overlay)
+        })
+    return {"event_log_id": event_log_id, **overlay}
+
+async def _rediscover(event_log_id: str, entry: Dict[str, Any]) -> PetriNetData:
+    """Re-run discovery on the full stored log and replace the stored net"""
+    log = await _encoded_event_log(entry)
+    async with heavy_request_limiter:
+        petri_net_data, form = await run_in_threadpool(_discover_petri_net, log, entry["config"], entry["filename"])
+    petri_net_data.metadata["event_log_id"] = event_log_id
+    _store_petri_net(entry["petri_net_id"], petri_net_data, form)
+    entry["overlays"] = {}
+    return petri_net_data
+
+def _append_filtered(
+    entry: Dict[str, Any],
+    current: EncodedEventLog,
+    batch: EncodedEventLog
+) -> Tuple[EncodedEventLog, EncodedEventLog, IncrementalLogState, Dict[str, Any]]:
+    """Merge a batch into a filtered log and re-apply the filters to all events
+
+    Filters such as top_k_variants or remove_rare_activities depend on the
+    whole log, so a batch cannot be filtered on its own; the chain runs again
+    over the merged unfiltered events and the state is rebuilt from the result.
+    """
+    previous = entry["state"] or IncrementalLogState(current)
+    unfiltered = EncodedEventLog.concat([entry["unfiltered"], batch])
+    log = entry["filters"].apply(unfiltered)
+    state = IncrementalLogState(log)
+    changes = {
+        "new_events": len(batch),
+        "refiltered": True,
+        "kept_events": len(log) - previous.total_events,
+        **previous.structure_changes(state)
+    }
+    return unfiltered, log, state, changes
+
+@router.post("/event-log/{event_log_id}/append")
+async def append_event_log(
+    event_log_id: str,
+    file: UploadFile = File(...),
+    rediscover: bool = Form(False)
+):
+    """Append new events to an imported event log
+
+    Directly-follows counts and activity statistics are updated from the new
+    events only; discovery is re-run when the batch changes the log structure
+    or when rediscover is set. Logs imported with filters re-apply them to
+    all events, so appending to them costs a pass over the whole log.
+    """
+    entry = _get_event_log(event_log_id)
+    suffix = _event_log_suffix(file.filename)
+    
+    try:
+        temp_file_path = await spool_upload(file, suffix, "append_event_log")
+        try:
+            async with heavy_request_limiter:
+                batch = await run_in_threadpool(_read_encoded_event_log, temp_file_path, suffix, entry["config"])
+        finally:
+            os.unlink(temp_file_path)
+        if len(batch) == 0:
+            raise HTTPException(status_code=400, detail=NO_VALID_EVENTS)
+        
+        async with entry["lock"]:
+            current = await _encoded_event_log(entry)
+            async with heavy_request_limiter:
+                if entry["filters"]:
+                    unfiltered, log, state, changes = await run_in_threadpool(_append_filtered, entry, current, batch)
+                    if len(log) == 0:
+                        raise HTTPException(status_code=400, detail="No events left after applying the filters")
+                    entry.update({"unfiltered": unfiltered, "log": log, "pending": [], "state": state})
+                else:
+                    # Build the incremental state from the full log once, on the first append
+                    if entry["state"] is None:
+                        entry["state"] = await run_in_threadpool(IncrementalLogState, current)
+                    changes = await run_in_threadpool(entry["state"].append, batch)
+                    entry["pending"].append(batch)
+            entry["variants"] = None
+            entry["dfg"] = None
+            entry["overlays"] = {}
+            
+            response = {
+                "success": True,
+                "event_log_id": event_log_id,
+                "petri_net_id": entry["petri_net_id"],
+                "changes": changes,
+                "statistics": entry["state"].statistics(),
+                "rediscovered": False
+            }
+            if changes["structure_changed"] or rediscover:
+                petri_net_data = await _rediscover(event_log_id, entry)
+                response["rediscovered"] = True
+                response["petri_net"] = petri_net_data
+        return _json_response(response)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error appending to Event Log: {str(e)}")
+
+@router.post("/event-log/{event_log_id}/rediscover")
+async def rediscover_event_log(event_log_id: str):
+    """Re-run discovery on the full stored event log on demand"""
+    entry = _get_event_log(event_log_id)
+    async with entry["lock"]:
+        petri_net_data = await _rediscover(event_log_id, entry)
+    return _json_response({
+        "success": True,
+        "event_log_id": event_log_id,
+        "petri_net_id": entry["petri_net_id"],
+        "petri_net": petri_net_data,
+        "statistics": _discovery_statistics(petri_net_data)
+    })
+
+@router.delete("/event-log/{event_log_id}")
+async def delete_event_log(event_log_id: str):
+    """Delete an imported event log from memory"""
+    _get_event_log(event_log_id)
+    del event_logs[event_log_id]
+    return {"success": True, "message": "Event log deleted successfully"}
+
 @router.post("/export-event-log")
 async def export_event_log(request: Request):
     """Export current Petri net state to Event Log CSV format"""
@@ -380,4 +1126,137 @@ async def export_event_log(request: Request):
                 message=f"Failed to export Event Log: {str(e)}",
                 error_type="export_error"
             ).dict()
-        ) 
\ No newline at end of file
+        ) 
+
+def _positive_number(message: Dict[str, Any], key: str, default: Any, integer: bool = False) -> Any:
+    """Positive numeric field of a simulation message; ValueError is sent back as an error frame"""
+    value = message.get(key)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value <= 0:
+        raise ValueError(f"{key} must be a positive number")
+    if integer:
+        if value != int(value):
+            raise ValueError(f"{key} must be a positive integer")
+        return int(value)
+    return float(value)
+
+async def _run_token_game(
+    websocket: WebSocket,
+    session: TokenGameSession,
+    stop: asyncio.Event,
+    rate: Optional[float],
+    max_steps: int
+):
+    """Fire random transitions at the target rate, pushing one batched frame per tick"""
+    budget = 0.0
+    fired = 0
+    while not stop.is_set():
+        if rate:
+            budget += rate * SIMULATION_FRAME_INTERVAL
+            steps = int(budget)
+            budget -= steps
+        else:
+            steps = SIMULATION_MAX_STEPS_PER_FRAME
+        fired += session.fire_random(min(steps, SIMULATION_MAX_STEPS_PER_FRAME, max_steps - fired))
+        
+        if session.has_pending_changes():
+            await websocket.send_json(session.flush_frame())
+        
+        reason = None
+        if session.is_final():
+            reason = "final_marking"
+        elif session.is_deadlocked():
+            reason = "deadlock"
+        elif fired >= max_steps:
+            reason = "max_steps"
+        if reason:
+            await websocket.send_json({"type": "done", "step": session.step, "reason": reason})
+            return
+        
+        await asyncio.sleep(SIMULATION_FRAME_INTERVAL)
+
+@router.websocket("/simulate/{petri_net_id}")
+async def simulate_token_game(
+    websocket: WebSocket,
+    petri_net_id: str,
+    seed: Optional[int] = None,
+    reduced: bool = False
+):
+    """Token game on a stored Petri net, stepped on the server
+
+    Client messages: {"action": "fire", "transition": id}, {"action": "random", "steps": n},
+    {"action": "run", "rate": firings_per_second, "max_steps": n}, {"action": "stop"}
+    and {"action": "reset"}. The server answers with an "init" snapshot followed by
+    "frame" messages holding only changed markings and enabled-set differences.
+    Steps per message or tick are capped at SIMULATION_MAX_STEPS_PER_FRAME and
+    runs at SIMULATION_MAX_RUN_STEPS; malformed values get an "error" message.
+    """
+    await websocket.accept()
+    if petri_net_id not in petri_nets:
+        await websocket.send_json({"type": "error", "message": "Petri net not found"})
+        await websocket.close(code=1008)
+        return
+    
+    try:
+        session = TokenGameSession(await _analysis_net(petri_net_id, reduced), seed=seed)
+    except HTTPException as e:
+        # The reduction could not be built now, e.g. the server is busy
+        await websocket.send_json({"type": "error", "message": e.detail})
+        await websocket.close(code=1013)
+        return
+    await websocket.send_json(session.snapshot())
+    
+    runner: Optional[asyncio.Task] = None
+    stop = asyncio.Event()
+    
+    async def stop_runner():
+        nonlocal runner
+        if runner is not None:
+            stop.set()
+            await runner
+            runner = None
+            stop.clear()
+    
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                break
+            try:
+                message = json.loads(frame.get("text") or frame.get("bytes") or "")
+                if not isinstance(message, dict):
+                    raise ValueError("Messages must be JSON objects")
+                action = message.get("action")
+                if action == "fire":
+                    session.fire(message.get("transition"))
+                    await websocket.send_json(session.flush_frame())
+                elif action == "random":
+                    steps = _positive_number(message, "steps", 1, integer=True)
+                    session.fire_random(min(steps, SIMULATION_MAX_STEPS_PER_FRAME))
+                    await websocket.send_json(session.flush_frame())
+                elif action == "run":
+                    rate = _positive_number(message, "rate", None)
+                    max_steps = _positive_number(message, "max_steps", SIMULATION_DEFAULT_MAX_STEPS, integer=True)
+                    await stop_runner()
+                    runner = asyncio.create_task(_run_token_game(
+                        websocket, session, stop, rate, min(max_steps, SIMULATION_MAX_RUN_STEPS)
+                    ))
+                elif action == "stop":
+                    await stop_runner()
+                    if session.has_pending_changes():
+                        await websocket.send_json(session.flush_frame())
+                    await websocket.send_json({"type": "stopped", "step": session.step})
+                elif action == "reset":
+                    await stop_runner()
+                    session.reset()
+                    await websocket.send_json(session.snapshot())
+                else:
+                    await websocket.send_json({"type": "error", "message": f"Unknown action: {action}"})
+            except (ValueError, TypeError) as e:
+                await websocket.send_json({"type": "error", "message": str(e)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if runner is not None:
+            runner.cancel()
@@ -0,0 +1,349 @@
+import contextvars
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Deque, Dict, List, Any, Optional, Tuple
+from urllib.parse import unquote_plus
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+
+# Profiling is only available when a token is configured. Requests opt in with
+# the profile query flag and present the token in the header or the
+# profile_token query parameter; the admin endpoints take the token the same way
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_HEADER = "x-profile-token"
+PROFILE_QUERY = "profile"
+PROFILE_TOKEN_QUERY = "profile_token"
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", 20))
+PROFILE_FORMATS = ("speedscope", "collapsed")
+ADMIN_PREFIX = "/api/admin"
+
+# Leaf frames of threads blocked waiting for work, left out of the samples
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+}
+
+# Function of the thread pool's worker threads holding the context of the
+# call they run (the one run_in_threadpool copied from the request)
+WORKER_RUN = "WorkerThread.run"
+
+Stack = Tuple[Tuple[str, str, int], ...]
+
+# Profile of the request being handled, inherited by its worker thread calls
+_current_profile: contextvars.ContextVar[Optional["Profile"]] = contextvars.ContextVar("current_profile", default=None)
+
+
+def profiling_enabled() -> bool:
+    return bool(PROFILING_TOKEN)
+
+
+def _token_matches(token: Optional[str]) -> bool:
+    return bool(token) and hmac.compare_digest(token, PROFILING_TOKEN)
+
+
+def _split_profile_params(query_string: bytes) -> Tuple[bytes, Dict[str, str]]:
+    """Query string without the profiling parameters, and their values
+
+    Other parameters are kept byte for byte, in their original order.
+    """
+    kept: List[bytes] = []
+    params: Dict[str, str] = {}
+    for part in query_string.split(b"&"):
+        name, _, value = part.partition(b"=")
+        key = unquote_plus(name.decode("latin-1"))
+        if key in (PROFILE_QUERY, PROFILE_TOKEN_QUERY):
+            params[key] = unquote_plus(value.decode("latin-1"))
+        elif part:
+            kept.append(part)
+    return b"&".join(kept), params
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler of one request, running in its own thread
+
+    Every interval the Python stacks of all threads are captured with
+    sys._current_frames() and the ones working on the request are counted
+    per distinct stack, rooted at their thread's name: the event loop thread
+    while the request's own coroutine (request_frame) is on its stack, and
+    worker threads while they run a call made with the request's context.
+    Work of concurrent requests is left out, as is work in child tasks of
+    the request (e.g. streamed response bodies) and in process pools.
+    """
+
+    def __init__(self, profile: "Profile", loop_thread: int, request_frame, interval: float):
+        self.profile = profile
+        self.loop_thread = loop_thread
+        self.request_frame = request_frame
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or not self._belongs(thread_id, frame):
+                    continue
+                stack = self._stack(frame, names.get(thread_id, str(thread_id)))
+                if stack is not None:
+                    self.samples[stack] += 1
+
+    def _belongs(self, thread_id: int, frame) -> bool:
+        """Whether a thread is working on the profiled request right now"""
+        while frame is not None:
+            if thread_id == self.loop_thread:
+                if frame is self.request_frame:
+                    return True
+            elif frame.f_code.co_qualname == WORKER_RUN:
+                context = frame.f_locals.get("context")
+                return isinstance(context, contextvars.Context) and context.get(_current_profile) is self.profile
+            frame = frame.f_back
+        return False
+
+    def _stack(self, frame, thread_name: str) -> Optional[Stack]:
+        code = frame.f_code
+        if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+            return None
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        frames.append((thread_name, "", 0))
+        return tuple(reversed(frames))
+
+
+class Profile:
+    """Samples of one request with the request's identifying details"""
+
+    def __init__(self, request_id: str, endpoint: str, interval: float):
+        self.profile_id = str(uuid.uuid4())
+        self.request_id = request_id
+        self.endpoint = endpoint
+        self.interval = interval
+        self.started = time.time()
+        self.duration = 0.0
+        self.input_bytes = 0
+        self.status: Optional[int] = None
+        self.samples: Counter = Counter()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "request_id": self.request_id,
+            "endpoint": self.endpoint,
+            "started": self.started,
+            "duration": self.duration,
+            "input_bytes": self.input_bytes,
+            "status": self.status,
+            "samples": sum(self.samples.values()),
+            "threads": sorted({stack[0][0] for stack in self.samples}),
+            "interval_ms": self.interval * 1000
+        }
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed stack format, one "frame;frame;... count" line per stack"""
+        lines = [
+            ";".join(_frame_name(frame) for frame in stack) + f" {count}"
+            for stack, count in self.samples.most_common()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self) -> Dict[str, Any]:
+        """speedscope sampled-profile JSON, weights in milliseconds"""
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        frames: List[Dict[str, Any]] = []
+        samples: List[List[int]] = []
+        weights: List[float] = []
+        for stack, count in self.samples.most_common():
+            indices = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    name, filename, line = frame
+                    frames.append({"name": name, "file": filename, "line": line} if filename else {"name": name})
+                indices.append(frame_index[frame])
+            samples.append(indices)
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.endpoint} ({self.request_id})",
+            "exporter": "petri-net-api",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": self.endpoint,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+
+def _frame_name(frame: Tuple[str, str, int]) -> str:
+    name, filename, line = frame
+    if not filename:
+        return name
+    short = "/".join(filename.replace("\\", "/").split("/")[-2:])
+    return f"{name} ({short}:{line})"
+
+
+class ProfileStore:
+    """Most recent profiles, oldest dropped first beyond the retention limit"""
+
+    def __init__(self, retention: int):
+        self._profiles: Deque[Profile] = deque(maxlen=retention)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [profile.summary() for profile in reversed(self._profiles)]
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        with self._lock:
+            return next((p for p in self._profiles if p.profile_id == profile_id), None)
+
+
+profile_store = ProfileStore(PROFILE_RETENTION)
+
+
+class RequestProfilingMiddleware:
+    """Sample the execution of requests that opt in with the profiling token
+
+    Only installed when PROFILING_TOKEN is set, so unprofiled deployments
+    pay nothing; with it set, other requests only cost a header lookup.
+    A request is profiled when it sets the profile query flag and presents
+    the token in the X-Profile-Token header or the profile_token query
+    parameter. Both parameters and the header are removed before the
+    request reaches the handlers. The profile spans the whole request
+    including a streamed response body, and its ID is returned in the
+    X-Profile-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Downloading a profile with the token must not record another one
+        if scope["type"] != "http" or scope["path"].startswith(ADMIN_PREFIX):
+            await self.app(scope, receive, send)
+            return
+        scope, requested = self._strip_profile_options(scope)
+        if not requested:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        request_id = headers.get(b"x-request-id", b"").decode("latin-1") or str(uuid.uuid4())
+        profile = Profile(request_id, f"{scope['method']} {scope['path']}", PROFILE_INTERVAL)
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                profile.input_bytes += len(message.get("body", b""))
+            return message
+
+        async def tagged_send(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {
+                    **message,
+                    "headers": [*message.get("headers", []), (b"x-profile-id", profile.profile_id.encode("ascii"))]
+                }
+            await send(message)
+
+        profiler = SamplingProfiler(profile, threading.get_ident(), sys._getframe(), PROFILE_INTERVAL)
+        token = _current_profile.set(profile)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, counting_receive, tagged_send)
+        finally:
+            profile.duration = time.perf_counter() - start
+            _current_profile.reset(token)
+            # Joining the sampler waits up to one interval, so not on the event loop
+            await run_in_threadpool(profiler.stop)
+            profile.samples = profiler.samples
+            profile_store.add(profile)
+
+    def _strip_profile_options(self, scope) -> Tuple[Dict[str, Any], bool]:
+        """Scope without the profiling parameters and header, and whether profiling was requested"""
+        header = PROFILE_HEADER.encode("ascii")
+        token = next((value.decode("latin-1") for name, value in scope["headers"] if name == header), None)
+        if token is not None:
+            scope = {**scope, "headers": [(name, value) for name, value in scope["headers"] if name != header]}
+        query_string = scope.get("query_string", b"")
+        if PROFILE_QUERY.encode("ascii") not in query_string:
+            return scope, False
+
+        query_string, params = _split_profile_params(query_string)
+        scope = {**scope, "query_string": query_string}
+        requested = PROFILE_QUERY in params and params[PROFILE_QUERY].lower() not in ("0", "false")
+        return scope, requested and _token_matches(token or params.get(PROFILE_TOKEN_QUERY))
+
+
+router = APIRouter(prefix=ADMIN_PREFIX, tags=["admin"])
+
+
+def _require_admin(request: Request) -> None:
+    """Allow only callers presenting the profiling token; hide the endpoints otherwise"""
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_TOKEN_QUERY)
+    if not _token_matches(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@router.get("/profiles")
+async def list_profiles(request: Request):
+    """List retained request profiles, newest first"""
+    _require_admin(request)
+    return {"retention": PROFILE_RETENTION, "profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, request: Request, format: str = "speedscope"):
+    """Download a request profile as speedscope JSON or collapsed stacks"""
+    _require_admin(request)
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported profile format: {format}")
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    if format == "collapsed":
+        return Response(
+            content=profile.collapsed(),
+            media_type="text/plain",
+            headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.txt"}
+        )
+    return Response(
+        content=json.dumps(profile.speedscope()),
+        media_type="application/json",
+        headers={"Content-Disposition": f"attachment; filename=profile_{profile_id}.speedscope.json"}
+    )
@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from .api.petri_net import router as petri_net_router
+from .api.limits import UploadSizeLimitMiddleware
+from .api.profiling import router as profiling_router, RequestProfilingMiddleware, profiling_enabled
 
 # Create FastAPI app
 app = FastAPI(
@@ -10,7 +12,15 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Configure CORS for development
+# Reject oversized uploads before their body is read
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Sample requests that opt in with the profiling token; not installed without one
+if profiling_enabled():
+    app.add_middleware(RequestProfilingMiddleware)
+
+# Configure CORS for development; added last so it wraps the middleware above
+# and their early responses (e.g. 413) carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],  # Vite dev server
@@ -21,6 +31,7 @@ app.add_middleware(
 
 # Include routers
 app.include_router(petri_net_router)
+app.include_router(profiling_router)
 
 @app.get("/")
 async def root():
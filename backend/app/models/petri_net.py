@@ -1,5 +1,42 @@
+import gc
+import threading
+from contextlib import contextmanager
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator
+
+# Allocations between young-generation collections while building large
+# nets; CPython's default threshold is 700
+BULK_GC_THRESHOLD = 100000
+
+_bulk_lock = threading.Lock()
+_bulk_depth = 0
+_bulk_gc_threshold = gc.get_threshold()
+
+@contextmanager
+def bulk_construction() -> Iterator[None]:
+    """Collect garbage less often while building many model objects
+    
+    Converted nets are acyclic, but allocating hundreds of thousands of
+    objects triggers repeated collections that cost more than the
+    construction itself. The thresholds are process-wide, so only wrap the
+    allocation loops themselves: collection is made rarer, never switched
+    off, and the previous threshold is restored on exit, exceptions
+    included. Nested and concurrent uses share one raised threshold, which
+    is restored when the last of them exits.
+    """
+    global _bulk_depth, _bulk_gc_threshold
+    with _bulk_lock:
+        if _bulk_depth == 0:
+            _bulk_gc_threshold = gc.get_threshold()
+            gc.set_threshold(max(BULK_GC_THRESHOLD, _bulk_gc_threshold[0]), *_bulk_gc_threshold[1:])
+        _bulk_depth += 1
+    try:
+        yield
+    finally:
+        with _bulk_lock:
+            _bulk_depth -= 1
+            if _bulk_depth == 0:
+                gc.set_threshold(*_bulk_gc_threshold)
 
 class Position(BaseModel):
     x: float
@@ -15,6 +52,7 @@ class NodeData(BaseModel):
     isFinalMarking: Optional[bool] = False
     isInvisible: Optional[bool] = False
     attachPoints: Optional[int] = 4  # Default 4 attach points (top, right, bottom, left)
+    performance: Optional[Dict[str, Any]] = None  # Log-derived frequency/timing overlay
 
 class Node(BaseModel):
     id: str
@@ -24,6 +62,7 @@ class Node(BaseModel):
 
 class EdgeData(BaseModel):
     weight: Optional[int] = 1
+    performance: Optional[Dict[str, Any]] = None  # Log-derived frequency/timing overlay
 
 class Edge(BaseModel):
     id: str
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Optional, Tuple, AsyncIterator
+from ..models.petri_net import PetriNetData
+from .pnml_writer import SUPPORTED_FORMATS
+
+# Formats accepted by the bulk export, mapped to the extension of each file
+BULK_EXPORT_FORMATS = {"pnml": "pnml", "apnml": "apnml", "csv": "csv"}
+
+# Per-process service instance, created on first use inside each worker
+_worker_service = None
+
+
+def _export_worker(petri_net_data: PetriNetData, file_format: str, config: Dict[str, Any]) -> bytes:
+    """Serialize one net inside a worker process"""
+    global _worker_service
+    if _worker_service is None:
+        from .pm4py_service import PM4PyService
+        _worker_service = PM4PyService()
+    if file_format in SUPPORTED_FORMATS:
+        return b"".join(_worker_service.pnml_writer.iter_pnml_bytes(petri_net_data, file_format))
+    return _worker_service.export_to_event_log(petri_net_data, config).encode("utf-8")
+
+
+class _ZipStream:
+    """Write-only file object collecting zip output until it is drained"""
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        self._buffer.extend(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class BulkExporter:
+    """Export many nets into one zip archive streamed as files finish
+
+    Each net is serialized in a process pool so all cores are used; at most
+    max_in_flight nets are submitted at once and every finished file is
+    compressed into the archive and yielded right away, so memory stays
+    bounded by the in-flight files rather than the whole export. The archive
+    ends with a manifest.json listing each file and any nets that failed.
+    A worker crash (e.g. the OOM killer on a huge net) fails the nets in
+    flight and replaces the pool, and closing the stream early cancels the
+    nets not yet started.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_in_flight = self.max_workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Shut down a pool broken by a crashed worker; the next use starts a fresh one"""
+        if self._pool is broken:
+            self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, loop: asyncio.AbstractEventLoop, fn, *args) -> Tuple[asyncio.Future, ProcessPoolExecutor]:
+        """Run fn in the pool, replacing the pool first if it is already broken"""
+        pool = self.pool
+        try:
+            return loop.run_in_executor(pool, fn, *args), pool
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self.pool
+            return loop.run_in_executor(pool, fn, *args), pool
+
+    async def iter_zip(
+        self,
+        nets: List[Tuple[str, PetriNetData]],
+        file_format: str,
+        config: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the zip archive in chunks, one or more per exported net
+
+        Deflating runs in the default thread pool, one file at a time, so
+        large files do not block the event loop while they are compressed.
+        """
+        loop = asyncio.get_running_loop()
+        extension = BULK_EXPORT_FORMATS[file_format]
+        stream = _ZipStream()
+        archive = zipfile.ZipFile(stream, mode="w", compression=zipfile.ZIP_DEFLATED)
+        manifest: Dict[str, Any] = {"format": file_format, "files": [], "errors": []}
+
+        queue = iter(nets)
+        pending: Dict[asyncio.Future, Tuple[str, PetriNetData, ProcessPoolExecutor]] = {}
+
+        def submit_next() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            future, pool = self._submit(loop, _export_worker, item[1], file_format, config or {})
+            pending[future] = (*item, pool)
+            return True
+
+        try:
+            while len(pending) < self.max_in_flight and submit_next():
+                pass
+
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    petri_net_id, petri_net_data, pool = pending.pop(future)
+                    try:
+                        content = future.result()
+                    except BrokenProcessPool:
+                        self._replace_pool(pool)
+                        manifest["errors"].append({"petri_net_id": petri_net_id, "error": "Export worker process died"})
+                    except Exception as e:
+                        manifest["errors"].append({"petri_net_id": petri_net_id, "error": str(e)})
+                    else:
+                        filename = f"{petri_net_id}.{extension}"
+                        await loop.run_in_executor(None, archive.writestr, _zip_info(filename), content)
+                        manifest["files"].append({
+                            "petri_net_id": petri_net_id,
+                            "name": petri_net_data.networkName or petri_net_data.networkId,
+                            "file": filename,
+                            "size": len(content)
+                        })
+                    submit_next()
+                yield stream.drain()
+        finally:
+            # The client went away (or an error occurred): drop work not yet started
+            for future in pending:
+                future.cancel()
+
+        await loop.run_in_executor(None, archive.writestr, _zip_info("manifest.json"), json.dumps(manifest, indent=2))
+        await loop.run_in_executor(None, archive.close)
+        yield stream.drain()
+
+
+def _zip_info(filename: str) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
@@ -0,0 +1,274 @@
+from typing import Dict, List, Any, Iterable, Optional
+from collections import Counter
+from ..models.petri_net import PetriNetData
+from .fingerprint_service import transition_label
+
+# Passes of local moving per level; each pass visits every node once
+MAX_LOCAL_MOVING_PASSES = 16
+# Activity labels listed in a cluster's summary label
+CLUSTER_LABEL_ACTIVITIES = 3
+
+
+def _louvain_level(adjacency: List[Dict[int, float]], self_loops: List[float]) -> List[int]:
+    """One level of Louvain modularity optimisation, returning a community per node
+
+    Nodes are visited in index order and ties keep the current community, so
+    the result is deterministic for a given graph.
+    """
+    n = len(adjacency)
+    degrees = [sum(neighbours.values()) + 2 * self_loops[i] for i, neighbours in enumerate(adjacency)]
+    total = sum(degrees)
+    community = list(range(n))
+    if total == 0:
+        return community
+    community_degree = degrees[:]
+
+    for _ in range(MAX_LOCAL_MOVING_PASSES):
+        moved = False
+        for i in range(n):
+            current = community[i]
+            links: Dict[int, float] = {}
+            for j, weight in adjacency[i].items():
+                links[community[j]] = links.get(community[j], 0.0) + weight
+
+            community_degree[current] -= degrees[i]
+            best = current
+            best_gain = links.get(current, 0.0) - community_degree[current] * degrees[i] / total
+            for candidate in sorted(links):
+                gain = links[candidate] - community_degree[candidate] * degrees[i] / total
+                if gain > best_gain + 1e-12:
+                    best, best_gain = candidate, gain
+            community_degree[best] += degrees[i]
+            if best != current:
+                community[i] = best
+                moved = True
+        if not moved:
+            break
+
+    # Renumber communities densely in order of first appearance
+    renumbered: Dict[int, int] = {}
+    return [renumbered.setdefault(c, len(renumbered)) for c in community]
+
+
+class ClusterHierarchy:
+    """Multi-level hierarchy of subnets for a large Petri net
+
+    Built once per net by repeated Louvain community detection on the
+    undirected arc graph: each level groups the clusters of the level below,
+    so clusters nest and the top level is the coarsest view. Level 0 is the
+    net itself. A view at any level replaces every cluster by a single node
+    and aggregates arcs crossing cluster boundaries; individual clusters can
+    be expanded into their children on demand.
+    """
+
+    def __init__(self, petri_net_data: PetriNetData):
+        self.petri_net_data = petri_net_data
+        self.nodes = {node.id: node for node in petri_net_data.nodes}
+        node_ids = sorted(self.nodes)
+        index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        adjacency: List[Dict[int, float]] = [{} for _ in node_ids]
+        self_loops = [0.0] * len(node_ids)
+        for edge in petri_net_data.edges:
+            if edge.source in index and edge.target in index:
+                s, t = index[edge.source], index[edge.target]
+                if s == t:
+                    self_loops[s] += 1.0
+                else:
+                    adjacency[s][t] = adjacency[s].get(t, 0.0) + 1.0
+                    adjacency[t][s] = adjacency[t].get(s, 0.0) + 1.0
+
+        # clusters[level] maps cluster ID -> child IDs (node IDs at level 1)
+        self.clusters: List[Dict[str, List[str]]] = [{}]
+        self.parent: Dict[str, str] = {}
+        self.cluster_level: Dict[str, int] = {}
+        current_ids = node_ids
+        while len(current_ids) > 1:
+            community = _louvain_level(adjacency, self_loops)
+            n_communities = max(community) + 1
+            if n_communities == len(current_ids):
+                break
+
+            level = len(self.clusters)
+            cluster_ids = [f"cluster_{level}_{c}" for c in range(n_communities)]
+            children: Dict[str, List[str]] = {cluster_id: [] for cluster_id in cluster_ids}
+            for i, c in enumerate(community):
+                children[cluster_ids[c]].append(current_ids[i])
+                self.parent[current_ids[i]] = cluster_ids[c]
+            self.cluster_level.update((cluster_id, level) for cluster_id in cluster_ids)
+            self.clusters.append(children)
+
+            # Aggregate the graph: internal arcs become self loops
+            next_adjacency: List[Dict[int, float]] = [{} for _ in range(n_communities)]
+            next_self_loops = [0.0] * n_communities
+            for i, neighbours in enumerate(adjacency):
+                ci = community[i]
+                next_self_loops[ci] += self_loops[i]
+                for j, weight in neighbours.items():
+                    cj = community[j]
+                    if ci == cj:
+                        next_self_loops[ci] += weight / 2
+                    else:
+                        next_adjacency[ci][cj] = next_adjacency[ci].get(cj, 0.0) + weight
+            adjacency, self_loops, current_ids = next_adjacency, next_self_loops, cluster_ids
+
+        self._members: Dict[str, List[str]] = {}
+
+    def rebind(self, petri_net_data: PetriNetData, mapping: Dict[str, str]) -> "ClusterHierarchy":
+        """Same hierarchy over a structurally identical net
+
+        mapping takes this hierarchy's node IDs to petri_net_data's. Only the
+        first level holds node IDs; cluster IDs and the levels above are kept.
+        """
+        hierarchy = ClusterHierarchy.__new__(ClusterHierarchy)
+        hierarchy.petri_net_data = petri_net_data
+        hierarchy.nodes = {node.id: node for node in petri_net_data.nodes}
+        hierarchy.clusters = list(self.clusters)
+        if self.levels:
+            hierarchy.clusters[1] = {
+                cluster_id: [mapping[node_id] for node_id in children]
+                for cluster_id, children in self.clusters[1].items()
+            }
+        hierarchy.parent = {
+            (mapping[element_id] if element_id in self.nodes else element_id): cluster_id
+            for element_id, cluster_id in self.parent.items()
+        }
+        hierarchy.cluster_level = self.cluster_level
+        hierarchy._members = {}
+        return hierarchy
+
+    @property
+    def levels(self) -> int:
+        """Number of levels above the flat net"""
+        return len(self.clusters) - 1
+
+    def level_of(self, element_id: str) -> Optional[int]:
+        """Level of a cluster ID (0 for net nodes), None if unknown"""
+        if element_id in self.nodes:
+            return 0
+        return self.cluster_level.get(element_id)
+
+    def members(self, cluster_id: str) -> List[str]:
+        """Net node IDs contained in a cluster"""
+        if cluster_id not in self._members:
+            level = self.level_of(cluster_id)
+            if level == 0:
+                return [cluster_id]
+            result: List[str] = []
+            for child in self.clusters[level][cluster_id]:
+                result.extend(self.members(child))
+            self._members[cluster_id] = result
+        return self._members[cluster_id]
+
+    def summary(self) -> Dict[str, Any]:
+        """Number of clusters per level"""
+        return {
+            "levels": self.levels,
+            "nodes": len(self.nodes),
+            "clusters_per_level": [len(self.nodes)] + [len(c) for c in self.clusters[1:]]
+        }
+
+    def view(self, level: int, expand: Iterable[str] = ()) -> Dict[str, Any]:
+        """Net at a level of detail, with the given clusters opened one level down
+
+        Expanding a cluster that is not visible (e.g. one nested inside a
+        collapsed cluster) expands its ancestors as well. Visible net nodes
+        and arcs are the net's own models; clusters and aggregated arcs are
+        plain dicts.
+        """
+        level = max(0, min(level, self.levels))
+        expanded = set()
+        for cluster_id in expand:
+            while cluster_id is not None and cluster_id not in self.nodes:
+                expanded.add(cluster_id)
+                cluster_id = self.parent.get(cluster_id)
+
+        # Walk down from the top level, opening every cluster below the chosen
+        # level or explicitly expanded
+        visible: List[str] = []
+        stack = sorted(self.clusters[-1]) if self.levels else sorted(self.nodes)
+        while stack:
+            element_id = stack.pop()
+            element_level = self.level_of(element_id)
+            if element_level > level or (element_level > 0 and element_id in expanded):
+                stack.extend(self.clusters[element_level][element_id])
+            else:
+                visible.append(element_id)
+
+        owner: Dict[str, str] = {}
+        for element_id in visible:
+            for node_id in self.members(element_id):
+                owner[node_id] = element_id
+
+        nodes: List[Any] = []
+        for element_id in sorted(visible):
+            if element_id in self.nodes:
+                nodes.append(self.nodes[element_id])
+            else:
+                nodes.append(self._cluster_node(element_id))
+
+        edges: List[Any] = []
+        aggregated: Dict[tuple, Dict[str, Any]] = {}
+        for edge in self.petri_net_data.edges:
+            if edge.source not in owner or edge.target not in owner:
+                continue
+            source, target = owner[edge.source], owner[edge.target]
+            if source == edge.source and target == edge.target:
+                edges.append(edge)
+                continue
+            if source == target:
+                continue
+            weight = edge.data.weight if edge.data and edge.data.weight else 1
+            key = (source, target)
+            if key not in aggregated:
+                aggregated[key] = {
+                    "id": f"{source}->{target}",
+                    "source": source,
+                    "target": target,
+                    "data": {"weight": 0, "arcs": 0, "aggregated": True}
+                }
+            aggregated[key]["data"]["weight"] += weight
+            aggregated[key]["data"]["arcs"] += 1
+        edges.extend(aggregated[key] for key in sorted(aggregated))
+
+        return {
+            "level": level,
+            "levels": self.levels,
+            "expanded": sorted(expanded),
+            "nodes": nodes,
+            "edges": edges
+        }
+
+    def _cluster_node(self, cluster_id: str) -> Dict[str, Any]:
+        """Single node standing for a collapsed cluster"""
+        member_nodes = [self.nodes[node_id] for node_id in self.members(cluster_id)]
+        places = sum(1 for node in member_nodes if node.type == "place")
+        activities = Counter(
+            label for label in (transition_label(node) for node in member_nodes if node.type == "transition")
+            if label
+        )
+        names = [label for label, _ in sorted(activities.items(), key=lambda item: (-item[1], item[0]))]
+        label = ", ".join(names[:CLUSTER_LABEL_ACTIVITIES]) or f"{len(member_nodes)} elements"
+        if len(names) > CLUSTER_LABEL_ACTIVITIES:
+            label += ", ..."
+
+        return {
+            "id": cluster_id,
+            "type": "cluster",
+            "position": {
+                "x": sum(node.position.x for node in member_nodes) / len(member_nodes),
+                "y": sum(node.position.y for node in member_nodes) / len(member_nodes)
+            },
+            "data": {
+                "id": cluster_id,
+                "type": "cluster",
+                "label": label,
+                "level": self.level_of(cluster_id),
+                "children": list(self.clusters[self.level_of(cluster_id)][cluster_id]),
+                "size": len(member_nodes),
+                "places": places,
+                "transitions": len(member_nodes) - places,
+                "initialTokens": sum(node.data.tokens or 0 for node in member_nodes if node.type == "place"),
+                "hasFinalMarking": any(node.data.isFinalMarking for node in member_nodes if node.type == "place")
+            }
+        }
@@ -0,0 +1,273 @@
+from typing import Dict, List, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+CASE_KEY = "case:concept:name"
+ACTIVITY_KEY = "concept:name"
+TIMESTAMP_KEY = "time:timestamp"
+RESOURCE_KEY = "org:resource"
+
+# Missing timestamp marker in int64 nanosecond arrays
+NAT = np.iinfo(np.int64).min
+
+
+class EncodedEventLog:
+    """Event log held as integer codes into shared string dictionaries
+
+    Case IDs, activities and resources are int32 codes into sorted pd.Index
+    dictionaries and timestamps are int64 nanoseconds since the epoch (UTC),
+    parsed once when the log is read. Events are grouped by case and ordered
+    by time within each case, the order PM4Py's format_dataframe produces, so
+    statistics, variants and directly-follows counts work on contiguous case
+    slices of the code arrays. String columns are only materialized when a
+    DataFrame is needed for PM4Py discovery.
+    """
+
+    def __init__(
+        self,
+        case_codes: np.ndarray,
+        case_ids: pd.Index,
+        activity_codes: np.ndarray,
+        activities: pd.Index,
+        timestamps: np.ndarray,
+        resource_codes: Optional[np.ndarray] = None,
+        resources: Optional[pd.Index] = None,
+        sorted_by_case: bool = False
+    ):
+        if not sorted_by_case:
+            # Stable, so events with equal timestamps keep their input order
+            order = np.lexsort((timestamps, case_codes))
+            case_codes, activity_codes, timestamps = case_codes[order], activity_codes[order], timestamps[order]
+            if resource_codes is not None:
+                resource_codes = resource_codes[order]
+        self.case_codes = case_codes
+        self.case_ids = case_ids
+        self.activity_codes = activity_codes
+        self.activities = activities
+        self.timestamps = timestamps
+        self.resource_codes = resource_codes
+        self.resources = resources
+        self._case_bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_frame(
+        cls,
+        df: pd.DataFrame,
+        case_column: str,
+        activity_column: str,
+        timestamp_column: str,
+        resource_column: Optional[str] = None
+    ) -> "EncodedEventLog":
+        """Encode the configured columns of a raw event DataFrame
+
+        Rows missing a case ID, activity or timestamp are dropped, as PM4Py
+        would drop them.
+        """
+        case_codes, case_ids = _encode(df[case_column])
+        activity_codes, activities = _encode(df[activity_column])
+        timestamps = _timestamps_ns(df[timestamp_column])
+        resource_codes, resources = _encode(df[resource_column]) if resource_column else (None, None)
+
+        valid = (case_codes >= 0) & (activity_codes >= 0) & (timestamps != NAT)
+        if valid.all():
+            return cls(case_codes, case_ids, activity_codes, activities, timestamps, resource_codes, resources)
+        log = cls(case_codes[valid], case_ids, activity_codes[valid], activities, timestamps[valid],
+                  resource_codes[valid] if resource_codes is not None else None, resources)
+        return log.compact()
+
+    @classmethod
+    def concat(cls, logs: List["EncodedEventLog"]) -> "EncodedEventLog":
+        """Merge logs into one, re-encoding their codes into merged dictionaries"""
+        case_codes, case_ids = _merge_codes([(log.case_codes, log.case_ids) for log in logs])
+        activity_codes, activities = _merge_codes([(log.activity_codes, log.activities) for log in logs])
+        timestamps = np.concatenate([log.timestamps for log in logs])
+        resource_codes, resources = None, None
+        if all(log.resource_codes is not None for log in logs):
+            resource_codes, resources = _merge_codes([(log.resource_codes, log.resources) for log in logs])
+        return cls(case_codes, case_ids, activity_codes, activities, timestamps, resource_codes, resources)
+
+    def __len__(self) -> int:
+        return len(self.case_codes)
+
+    @property
+    def n_cases(self) -> int:
+        return len(self.case_ids)
+
+    def case_bounds(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Start and end (exclusive) offsets of every case in the event arrays"""
+        if self._case_bounds is None:
+            n_events = len(self)
+            if n_events:
+                starts = np.flatnonzero(np.r_[True, self.case_codes[1:] != self.case_codes[:-1]])
+                ends = np.r_[starts[1:], n_events].astype(np.int64)
+            else:
+                starts = ends = np.array([], dtype=np.int64)
+            self._case_bounds = (starts, ends)
+        return self._case_bounds
+
+    def take(self, mask: np.ndarray) -> "EncodedEventLog":
+        """Events selected by a boolean mask, with unused dictionary entries dropped"""
+        log = EncodedEventLog(
+            self.case_codes[mask], self.case_ids,
+            self.activity_codes[mask], self.activities,
+            self.timestamps[mask],
+            self.resource_codes[mask] if self.resource_codes is not None else None, self.resources,
+            sorted_by_case=True
+        )
+        return log.compact()
+
+    def compact(self) -> "EncodedEventLog":
+        """Drop dictionary entries no event refers to, keeping the dictionaries sorted"""
+        self.case_codes, self.case_ids = _compact(self.case_codes, self.case_ids)
+        self.activity_codes, self.activities = _compact(self.activity_codes, self.activities)
+        if self.resource_codes is not None:
+            self.resource_codes, self.resources = _compact(self.resource_codes, self.resources)
+        return self
+
+    def activity_counts(self) -> Dict[str, int]:
+        """Number of events per activity"""
+        return _counts(self.activity_codes, self.activities)
+
+    def start_activity_counts(self) -> Dict[str, int]:
+        starts, _ = self.case_bounds()
+        return _counts(self.activity_codes[starts], self.activities)
+
+    def end_activity_counts(self) -> Dict[str, int]:
+        _, ends = self.case_bounds()
+        return _counts(self.activity_codes[ends - 1], self.activities)
+
+    def directly_follows_counts(self) -> Dict[Tuple[str, str], int]:
+        """Number of times each activity is directly followed by another within a case"""
+        same_case = self.case_codes[1:] == self.case_codes[:-1]
+        width = len(self.activities)
+        keys = self.activity_codes[:-1][same_case].astype(np.int64) * width + self.activity_codes[1:][same_case]
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        names = np.asarray(self.activities, dtype=object)
+        return {
+            (names[key // width], names[key % width]): int(count)
+            for key, count in zip(unique_keys.tolist(), counts.tolist())
+        }
+
+    def statistics(self) -> Dict[str, Any]:
+        """Log statistics, in the shape returned by event log import"""
+        return {
+            "total_traces": self.n_cases,
+            "total_events": len(self),
+            "unique_activities": len(self.activities)
+        }
+
+    def to_frame(self) -> pd.DataFrame:
+        """PM4Py-formatted DataFrame with string case, activity and resource columns"""
+        columns = {
+            CASE_KEY: _decode(self.case_codes, self.case_ids),
+            ACTIVITY_KEY: _decode(self.activity_codes, self.activities),
+            TIMESTAMP_KEY: pd.to_datetime(self.timestamps, utc=True)
+        }
+        if self.resource_codes is not None:
+            columns[RESOURCE_KEY] = _decode(self.resource_codes, self.resources)
+        return pd.DataFrame(columns)
+
+
+def _encode(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """int32 codes into a sorted string dictionary, -1 for missing values"""
+    codes, uniques = pd.factorize(values)
+    if len(uniques) == 0:
+        return codes.astype(np.int32), pd.Index([], dtype=object)
+    # Values equal as strings (e.g. 1 and "1") share one dictionary entry
+    dictionary_codes, dictionary = pd.factorize(pd.Index(uniques).astype(str), sort=True)
+    codes = np.where(codes >= 0, dictionary_codes[codes], -1).astype(np.int32)
+    return codes, pd.Index(dictionary, dtype=object)
+
+
+def _timestamps_ns(values: pd.Series) -> np.ndarray:
+    """Timestamps as int64 UTC nanoseconds, parsed only if not already datetimes
+
+    The format is inferred from the first value and applied to the whole
+    column in one vectorized pass; only columns that do not share one format
+    (or hold unparseable values, which become NaT) fall back to parsing each
+    value on its own, which is an order of magnitude slower.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(values):
+        try:
+            values = pd.to_datetime(values, utc=True)
+        except (ValueError, TypeError):
+            values = pd.to_datetime(values, format="mixed", utc=True, errors="coerce")
+    elif values.dt.tz is None:
+        values = values.dt.tz_localize("UTC")
+    return values.dt.tz_convert("UTC").astype("datetime64[ns, UTC]").array.asi8
+
+
+def _compact(codes: np.ndarray, dictionary: pd.Index) -> Tuple[np.ndarray, pd.Index]:
+    used = np.bincount(codes, minlength=len(dictionary)) > 0
+    if used.all():
+        return codes, dictionary
+    remap = np.cumsum(used, dtype=np.int32) - 1
+    return remap[codes], dictionary[used]
+
+
+def _merge_codes(parts: List[Tuple[np.ndarray, pd.Index]]) -> Tuple[np.ndarray, pd.Index]:
+    dictionary = pd.Index(np.concatenate([np.asarray(d, dtype=object) for _, d in parts])).unique().sort_values()
+    codes = [dictionary.get_indexer(d).astype(np.int32)[c] for c, d in parts]
+    return np.concatenate(codes), dictionary
+
+
+def _counts(codes: np.ndarray, dictionary: pd.Index) -> Dict[str, int]:
+    counts = np.bincount(codes, minlength=len(dictionary))
+    return {name: int(count) for name, count in zip(dictionary, counts.tolist()) if count}
+
+
+def _decode(codes: np.ndarray, dictionary: pd.Index) -> np.ndarray:
+    return np.asarray(dictionary, dtype=object)[codes]
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, spreading integers over 64-bit hashes"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def sequence_groups(codes: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Group equal slices of codes, e.g. the activity sequences of cases
+
+    The slices codes[start:end] must be non-empty and partition codes, as
+    the case bounds of a log do. Returns the group of every slice, numbered
+    in order of first occurrence, and the first slice of every group.
+    Slices are hashed position by position and summed per slice in a few
+    vectorized passes; the grouping is then checked element by element
+    against each group's first slice, falling back to grouping by the
+    slices' bytes on a hash collision.
+    """
+    n_slices = len(starts)
+    if n_slices == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    lengths = ends - starts
+    slice_of = np.repeat(np.arange(n_slices), lengths)
+    positions = np.arange(len(codes)) - starts[slice_of]
+    code_hashes = _mix(np.arange(int(codes.max()) + 1, dtype=np.uint64))
+    position_hashes = _mix(_mix(np.arange(int(lengths.max()), dtype=np.uint64)))
+    hashes = _mix(code_hashes[codes] ^ position_hashes[positions])
+    keys = _mix(np.add.reduceat(hashes, starts) ^ _mix(lengths.astype(np.uint64)))
+
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    # Number groups by their first slice rather than by hash
+    by_occurrence = np.argsort(first, kind="stable")
+    rank = np.empty(len(first), dtype=np.int64)
+    rank[by_occurrence] = np.arange(len(first))
+    groups, first = rank[inverse], first[by_occurrence]
+
+    representative = first[groups]
+    if np.array_equal(lengths[representative], lengths):
+        if np.array_equal(codes[starts[representative][slice_of] + positions], codes):
+            return groups, first
+
+    group_ids: Dict[bytes, int] = {}
+    first_slices: List[int] = []
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        key = codes[start:end].tobytes()
+        if key not in group_ids:
+            group_ids[key] = len(first_slices)
+            first_slices.append(i)
+        groups[i] = group_ids[key]
+    return groups, np.array(first_slices, dtype=np.int64)
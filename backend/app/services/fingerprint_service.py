@@ -0,0 +1,211 @@
+import hashlib
+import json
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+from ..models.petri_net import PetriNetData, Node, Edge
+
+# Refinement stops earlier once the colour partition is stable
+MAX_REFINEMENT_ROUNDS = 32
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, used to hash colours to well-spread 64-bit values"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def transition_label(node: Node) -> Optional[str]:
+    """Activity label of a transition, None for invisible ones
+
+    Discovered nets carry the activity in data.label, whereas nets parsed from
+    PNML use data.label for the element ID and data.name for the activity.
+    """
+    if node.data.isInvisible:
+        return None
+    if node.data.label and node.data.label != node.id:
+        return node.data.label
+    return node.data.name
+
+
+def _node_key(node: Node) -> str:
+    """Structural identity of a node, shared by isomorphic copies"""
+    if node.type == "place":
+        return f"place|{node.data.tokens or 0}|{bool(node.data.isFinalMarking)}"
+    return f"transition|{transition_label(node)}"
+
+
+def _arc_weight(edge: Edge) -> int:
+    return edge.data.weight if edge.data and edge.data.weight else 1
+
+
+def net_fingerprint(petri_net_data: PetriNetData) -> str:
+    """Canonical structural hash of a Petri net
+
+    Element IDs, place names and element ordering are ignored; transition
+    labels, arc structure and weights, and initial/final markings are not.
+    Node colours are refined Weisfeiler-Lehman style from their pre/post
+    neighbourhoods and the sorted multiset of final colours is hashed.
+    Colours are 64-bit hashes and each neighbourhood multiset is the sum of
+    its members' hashes, so every round is a few vectorized passes.
+    """
+    return canonical_form(petri_net_data)[0]
+
+
+def canonical_form(petri_net_data: PetriNetData) -> Tuple[str, Optional[List[str]]]:
+    """Fingerprint of a net and its canonical node order, if it has one
+
+    The order lists node IDs by final colour and only exists when every
+    node ends up with a distinct colour; two nets with the same fingerprint
+    then correspond node by node in this order (see node_correspondence).
+    Nets with structural symmetries, e.g. parallel copies of a branch, have
+    no canonical order.
+    """
+    index: Dict[str, int] = {}
+    node_ids: List[str] = []
+    initial: List[int] = []
+    initial_colours: Dict[str, int] = {}
+    for node in petri_net_data.nodes:
+        index[node.id] = len(initial)
+        node_ids.append(node.id)
+        key = _node_key(node)
+        if key not in initial_colours:
+            initial_colours[key] = int(_digest(key)[:16], 16)
+        initial.append(initial_colours[key])
+    colours = np.array(initial, dtype=np.uint64)
+
+    sources, targets, weights = [], [], []
+    for edge in petri_net_data.edges:
+        if edge.source in index and edge.target in index:
+            sources.append(index[edge.source])
+            targets.append(index[edge.target])
+            weights.append(_arc_weight(edge))
+    sources = np.array(sources, dtype=np.int64)
+    targets = np.array(targets, dtype=np.int64)
+    weight_hashes = _mix(np.array(weights, dtype=np.uint64))
+
+    distinct = len(np.unique(colours))
+    for _ in range(MAX_REFINEMENT_ROUNDS):
+        incoming = np.zeros(len(colours), dtype=np.uint64)
+        outgoing = np.zeros(len(colours), dtype=np.uint64)
+        np.add.at(incoming, targets, _mix(colours[sources] ^ weight_hashes))
+        np.add.at(outgoing, sources, _mix(colours[targets] ^ weight_hashes))
+        colours = _mix(colours ^ _mix(incoming) ^ _mix(_mix(outgoing)))
+        refined_distinct = len(np.unique(colours))
+        if refined_distinct == distinct:
+            break
+        distinct = refined_distinct
+
+    order = np.argsort(colours, kind="stable")
+    summary = f"{len(colours)}|{len(petri_net_data.edges)}|".encode("utf-8") + colours[order].tobytes()
+    canonical_order = [node_ids[i] for i in order] if distinct == len(colours) else None
+    return hashlib.sha256(summary).hexdigest(), canonical_order
+
+
+def structural_network_id(fingerprint: str) -> str:
+    """Network ID of a discovered net, the same for structurally identical nets"""
+    return f"net_{fingerprint[:16]}"
+
+
+def node_correspondence(
+    source: PetriNetData,
+    source_order: Optional[List[str]],
+    target: PetriNetData,
+    target_order: Optional[List[str]]
+) -> Optional[Dict[str, str]]:
+    """Map source node IDs to target node IDs of a structurally identical net
+
+    Pairs the canonical orders of two nets with the same fingerprint and
+    checks the result node by node and arc by arc, so a hash collision can
+    never yield a wrong mapping. None if either net has no canonical order
+    or the nets turn out to differ.
+    """
+    if source_order is None or target_order is None or len(source_order) != len(target_order):
+        return None
+    mapping = dict(zip(source_order, target_order))
+    target_nodes = {node.id: node for node in target.nodes}
+    if len(mapping) != len(source.nodes) or len(target_nodes) != len(target.nodes):
+        return None
+    for node in source.nodes:
+        counterpart = target_nodes.get(mapping.get(node.id))
+        if counterpart is None or _node_key(counterpart) != _node_key(node):
+            return None
+
+    source_arcs = Counter(
+        (mapping[edge.source], mapping[edge.target], _arc_weight(edge))
+        for edge in source.edges if edge.source in mapping and edge.target in mapping
+    )
+    target_arcs = Counter(
+        (edge.source, edge.target, _arc_weight(edge))
+        for edge in target.edges if edge.source in target_nodes and edge.target in target_nodes
+    )
+    return mapping if source_arcs == target_arcs else None
+
+
+def _content_key(petri_net_data: PetriNetData) -> str:
+    """Serialized content of a net, independent of node and edge ordering"""
+    content = petri_net_data.model_dump()
+    content["nodes"] = sorted(content["nodes"], key=lambda n: n["id"])
+    content["edges"] = sorted(content["edges"], key=lambda e: e["id"])
+    return json.dumps(content, sort_keys=True, default=str)
+
+
+def find_exact_duplicate(petri_net_data: PetriNetData, candidates: List[PetriNetData]) -> Optional[PetriNetData]:
+    """Candidate with content identical to the net, if any
+
+    Serializing a large net takes a while, so this runs in a worker thread
+    and only for candidates, i.e. stored nets with the same fingerprint.
+    """
+    if not candidates:
+        return None
+    content = _content_key(petri_net_data)
+    compared: Set[int] = set()
+    for candidate in candidates:
+        # IDs sharing one stored object only need one comparison
+        if id(candidate) in compared:
+            continue
+        compared.add(id(candidate))
+        if _content_key(candidate) == content:
+            return candidate
+    return None
+
+
+class FingerprintIndex:
+    """Fingerprint lookup for stored nets
+
+    Keeps the canonical node order of every stored net next to its
+    fingerprint, so analyses can be shared between structurally identical
+    nets without refining their colours again.
+    """
+
+    def __init__(self):
+        self.fingerprints: Dict[str, str] = {}
+        self.canonical_orders: Dict[str, Optional[List[str]]] = {}
+        self.nets_by_fingerprint: Dict[str, Set[str]] = {}
+
+    def add(self, petri_net_id: str, fingerprint: str, canonical_order: Optional[List[str]] = None) -> None:
+        """Register a stored net"""
+        self.fingerprints[petri_net_id] = fingerprint
+        self.canonical_orders[petri_net_id] = canonical_order
+        self.nets_by_fingerprint.setdefault(fingerprint, set()).add(petri_net_id)
+
+    def remove(self, petri_net_id: str) -> None:
+        """Unregister a stored net that was replaced or deleted"""
+        if petri_net_id not in self.fingerprints:
+            return
+        fingerprint = self.fingerprints.pop(petri_net_id)
+        self.canonical_orders.pop(petri_net_id, None)
+        nets = self.nets_by_fingerprint[fingerprint]
+        nets.discard(petri_net_id)
+        if not nets:
+            del self.nets_by_fingerprint[fingerprint]
+
+    def lookup(self, fingerprint: str) -> List[str]:
+        """Stored net IDs with the given fingerprint"""
+        return sorted(self.nets_by_fingerprint.get(fingerprint, ()))
@@ -0,0 +1,134 @@
+from typing import Dict, List, Any, Tuple
+from .encoded_log import EncodedEventLog
+
+
+class IncrementalLogState:
+    """Directly-follows counts and activity statistics of a growing event log
+
+    The state is built once from the full log; afterwards append() only looks
+    at the new events and at the last known event of each case they continue,
+    so its cost is proportional to the batch size. append() reports whether
+    the batch introduced structure (activities, directly-follows pairs, start
+    or end activities) that a previously discovered model cannot know about.
+    """
+
+    def __init__(self, log: EncodedEventLog):
+        self.total_events = len(log)
+        self.activity_counts: Dict[str, int] = log.activity_counts()
+        self.dfg: Dict[Tuple[str, str], int] = log.directly_follows_counts()
+        self.start_activities: Dict[str, int] = log.start_activity_counts()
+        self.end_activities: Dict[str, int] = log.end_activity_counts()
+        # Last activity and timestamp (UTC nanoseconds) of every case
+        self.last_events: Dict[str, Tuple[str, int]] = dict(_case_events(log, first=False))
+
+    @property
+    def total_traces(self) -> int:
+        return len(self.last_events)
+
+    def statistics(self) -> Dict[str, Any]:
+        """Current log statistics, in the shape returned by event log import"""
+        return {
+            "total_traces": self.total_traces,
+            "total_events": self.total_events,
+            "unique_activities": len(self.activity_counts)
+        }
+
+    def structure_changes(self, other: "IncrementalLogState") -> Dict[str, Any]:
+        """Structure another state of the log gained or lost relative to this one"""
+        changes = {}
+        for name, before, after in (
+            ("activities", self.activity_counts, other.activity_counts),
+            ("directly_follows", self.dfg, other.dfg),
+            ("start_activities", self.start_activities, other.start_activities),
+            ("end_activities", self.end_activities, other.end_activities)
+        ):
+            changes[f"new_{name}"] = [_listed(key) for key in after if key not in before]
+            changes[f"removed_{name}"] = [_listed(key) for key in before if key not in after]
+        changes["structure_changed"] = any(changes.values())
+        return changes
+
+    def append(self, batch: EncodedEventLog) -> Dict[str, Any]:
+        """Fold a batch of new events into the state and describe what changed"""
+        new_activities: List[str] = []
+        new_pairs: List[Tuple[str, str]] = []
+        new_start: List[str] = []
+        new_end: List[str] = []
+        removed_end: List[str] = []
+        out_of_order = 0
+        new_cases = 0
+
+        for activity, count in batch.activity_counts().items():
+            if activity not in self.activity_counts:
+                new_activities.append(activity)
+                self.activity_counts[activity] = 0
+            self.activity_counts[activity] += count
+
+        # Pairs inside the batch
+        pair_counts = batch.directly_follows_counts()
+
+        # Pairs linking each continued case to its previously last event
+        for case_id, (activity, timestamp) in _case_events(batch, first=True):
+            previous = self.last_events.get(case_id)
+            if previous is None:
+                new_cases += 1
+                if activity not in self.start_activities:
+                    new_start.append(activity)
+                    self.start_activities[activity] = 0
+                self.start_activities[activity] += 1
+                continue
+            previous_activity, previous_timestamp = previous
+            if timestamp < previous_timestamp:
+                out_of_order += 1
+            key = (previous_activity, activity)
+            pair_counts[key] = pair_counts.get(key, 0) + 1
+            # The case continues, so its old last activity is no longer an end activity
+            self.end_activities[previous_activity] -= 1
+            if self.end_activities[previous_activity] == 0:
+                del self.end_activities[previous_activity]
+                removed_end.append(previous_activity)
+
+        for key, count in pair_counts.items():
+            if key not in self.dfg:
+                new_pairs.append(key)
+                self.dfg[key] = 0
+            self.dfg[key] += count
+
+        for case_id, (activity, timestamp) in _case_events(batch, first=False):
+            self.last_events[case_id] = (activity, timestamp)
+            if activity not in self.end_activities:
+                new_end.append(activity)
+                self.end_activities[activity] = 0
+            self.end_activities[activity] += 1
+        # An end activity that was removed and re-added is not a change
+        re_added = set(removed_end) & set(self.end_activities)
+        removed_end = [a for a in removed_end if a not in re_added]
+        new_end = [a for a in new_end if a not in re_added]
+
+        self.total_events += len(batch)
+
+        return {
+            "new_events": len(batch),
+            "new_cases": new_cases,
+            "out_of_order_events": out_of_order,
+            "new_activities": new_activities,
+            "new_directly_follows": [list(pair) for pair in new_pairs],
+            "new_start_activities": new_start,
+            "new_end_activities": new_end,
+            "removed_end_activities": removed_end,
+            "structure_changed": bool(new_activities or new_pairs or new_start or new_end or removed_end)
+        }
+
+
+def _listed(key: Any) -> Any:
+    """Directly-follows pairs as lists, as in append()'s report"""
+    return list(key) if isinstance(key, tuple) else key
+
+
+def _case_events(log: EncodedEventLog, first: bool) -> zip:
+    """(case ID, (activity, timestamp)) of the first or last event of every case"""
+    starts, ends = log.case_bounds()
+    events = starts if first else ends - 1
+    return zip(
+        log.case_ids[log.case_codes[events]],
+        zip(log.activities[log.activity_codes[events]], log.timestamps[events].tolist())
+    )
@@ -0,0 +1,159 @@
+from typing import Dict, List, Any, Optional
+import numpy as np
+import pandas as pd
+from .encoded_log import EncodedEventLog, sequence_groups
+
+FILTER_TYPES = ("time_window", "top_k_variants", "cases_containing", "remove_rare_activities")
+TIME_WINDOW_MODES = ("events", "contained", "intersecting")
+
+
+class EventLogFilterChain:
+    """Declarative filter chain applied to an event log in one pass
+
+    Filters are plain dicts with a "type" and run in order, each one seeing
+    only the events kept by the previous ones:
+
+    - time_window: start and/or end (ISO timestamps); mode "events" keeps
+      events inside the window, "contained" keeps cases lying entirely inside
+      it and "intersecting" keeps cases with at least one event inside it
+    - top_k_variants: k; keeps the cases of the k most frequent variants
+    - cases_containing: activities; mode "any" or "all"; exclude inverts it
+    - remove_rare_activities: min_count and/or min_fraction of events
+
+    Nothing is materialized per filter: every filter narrows a single
+    boolean event mask over the encoded log, and only the surviving events
+    are copied out at the end.
+    """
+
+    def __init__(self, filters: Optional[List[Dict[str, Any]]] = None):
+        self.filters = [self._validate(f) for f in (filters or [])]
+
+    def __bool__(self) -> bool:
+        return bool(self.filters)
+
+    def _validate(self, spec: Dict[str, Any]) -> Dict[str, Any]:
+        filter_type = spec.get("type")
+        if filter_type not in FILTER_TYPES:
+            raise ValueError(f"Unknown filter type: {filter_type}")
+        if filter_type == "time_window":
+            if spec.get("start") is None and spec.get("end") is None:
+                raise ValueError("time_window needs a start or an end")
+            if spec.get("mode", "events") not in TIME_WINDOW_MODES:
+                raise ValueError(f"Unknown time_window mode: {spec.get('mode')}")
+            for bound in ("start", "end"):
+                if spec.get(bound) is not None:
+                    _to_int64(spec[bound], bound)
+        elif filter_type == "top_k_variants":
+            if not _is_integer(spec.get("k")) or spec["k"] < 1:
+                raise ValueError("top_k_variants needs a positive integer k")
+        elif filter_type == "cases_containing":
+            activities = spec.get("activities")
+            if not isinstance(activities, list) or not activities or not all(isinstance(a, str) for a in activities):
+                raise ValueError("cases_containing needs a non-empty list of activity names")
+            if spec.get("mode", "any") not in ("any", "all"):
+                raise ValueError(f"Unknown cases_containing mode: {spec.get('mode')}")
+            if not isinstance(spec.get("exclude", False), bool):
+                raise ValueError("cases_containing exclude must be true or false")
+        else:
+            if spec.get("min_count") is None and spec.get("min_fraction") is None:
+                raise ValueError("remove_rare_activities needs min_count or min_fraction")
+            min_count, min_fraction = spec.get("min_count"), spec.get("min_fraction")
+            if min_count is not None and (not _is_integer(min_count) or min_count < 0):
+                raise ValueError("remove_rare_activities min_count must be a non-negative integer")
+            if min_fraction is not None and (
+                isinstance(min_fraction, bool) or not isinstance(min_fraction, (int, float))
+                or not 0 <= min_fraction <= 1
+            ):
+                raise ValueError("remove_rare_activities min_fraction must be a number between 0 and 1")
+        return spec
+
+    def apply(self, log: EncodedEventLog) -> EncodedEventLog:
+        """Events of the log surviving every filter"""
+        if not self.filters:
+            return log
+        mask = np.ones(len(log), dtype=bool)
+        for spec in self.filters:
+            mask = getattr(self, f"_{spec['type']}")(spec, log, mask)
+        return log.take(mask)
+
+    def _time_window(self, spec: Dict[str, Any], log: EncodedEventLog, mask: np.ndarray) -> np.ndarray:
+        inside = mask.copy()
+        if spec.get("start") is not None:
+            inside &= log.timestamps >= _to_int64(spec["start"])
+        if spec.get("end") is not None:
+            inside &= log.timestamps <= _to_int64(spec["end"])
+
+        mode = spec.get("mode", "events")
+        if mode == "events":
+            return inside
+        if mode == "intersecting":
+            return mask & _case_any(log, inside)[log.case_codes]
+        outside = mask & ~inside
+        return mask & ~_case_any(log, outside)[log.case_codes]
+
+    def _top_k_variants(self, spec: Dict[str, Any], log: EncodedEventLog, mask: np.ndarray) -> np.ndarray:
+        case_variant = _case_variants(log, mask)
+        counts = np.bincount(case_variant[case_variant >= 0])
+        # Most frequent first, ties broken by first occurrence
+        top = np.argsort(-counts, kind="stable")[:spec["k"]]
+        keep_case = np.isin(case_variant, top)
+        return mask & keep_case[log.case_codes]
+
+    def _cases_containing(self, spec: Dict[str, Any], log: EncodedEventLog, mask: np.ndarray) -> np.ndarray:
+        codes = log.activities.get_indexer(spec["activities"])
+        present = []
+        for code in codes:
+            if code < 0:
+                present.append(np.zeros(log.n_cases, dtype=bool))
+            else:
+                present.append(_case_any(log, mask & (log.activity_codes == code)))
+        if spec.get("mode", "any") == "all":
+            keep_case = np.logical_and.reduce(present)
+        else:
+            keep_case = np.logical_or.reduce(present)
+        if spec.get("exclude", False):
+            keep_case = ~keep_case
+        return mask & keep_case[log.case_codes]
+
+    def _remove_rare_activities(self, spec: Dict[str, Any], log: EncodedEventLog, mask: np.ndarray) -> np.ndarray:
+        counts = np.bincount(log.activity_codes[mask], minlength=len(log.activities))
+        threshold = spec.get("min_count") or 0
+        if spec.get("min_fraction") is not None:
+            threshold = max(threshold, spec["min_fraction"] * int(mask.sum()))
+        return mask & (counts >= threshold)[log.activity_codes]
+
+
+def _is_integer(value: Any) -> bool:
+    # JSON true/false parse to bools, which are ints to Python
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _case_any(log: EncodedEventLog, event_mask: np.ndarray) -> np.ndarray:
+    """Per case: whether any of its events is set in event_mask"""
+    return np.bincount(log.case_codes[event_mask], minlength=log.n_cases) > 0
+
+
+def _case_variants(log: EncodedEventLog, mask: np.ndarray) -> np.ndarray:
+    """Variant ID per case over the masked events, -1 for cases without events"""
+    events = np.flatnonzero(mask)
+    cases, activities = log.case_codes[events], log.activity_codes[events]
+
+    case_variant = np.full(log.n_cases, -1, dtype=np.int64)
+    if len(events) == 0:
+        return case_variant
+    starts = np.flatnonzero(np.r_[True, cases[1:] != cases[:-1]])
+    ends = np.r_[starts[1:], len(events)]
+    case_variant[cases[starts]] = sequence_groups(activities, starts, ends)[0]
+    return case_variant
+
+
+def _to_int64(value: Any, name: str = "timestamp") -> int:
+    """Nanoseconds since the epoch; naive timestamps are taken as UTC"""
+    try:
+        timestamp = pd.Timestamp(value)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"time_window {name} is not a valid timestamp: {value!r}") from e
+    if pd.isna(timestamp):
+        raise ValueError(f"time_window {name} is not a valid timestamp: {value!r}")
+    timestamp = timestamp.tz_localize("UTC") if timestamp.tzinfo is None else timestamp.tz_convert("UTC")
+    return timestamp.value
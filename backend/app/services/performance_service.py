@@ -0,0 +1,213 @@
+from typing import Dict, List, Any, Optional, Set
+import numpy as np
+from ..models.petri_net import PetriNetData, EdgeData
+from .encoded_log import EncodedEventLog
+
+
+class PerformanceService:
+    """Annotate a Petri net with frequencies and timings derived from an event log
+
+    Directly-follows pairs and their durations are computed with vectorized
+    shifts over the case-sorted log. Each net element is then mapped to the
+    set of pairs it can explain: a place connects the visible activities that
+    can produce a token into it with those that can consume it, looking through
+    invisible transitions. Durations are in seconds; a transition's duration
+    is the waiting time since the previous event of the same case. Only
+    directly-follows relations are observed, so figures on elements between
+    concurrent branches are an approximation rather than exact replay results.
+    """
+
+    def compute_overlay(self, petri_net_data: PetriNetData, log: EncodedEventLog) -> Dict[str, Any]:
+        """Return per-node and per-edge statistics keyed by element ID"""
+        pairs = _DirectlyFollowsPairs(log)
+        net = _NetStructure(petri_net_data, pairs)
+
+        nodes: Dict[str, Dict[str, Any]] = {}
+        for place_id in net.places:
+            # Tokens in a place: pairs from any producer to any consumer
+            nodes[place_id] = pairs.statistics(net.producers(place_id), net.consumers(place_id))
+        for transition_id in net.transitions:
+            code = net.activity_code.get(transition_id)
+            if code is not None:
+                nodes[transition_id] = pairs.statistics(pairs.all_codes, {code})
+            else:
+                nodes[transition_id] = pairs.statistics(
+                    net.transition_sources(transition_id), net.transition_targets(transition_id)
+                )
+
+        edges: Dict[str, Dict[str, Any]] = {}
+        for edge in petri_net_data.edges:
+            if edge.source in net.places and edge.target in net.transitions:
+                edges[edge.id] = pairs.statistics(net.producers(edge.source), net.transition_targets(edge.target))
+            elif edge.source in net.transitions and edge.target in net.places:
+                edges[edge.id] = pairs.statistics(net.transition_sources(edge.source), net.consumers(edge.target))
+
+        return {
+            "unit": "seconds",
+            "total_cases": pairs.total_cases,
+            "total_events": pairs.total_events,
+            "nodes": nodes,
+            "edges": edges
+        }
+
+    def apply_overlay(self, petri_net_data: PetriNetData, overlay: Dict[str, Any]) -> PetriNetData:
+        """Copy of the net with the overlay attached to Node.data and Edge.data"""
+        annotated = petri_net_data.model_copy(deep=True)
+        for node in annotated.nodes:
+            node.data.performance = overlay["nodes"].get(node.id)
+        for edge in annotated.edges:
+            if edge.data is None:
+                edge.data = EdgeData()
+            edge.data.performance = overlay["edges"].get(edge.id)
+        return annotated
+
+
+class _DirectlyFollowsPairs:
+    """Directly-follows pairs of a log, grouped by (source, target) code
+
+    Every case contributes START -> first, consecutive pairs and last -> END,
+    so elements next to the source and sink places are counted as well.
+    """
+
+    def __init__(self, log: EncodedEventLog):
+        self.activities = log.activities
+        activity_codes, case_codes, timestamps = log.activity_codes, log.case_codes, log.timestamps
+
+        n_activities = len(self.activities)
+        self.start_code = n_activities
+        self.end_code = n_activities + 1
+        self.width = n_activities + 2
+        self.all_codes: Set[int] = set(range(n_activities)) | {self.start_code}
+        self.total_cases = log.n_cases
+        self.total_events = len(activity_codes)
+
+        # Shifted arrays: predecessor of every event, START at case boundaries
+        is_first = np.r_[True, case_codes[1:] != case_codes[:-1]] if len(case_codes) else np.array([], dtype=bool)
+        is_last = np.r_[is_first[1:], True] if len(case_codes) else np.array([], dtype=bool)
+        previous = np.r_[self.start_code, activity_codes[:-1]] if len(case_codes) else np.array([], dtype=np.int64)
+        previous = np.where(is_first, self.start_code, previous)
+        waiting = np.r_[np.nan, np.diff(timestamps) / 1e9] if len(case_codes) else np.array([])
+        waiting = np.where(is_first, np.nan, waiting)
+
+        sources = np.r_[previous, activity_codes[is_last]].astype(np.int64)
+        targets = np.r_[activity_codes, np.full(int(is_last.sum()), self.end_code)].astype(np.int64)
+        durations = np.r_[waiting, np.full(int(is_last.sum()), np.nan)]
+
+        # Sort once by pair key so each (source, target) is a contiguous slice
+        keys = sources * self.width + targets
+        key_order = np.argsort(keys, kind="stable")
+        self._durations = durations[key_order]
+        sorted_keys = keys[key_order]
+        unique_keys, starts, counts = np.unique(sorted_keys, return_index=True, return_counts=True)
+        self._slices = {int(k): (int(s), int(s + c)) for k, s, c in zip(unique_keys, starts, counts)}
+
+    def code_of(self, activity: str) -> Optional[int]:
+        code = self.activities.get_indexer([activity])[0]
+        return int(code) if code >= 0 else None
+
+    def statistics(self, sources: Set[int], targets: Set[int]) -> Dict[str, Any]:
+        """Count and duration statistics over all pairs source -> target"""
+        slices = []
+        for source in sources:
+            for target in targets:
+                bounds = self._slices.get(source * self.width + target)
+                if bounds is not None:
+                    slices.append(bounds)
+
+        count = sum(end - start for start, end in slices)
+        if slices:
+            values = np.concatenate([self._durations[start:end] for start, end in slices])
+            values = values[~np.isnan(values)]
+        else:
+            values = np.array([])
+
+        if len(values) == 0:
+            return {"count": int(count), "mean": None, "median": None, "p95": None}
+        return {
+            "count": int(count),
+            "mean": float(values.mean()),
+            "median": float(np.median(values)),
+            "p95": float(np.percentile(values, 95))
+        }
+
+
+class _NetStructure:
+    """Pre/post sets of a PetriNetData with visible-activity closures
+
+    Closures walk through invisible transitions (and transitions whose label
+    does not occur in the log) until visible activities are reached.
+    """
+
+    def __init__(self, petri_net_data: PetriNetData, pairs: _DirectlyFollowsPairs):
+        self.pairs = pairs
+        self.places: Set[str] = {n.id for n in petri_net_data.nodes if n.type == "place"}
+        self.transitions: Set[str] = {n.id for n in petri_net_data.nodes if n.type == "transition"}
+
+        # Visible transitions are matched to log activities by label, falling back to name
+        self.activity_code: Dict[str, int] = {}
+        for node in petri_net_data.nodes:
+            if node.type == "transition" and not node.data.isInvisible:
+                code = pairs.code_of(node.data.label)
+                if code is None:
+                    code = pairs.code_of(node.data.name)
+                if code is not None:
+                    self.activity_code[node.id] = code
+
+        self.pre: Dict[str, List[str]] = {node_id: [] for node_id in self.places | self.transitions}
+        self.post: Dict[str, List[str]] = {node_id: [] for node_id in self.places | self.transitions}
+        for edge in petri_net_data.edges:
+            if edge.source in self.pre and edge.target in self.pre:
+                self.post[edge.source].append(edge.target)
+                self.pre[edge.target].append(edge.source)
+
+        self._producers: Dict[str, Set[int]] = {}
+        self._consumers: Dict[str, Set[int]] = {}
+
+    def producers(self, place_id: str) -> Set[int]:
+        """Visible activities (or START) that can put a token into the place"""
+        if place_id not in self._producers:
+            self._producers[place_id] = self._closure(place_id, self.pre, self.pairs.start_code)
+        return self._producers[place_id]
+
+    def consumers(self, place_id: str) -> Set[int]:
+        """Visible activities (or END) that can take a token from the place"""
+        if place_id not in self._consumers:
+            self._consumers[place_id] = self._closure(place_id, self.post, self.pairs.end_code)
+        return self._consumers[place_id]
+
+    def transition_sources(self, transition_id: str) -> Set[int]:
+        """Activities directly preceding a firing of the transition"""
+        if transition_id in self.activity_code:
+            return {self.activity_code[transition_id]}
+        result: Set[int] = set()
+        for place_id in self.pre[transition_id]:
+            result |= self.producers(place_id)
+        return result
+
+    def transition_targets(self, transition_id: str) -> Set[int]:
+        """Activities directly following a firing of the transition"""
+        if transition_id in self.activity_code:
+            return {self.activity_code[transition_id]}
+        result: Set[int] = set()
+        for place_id in self.post[transition_id]:
+            result |= self.consumers(place_id)
+        return result
+
+    def _closure(self, place_id: str, neighbours: Dict[str, List[str]], boundary_code: int) -> Set[int]:
+        """Collect visible activities reachable from a place through silent transitions"""
+        result: Set[int] = set()
+        visited = {place_id}
+        stack = [place_id]
+        while stack:
+            place = stack.pop()
+            if not neighbours[place]:
+                result.add(boundary_code)
+            for transition_id in neighbours[place]:
+                if transition_id in self.activity_code:
+                    result.add(self.activity_code[transition_id])
+                    continue
+                for next_place in neighbours[transition_id]:
+                    if next_place not in visited:
+                        visited.add(next_place)
+                        stack.append(next_place)
+        return result
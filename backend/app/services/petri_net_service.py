@@ -1,8 +1,7 @@
 from typing import Dict, List, Any, Tuple
 import pm4py
 from pm4py.objects.petri_net.obj import PetriNet, Marking
-from ..models.petri_net import PetriNetData, NodeData, EdgeData, Node, Edge, Position
-import uuid
+from ..models.petri_net import PetriNetData, NodeData, EdgeData, Node, Edge, Position, bulk_construction
 
 class PetriNetService:
     """Handle Petri net related business logic"""
@@ -13,7 +12,12 @@ class PetriNetService:
         initial_marking: Marking, 
         final_marking: Marking
     ) -> PetriNetData:
-        """Convert PM4Py Petri net objects to frontend format"""
+        """Convert PM4Py Petri net objects to frontend format
+        
+        Elements come from trusted PM4Py objects, so models are built with
+        model_construct and skip validation; values are cast to the field
+        types so the result is identical to a validated one.
+        """
         
         nodes = []
         edges = []
@@ -21,104 +25,112 @@ class PetriNetService:
         # Create ID mapping for each place and transition
         element_to_id = {}
         
-        # Process Places
-        for place in net.places:
-            place_id = f"place_{place.name}" if place.name else f"place_{id(place)}"
-            element_to_id[place] = place_id
+        # Elements are allocated in bulk; collect garbage less often meanwhile
+        with bulk_construction():
+            # Process Places
+            for place in net.places:
+                place_id = f"place_{place.name}" if place.name else f"place_{id(place)}"
+                element_to_id[place] = place_id
             
-            # Determine number of tokens
-            tokens = 0
-            is_initial = place in initial_marking
-            is_final = place in final_marking
+                # Determine number of tokens
+                tokens = 0
+                is_initial = place in initial_marking
+                is_final = place in final_marking
             
-            if is_initial:
-                tokens = initial_marking[place]
+                if is_initial:
+                    tokens = initial_marking[place]
             
-            # Calculate position (simple grid layout)
-            position = self._calculate_place_position(place, len(nodes))
+                # Calculate position (simple grid layout)
+                position = self._calculate_place_position(place, len(nodes))
             
-            # Create NodeData
-            node_data = NodeData(
-                id=place_id,
-                type="place",
-                label=place.name or f"Place {len(nodes) + 1}",
-                name=place.name or f"Place {len(nodes) + 1}",
-                tokens=tokens,
-                isInitialMarking=is_initial,
-                isFinalMarking=is_final,
-                attachPoints=4
-            )
+                # Create NodeData
+                node_data = NodeData.model_construct(
+                    id=place_id,
+                    type="place",
+                    label=place.name or f"Place {len(nodes) + 1}",
+                    name=place.name or f"Place {len(nodes) + 1}",
+                    tokens=int(tokens),
+                    isInitialMarking=is_initial,
+                    isFinalMarking=is_final,
+                    isInvisible=False,
+                    attachPoints=4,
+                    performance=None
+                )
             
-            # Create Node
-            node = Node(
-                id=place_id,
-                type="place",
-                position=Position(x=position["x"], y=position["y"]),
-                data=node_data
-            )
-            nodes.append(node)
-        
-        # Process Transitions
-        for transition in net.transitions:
-            transition_id = f"transition_{transition.name}" if transition.name else f"transition_{id(transition)}"
-            element_to_id[transition] = transition_id
+                # Create Node
+                node = Node.model_construct(
+                    id=place_id,
+                    type="place",
+                    position=Position.model_construct(x=position["x"], y=position["y"]),
+                    data=node_data
+                )
+                nodes.append(node)
+        
+            # Process Transitions
+            for transition in net.transitions:
+                transition_id = f"transition_{transition.name}" if transition.name else f"transition_{id(transition)}"
+                element_to_id[transition] = transition_id
             
-            # Calculate position
-            position = self._calculate_transition_position(transition, len(nodes))
+                # Calculate position
+                position = self._calculate_transition_position(transition, len(nodes))
             
-            # Check if it's an invisible transition
-            is_invisible = transition.label is None or transition.label == ""
+                # Check if it's an invisible transition
+                is_invisible = transition.label is None or transition.label == ""
             
-            # Create NodeData
-            node_data = NodeData(
-                id=transition_id,
-                type="transition",
-                label=transition.label or transition.name or f"Transition {len(nodes) + 1}",
-                name=transition.name or f"Transition {len(nodes) + 1}",
-                isInvisible=is_invisible,
-                attachPoints=4
-            )
+                # Create NodeData
+                node_data = NodeData.model_construct(
+                    id=transition_id,
+                    type="transition",
+                    label=transition.label or transition.name or f"Transition {len(nodes) + 1}",
+                    name=transition.name or f"Transition {len(nodes) + 1}",
+                    tokens=None,
+                    isInitialMarking=False,
+                    isFinalMarking=False,
+                    isInvisible=is_invisible,
+                    attachPoints=4,
+                    performance=None
+                )
             
-            # Create Node
-            node = Node(
-                id=transition_id,
-                type="transition",
-                position=Position(x=position["x"], y=position["y"]),
-                data=node_data
-            )
-            nodes.append(node)
-        
-        # Process Arcs (Edges)
-        for arc in net.arcs:
-            source_id = element_to_id.get(arc.source)
-            target_id = element_to_id.get(arc.target)
+                # Create Node
+                node = Node.model_construct(
+                    id=transition_id,
+                    type="transition",
+                    position=Position.model_construct(x=position["x"], y=position["y"]),
+                    data=node_data
+                )
+                nodes.append(node)
+        
+            # Process Arcs (Edges)
+            for arc in net.arcs:
+                source_id = element_to_id.get(arc.source)
+                target_id = element_to_id.get(arc.target)
             
-            if source_id and target_id:
-                edge_id = f"{source_id}-{target_id}"
+                if source_id and target_id:
+                    edge_id = f"{source_id}-{target_id}"
                 
-                # Determine connection points
-                source_handle = "source-point-0"
-                target_handle = "target-point-0"
+                    # Determine connection points
+                    source_handle = "source-point-0"
+                    target_handle = "target-point-0"
                 
-                # Create EdgeData
-                edge_data = EdgeData(weight=getattr(arc, 'weight', 1))
+                    # Create EdgeData
+                    edge_data = EdgeData.model_construct(weight=int(getattr(arc, 'weight', 1)), performance=None)
                 
-                # Create Edge
-                edge = Edge(
-                    id=edge_id,
-                    source=source_id,
-                    target=target_id,
-                    sourceHandle=source_handle,
-                    targetHandle=target_handle,
-                    markerEnd={"type": "arrow"},
-                    style={"stroke": "#333"},
-                    data=edge_data
-                )
-                edges.append(edge)
+                    # Create Edge
+                    edge = Edge.model_construct(
+                        id=edge_id,
+                        source=source_id,
+                        target=target_id,
+                        sourceHandle=source_handle,
+                        targetHandle=target_handle,
+                        markerEnd={"type": "arrow"},
+                        style={"stroke": "#333"},
+                        data=edge_data
+                    )
+                    edges.append(edge)
         
         # Create PetriNetData object
-        petri_net_data = PetriNetData(
-            networkId=str(uuid.uuid4()),
+        petri_net_data = PetriNetData.model_construct(
+            networkId=None,
             networkName="Discovered Petri Net",
             nodes=nodes,
             edges=edges,
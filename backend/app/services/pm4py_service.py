@@ -5,18 +5,23 @@ from typing import Dict, List, Any, Tuple
 import pm4py
 from pm4py.objects.petri_net.obj import PetriNet, Marking
 from pm4py.objects.petri_net.utils import petri_utils
-from pm4py.objects.petri_net.exporter import exporter as pnml_exporter
 from pm4py.algo.simulation.playout.petri_net import algorithm as playout_algorithm
 import pandas as pd
 from datetime import datetime, timedelta
-from ..models.petri_net import Node, Edge, NodeData, Position, PetriNetData, EdgeData
+from ..models.petri_net import Node, Edge, NodeData, Position, PetriNetData, EdgeData, bulk_construction
+from .pnml_writer import PNMLWriter
+from .petri_net_service import PetriNetService
+
+DISCOVERY_ALGORITHMS = ("inductive", "alpha", "heuristics")
 
 class PM4PyService:
     def __init__(self):
         self.temp_files = []
+        self.pnml_writer = PNMLWriter()
     
     def parse_pnml_file(self, file_content: bytes, filename: str) -> PetriNetData:
         """Parse PNML file using PM4Py and convert to React Flow format"""
+        temp_file_path = None
         try:
             # Create temporary file
             with tempfile.NamedTemporaryFile(mode='wb', suffix='.pnml', delete=False) as temp_file:
@@ -24,14 +29,26 @@ class PM4PyService:
                 temp_file_path = temp_file.name
                 self.temp_files.append(temp_file_path)
             
+            return self.parse_pnml_path(temp_file_path)
+            
+        finally:
+            # Clean up temporary file
+            if temp_file_path and os.path.exists(temp_file_path):
+                os.unlink(temp_file_path)
+                if temp_file_path in self.temp_files:
+                    self.temp_files.remove(temp_file_path)
+    
+    def parse_pnml_path(self, file_path: str) -> PetriNetData:
+        """Parse a PNML file already on disk and convert to React Flow format"""
+        try:
             # Parse with PM4Py
-            net, initial_marking, final_marking = pm4py.read_pnml(temp_file_path)
+            net, initial_marking, final_marking = pm4py.read_pnml(file_path)
             
             # Extract network information from PNML
-            network_id, network_name = self._extract_network_info(temp_file_path, net)
+            network_id, network_name = self._extract_network_info(file_path, net)
             
             # Extract arc information from PNML
-            arc_ids = self._extract_arc_info(temp_file_path)
+            arc_ids = self._extract_arc_info(file_path)
             
             # Convert to React Flow format
             nodes, edges = self._convert_to_react_flow(net, initial_marking, final_marking, arc_ids)
@@ -39,22 +56,18 @@ class PM4PyService:
             # Calculate statistics
             statistics = self._calculate_statistics(net, initial_marking, final_marking)
             
-            return PetriNetData(
+            return PetriNetData.model_construct(
                 nodes=nodes,
                 edges=edges,
                 statistics=statistics,
-                networkId=network_id,
-                networkName=network_name
+                networkId=str(network_id),
+                networkName=str(network_name),
+                selectedElement=None,
+                metadata=None
             )
             
         except Exception as e:
             raise Exception(f"Failed to parse PNML file: {str(e)}")
-        finally:
-            # Clean up temporary file
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
-                if temp_file_path in self.temp_files:
-                    self.temp_files.remove(temp_file_path)
     
     def _extract_network_info(self, pnml_file_path: str, net: PetriNet) -> Tuple[str, str]:
         """Extract network ID and name from PNML file"""
@@ -100,7 +113,11 @@ class PM4PyService:
         return arc_ids
     
     def _convert_to_react_flow(self, net: PetriNet, initial_marking: Marking, final_marking: Marking, arc_ids: Dict[str, str]) -> Tuple[List[Node], List[Edge]]:
-        """Convert PM4Py Petri net to React Flow nodes and edges"""
+        """Convert PM4Py Petri net to React Flow nodes and edges
+        
+        Models are built with model_construct since the input is trusted;
+        values are cast to the field types so validation would not change them.
+        """
         nodes = []
         edges = []
         
@@ -111,90 +128,102 @@ class PM4PyService:
                 if tokens > 0:
                     final_marking_places.add(place)
         
-        # Convert places to nodes
-        for place in net.places:
-            tokens = initial_marking.get(place, 0) if initial_marking else 0
-            is_initial_marking = tokens > 0
-            is_final_marking = place in final_marking_places
-            
-            # Get place ID and name from PM4Py object
-            place_id = place.name  # This is the actual ID from PNML
-            place_name = place.properties.get('place_name_tag', place_id) if hasattr(place, 'properties') and place.properties else place_id
-            
-            node = Node(
-                id=place_id,
-                type="place",
-                position=Position(x=0, y=0),  # Will be positioned by frontend layout
-                data=NodeData(
+        # Elements are allocated in bulk; collect garbage less often meanwhile
+        with bulk_construction():
+            # Convert places to nodes
+            for place in net.places:
+                tokens = initial_marking.get(place, 0) if initial_marking else 0
+                is_initial_marking = tokens > 0
+                is_final_marking = place in final_marking_places
+            
+                # Get place ID and name from PM4Py object
+                place_id = place.name  # This is the actual ID from PNML
+                place_name = place.properties.get('place_name_tag', place_id) if hasattr(place, 'properties') and place.properties else place_id
+            
+                node = Node.model_construct(
                     id=place_id,
                     type="place",
-                    label=place_id,
-                    name=place_name,
-                    tokens=tokens,
-                    isInitialMarking=is_initial_marking,
-                    isFinalMarking=is_final_marking,
-                    attachPoints=4
+                    position=Position.model_construct(x=0.0, y=0.0),  # Will be positioned by frontend layout
+                    data=NodeData.model_construct(
+                        id=place_id,
+                        type="place",
+                        label=place_id,
+                        name=str(place_name),
+                        tokens=int(tokens),
+                        isInitialMarking=is_initial_marking,
+                        isFinalMarking=is_final_marking,
+                        isInvisible=False,
+                        attachPoints=4,
+                        performance=None
+                    )
                 )
-            )
-            nodes.append(node)
+                nodes.append(node)
         
-        # Convert transitions to nodes
-        for transition in net.transitions:
-            # Get transition ID and name from PM4Py object
-            transition_id = transition.name  # This is the actual ID from PNML
-            
-            # Check if this is an invisible transition
-            # Invisible transitions have label=None and often have $invisible$ in properties
-            is_invisible = transition.label is None
-            
-            # Try multiple sources for the transition name:
-            # 1. transition.label (for normal transitions)
-            # 2. transition.properties['trans_name_tag'] (for transitions with name in properties)
-            # 3. fallback to transition_id
-            transition_name = transition.label
-            if not transition_name and hasattr(transition, 'properties') and transition.properties:
-                transition_name = transition.properties.get('trans_name_tag')
-            if not transition_name:
-                transition_name = transition_id
-            
-            node = Node(
-                id=transition_id,
-                type="transition",
-                position=Position(x=0, y=0),  # Will be positioned by frontend layout
-                data=NodeData(
+            # Convert transitions to nodes
+            for transition in net.transitions:
+                # Get transition ID and name from PM4Py object
+                transition_id = transition.name  # This is the actual ID from PNML
+            
+                # Check if this is an invisible transition
+                # Invisible transitions have label=None and often have $invisible$ in properties
+                is_invisible = transition.label is None
+            
+                # Try multiple sources for the transition name:
+                # 1. transition.label (for normal transitions)
+                # 2. transition.properties['trans_name_tag'] (for transitions with name in properties)
+                # 3. fallback to transition_id
+                transition_name = transition.label
+                if not transition_name and hasattr(transition, 'properties') and transition.properties:
+                    transition_name = transition.properties.get('trans_name_tag')
+                if not transition_name:
+                    transition_name = transition_id
+            
+                node = Node.model_construct(
                     id=transition_id,
                     type="transition",
-                    label=transition_id,
-                    name=transition_name,
-                    isInvisible=is_invisible,
-                    attachPoints=4
+                    position=Position.model_construct(x=0.0, y=0.0),  # Will be positioned by frontend layout
+                    data=NodeData.model_construct(
+                        id=transition_id,
+                        type="transition",
+                        label=transition_id,
+                        name=str(transition_name),
+                        tokens=None,
+                        isInitialMarking=False,
+                        isFinalMarking=False,
+                        isInvisible=is_invisible,
+                        attachPoints=4,
+                        performance=None
+                    )
                 )
-            )
-            nodes.append(node)
+                nodes.append(node)
         
-        # Convert arcs to edges
-        for arc in net.arcs:
-            source_id = arc.source.name  # Source node ID
-            target_id = arc.target.name  # Target node ID
-            
-            # Use original arc ID from PNML if available, otherwise generate one
-            arc_key = f"{source_id}-{target_id}"
-            edge_id = arc_ids.get(arc_key, arc_key)
-            
-            # Get weight from arc properties if available
-            weight = 1
-            if hasattr(arc, 'weight') and arc.weight:
-                weight = arc.weight
-            elif hasattr(arc, 'properties') and arc.properties:
-                weight = arc.properties.get('weight', 1)
-            
-            edge = Edge(
-                id=edge_id,
-                source=source_id,
-                target=target_id,
-                data=EdgeData(weight=weight)
-            )
-            edges.append(edge)
+            # Convert arcs to edges
+            for arc in net.arcs:
+                source_id = arc.source.name  # Source node ID
+                target_id = arc.target.name  # Target node ID
+            
+                # Use original arc ID from PNML if available, otherwise generate one
+                arc_key = f"{source_id}-{target_id}"
+                edge_id = arc_ids.get(arc_key, arc_key)
+            
+                # Get weight from arc properties if available
+                weight = 1
+                if hasattr(arc, 'weight') and arc.weight:
+                    weight = arc.weight
+                elif hasattr(arc, 'properties') and arc.properties:
+                    weight = arc.properties.get('weight', 1)
+            
+                edge = Edge.model_construct(
+                    id=edge_id,
+                    source=source_id,
+                    target=target_id,
+                    sourceHandle=None,
+                    targetHandle=None,
+                    markerEnd=None,
+                    style=None,
+                    data=EdgeData.model_construct(weight=int(weight), performance=None)
+                )
+                edges.append(edge)
         
         return nodes, edges
     
@@ -228,21 +257,10 @@ class PM4PyService:
         except:
             return False
     
-    def export_to_pnml_string(self, petri_net_data: PetriNetData) -> str:
+    def export_to_pnml_string(self, petri_net_data: PetriNetData, file_format: str = "pnml") -> str:
         """Export PetriNetData to PNML string format"""
         try:
-            # Rebuild PM4Py objects from frontend data
-            net, initial_marking, final_marking = self._rebuild_pm4py_objects(petri_net_data)
-            
-            # Export to PNML string
-            pnml_string = pnml_exporter.serialize(net, initial_marking, final_marking=final_marking)
-            
-            # Convert bytes to string if necessary
-            if isinstance(pnml_string, bytes):
-                pnml_string = pnml_string.decode('utf-8')
-            
-            return pnml_string
-            
+            return self.pnml_writer.to_string(petri_net_data, file_format)
         except Exception as e:
             raise Exception(f"Failed to export PNML: {str(e)}")
     
@@ -327,6 +345,32 @@ class PM4PyService:
         
         return net, initial_marking, final_marking
 
+    def discover_petri_net(
+        self,
+        log_df: pd.DataFrame,
+        algorithm: str = "inductive",
+        noise_threshold: float = 0.0,
+        dependency_threshold: float = 0.5,
+        and_threshold: float = 0.65
+    ) -> PetriNetData:
+        """Discover a Petri net from a PM4Py-formatted event DataFrame and convert to frontend format"""
+        if algorithm == "inductive":
+            net, initial_marking, final_marking = pm4py.discover_petri_net_inductive(
+                log_df, noise_threshold=noise_threshold
+            )
+        elif algorithm == "alpha":
+            net, initial_marking, final_marking = pm4py.discover_petri_net_alpha(log_df)
+        elif algorithm == "heuristics":
+            net, initial_marking, final_marking = pm4py.discover_petri_net_heuristics(
+                log_df,
+                dependency_threshold=dependency_threshold,
+                and_threshold=and_threshold
+            )
+        else:
+            raise ValueError(f"Unsupported algorithm: {algorithm}")
+        
+        return PetriNetService().convert_pm4py_to_frontend(net, initial_marking, final_marking)
+
     def cleanup(self):
         """Clean up any remaining temporary files"""
         for temp_file in self.temp_files:
@@ -0,0 +1,131 @@
+from typing import Iterator, List
+from xml.sax.saxutils import escape, quoteattr
+from ..models.petri_net import PetriNetData, Node, Edge
+
+PNML_NAMESPACE = "http://www.pnml.org/version-2009/grammar/pnml"
+PNML_NET_TYPE = "http://www.pnml.org/version-2009/grammar/pnmlcoremodel"
+
+SUPPORTED_FORMATS = ("pnml", "apnml")
+
+
+class PNMLWriter:
+    """Stream PNML/APNML documents directly from PetriNetData
+
+    Unlike the PM4Py exporter, no intermediate PetriNet object is built, so
+    arc IDs, names, markings, weights and node positions survive the export.
+    """
+
+    def __init__(self, chunk_size: int = 64 * 1024):
+        self.chunk_size = chunk_size
+
+    def iter_pnml(self, petri_net_data: PetriNetData, file_format: str = "pnml") -> Iterator[str]:
+        """Yield the serialized document in chunks of roughly chunk_size characters"""
+        if file_format not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported export format: {file_format}")
+
+        buffer: List[str] = []
+        buffered = 0
+        for fragment in self._iter_fragments(petri_net_data, file_format):
+            buffer.append(fragment)
+            buffered += len(fragment)
+            if buffered >= self.chunk_size:
+                yield "".join(buffer)
+                buffer = []
+                buffered = 0
+        if buffer:
+            yield "".join(buffer)
+
+    def iter_pnml_bytes(self, petri_net_data: PetriNetData, file_format: str = "pnml") -> Iterator[bytes]:
+        """Same as iter_pnml, encoded as UTF-8 for streaming responses"""
+        for chunk in self.iter_pnml(petri_net_data, file_format):
+            yield chunk.encode("utf-8")
+
+    def to_string(self, petri_net_data: PetriNetData, file_format: str = "pnml") -> str:
+        """Serialize the whole document into a single string"""
+        return "".join(self.iter_pnml(petri_net_data, file_format))
+
+    def _iter_fragments(self, petri_net_data: PetriNetData, file_format: str) -> Iterator[str]:
+        """Generate the XML document element by element"""
+        network_id = petri_net_data.networkId or "exported_net"
+        network_name = petri_net_data.networkName or network_id
+
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield f'<pnml xmlns="{PNML_NAMESPACE}">\n'
+        yield f'  <net id={quoteattr(network_id)} type="{PNML_NET_TYPE}">\n'
+        yield f'    <name>\n      <text>{escape(network_name)}</text>\n    </name>\n'
+        yield '    <page id="n0">\n'
+
+        final_places = []
+        for node in petri_net_data.nodes:
+            if node.type == "place":
+                yield self._place_xml(node)
+                if node.data.isFinalMarking:
+                    final_places.append(node.id)
+
+        for node in petri_net_data.nodes:
+            if node.type == "transition":
+                yield self._transition_xml(node)
+
+        for edge in petri_net_data.edges:
+            yield self._arc_xml(edge)
+
+        yield '    </page>\n'
+
+        # APNML (accepting Petri net) always carries a final marking section
+        if final_places or file_format == "apnml":
+            yield '    <finalmarkings>\n      <marking>\n'
+            for place_id in final_places:
+                yield f'        <place idref={quoteattr(place_id)}>\n          <text>1</text>\n        </place>\n'
+            yield '      </marking>\n    </finalmarkings>\n'
+
+        yield '  </net>\n'
+        yield '</pnml>\n'
+
+    def _place_xml(self, node: Node) -> str:
+        """Serialize a place node"""
+        parts = [
+            f'      <place id={quoteattr(node.id)}>\n',
+            f'        <name>\n          <text>{escape(node.data.name or node.id)}</text>\n        </name>\n',
+            self._graphics_xml(node),
+        ]
+        if node.data.tokens:
+            parts.append(
+                f'        <initialMarking>\n          <text>{int(node.data.tokens)}</text>\n        </initialMarking>\n'
+            )
+        parts.append('      </place>\n')
+        return "".join(parts)
+
+    def _transition_xml(self, node: Node) -> str:
+        """Serialize a transition node, marking invisible ones the way ProM does"""
+        parts = [
+            f'      <transition id={quoteattr(node.id)}>\n',
+            f'        <name>\n          <text>{escape(node.data.name or node.id)}</text>\n        </name>\n',
+            self._graphics_xml(node),
+        ]
+        if node.data.isInvisible:
+            parts.append('        <toolspecific tool="ProM" version="6.4" activity="$invisible$"/>\n')
+        parts.append('      </transition>\n')
+        return "".join(parts)
+
+    def _arc_xml(self, edge: Edge) -> str:
+        """Serialize an arc, keeping its original ID and weight"""
+        weight = edge.data.weight if edge.data and edge.data.weight else 1
+        opening = (
+            f'      <arc id={quoteattr(edge.id)} '
+            f'source={quoteattr(edge.source)} target={quoteattr(edge.target)}'
+        )
+        if weight == 1:
+            return opening + '/>\n'
+        return (
+            opening + '>\n'
+            f'        <inscription>\n          <text>{int(weight)}</text>\n        </inscription>\n'
+            '      </arc>\n'
+        )
+
+    def _graphics_xml(self, node: Node) -> str:
+        """Serialize the node position"""
+        return (
+            '        <graphics>\n'
+            f'          <position x="{node.position.x}" y="{node.position.y}"/>\n'
+            '        </graphics>\n'
+        )
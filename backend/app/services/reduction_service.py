@@ -0,0 +1,347 @@
+from typing import Dict, List, Any, Tuple
+from ..models.petri_net import PetriNetData, Node, Edge, EdgeData
+
+RULES = (
+    "fusion_of_series_places",
+    "fusion_of_series_transitions",
+    "fusion_of_silent_joins",
+    "elimination_of_self_loop_places",
+    "elimination_of_self_loop_transitions",
+    "fusion_of_identical_places",
+    "fusion_of_identical_transitions",
+)
+
+
+class PetriNetReducer:
+    """Behaviour-preserving reduction of a Petri net
+
+    Applies Murata-style reduction rules until a fixpoint is reached. Only
+    invisible transitions are ever removed or absorbed, so the language of
+    visible labels (and reachability of deadlocks and final markings) is
+    preserved. Every element of the reduced net maps back to the original
+    elements it represents.
+    """
+
+    def reduce(self, petri_net_data: PetriNetData) -> Dict[str, Any]:
+        """Return the reduced net, the node and arc mappings and rule counts
+
+        "mapping" lists the original nodes behind every reduced node and
+        "edge_mapping" the original arcs behind every reduced arc. Arcs with
+        no reduced counterpart, because they ran inside a merged group of
+        nodes or into a removed one, are listed in "absorbed_edges" under the
+        reduced node that absorbed their removed endpoint.
+        """
+        net = _ReductionState(petri_net_data)
+        applied = {rule: 0 for rule in RULES}
+
+        changed = True
+        while changed:
+            changed = False
+            for rule in RULES:
+                count = getattr(net, rule)()
+                applied[rule] += count
+                changed = changed or count > 0
+
+        return net.result(applied)
+
+    def rebind(self, result: Dict[str, Any], petri_net_data: PetriNetData, mapping: Dict[str, str]) -> Dict[str, Any]:
+        """Carry a reduce() result over to a structurally identical net
+
+        mapping takes the node IDs of the reduced net's source to those of
+        petri_net_data. The reduced structure is replayed on petri_net_data's
+        own nodes and arcs, so the result is the one reduce() could have
+        returned for it, without running the rules again.
+        """
+        net = _ReductionState(petri_net_data)
+        reduced = result["petri_net"]
+        kept = {mapping[node.id] for node in reduced.nodes}
+        net.places &= kept
+        net.transitions &= kept
+        for node in reduced.nodes:
+            if node.type == "place":
+                net.tokens[mapping[node.id]] = node.data.tokens or 0
+        net.members = {
+            mapping[element_id]: {mapping[member] for member in members}
+            for element_id, members in result["mapping"].items()
+        }
+        net.pre = {node_id: {} for node_id in kept}
+        net.post = {node_id: {} for node_id in kept}
+        for edge in reduced.edges:
+            net._add_arc(mapping[edge.source], mapping[edge.target], edge.data.weight if edge.data and edge.data.weight else 1)
+        return net.result(dict(result["rules_applied"]))
+
+
+def net_statistics(petri_net_data: PetriNetData) -> Dict[str, Any]:
+    """Element counts of a net in PetriNetData form"""
+    places = [n for n in petri_net_data.nodes if n.type == "place"]
+    transitions = [n for n in petri_net_data.nodes if n.type == "transition"]
+    return {
+        "places": len(places),
+        "transitions": len(transitions),
+        "arcs": len(petri_net_data.edges),
+        "invisible_transitions": len([n for n in transitions if n.data.isInvisible]),
+        "initial_places": len([n for n in places if n.data.tokens]),
+        "final_places": len([n for n in places if n.data.isFinalMarking])
+    }
+
+
+class _ReductionState:
+    """Mutable adjacency view of a net used while applying the rules"""
+
+    def __init__(self, petri_net_data: PetriNetData):
+        self.source = petri_net_data
+        self.nodes: Dict[str, Node] = {node.id: node for node in petri_net_data.nodes}
+        self.places = {node.id for node in petri_net_data.nodes if node.type == "place"}
+        self.transitions = {node.id for node in petri_net_data.nodes if node.type == "transition"}
+        self.tokens = {p: self.nodes[p].data.tokens or 0 for p in self.places}
+        self.final = {p: bool(self.nodes[p].data.isFinalMarking) for p in self.places}
+        self.silent = {t: bool(self.nodes[t].data.isInvisible) for t in self.transitions}
+        self.members: Dict[str, set] = {node_id: {node_id} for node_id in self.nodes}
+
+        self.pre: Dict[str, Dict[str, int]] = {node_id: {} for node_id in self.nodes}
+        self.post: Dict[str, Dict[str, int]] = {node_id: {} for node_id in self.nodes}
+        self.original_edges: Dict[Tuple[str, str], Edge] = {}
+        for edge in petri_net_data.edges:
+            if edge.source in self.nodes and edge.target in self.nodes:
+                weight = edge.data.weight if edge.data and edge.data.weight else 1
+                self._add_arc(edge.source, edge.target, weight)
+                self.original_edges[(edge.source, edge.target)] = edge
+
+    # Graph editing helpers
+
+    def _add_arc(self, source: str, target: str, weight: int) -> None:
+        self.post[source][target] = self.post[source].get(target, 0) + weight
+        self.pre[target][source] = self.pre[target].get(source, 0) + weight
+
+    def _remove_node(self, node_id: str) -> None:
+        for source in self.pre[node_id]:
+            del self.post[source][node_id]
+        for target in self.post[node_id]:
+            del self.pre[target][node_id]
+        del self.pre[node_id], self.post[node_id]
+        self.places.discard(node_id)
+        self.transitions.discard(node_id)
+
+    def _absorb(self, keeper: str, removed: List[str]) -> None:
+        """Record that keeper now stands for the removed elements too"""
+        for node_id in removed:
+            self.members[keeper] |= self.members.pop(node_id)
+
+    def _drop(self, survivor_hint: str, node_id: str) -> None:
+        """Remove a node, crediting its members to a surviving neighbour"""
+        self._absorb(survivor_hint, [node_id])
+        self._remove_node(node_id)
+
+    # Rules; each returns how many times it fired
+
+    def fusion_of_series_places(self) -> int:
+        """Silent t with •t={p1} and p1•={t}: route everything arriving at p1 straight to t•
+
+        With a single output place this is the classic fusion of p1 into p2;
+        it also covers silent splits fed by a private place, e.g. the source.
+        """
+        count = 0
+        for t in sorted(self.transitions):
+            if t not in self.transitions or not self.silent[t]:
+                continue
+            if len(self.pre[t]) != 1 or not self.post[t]:
+                continue
+            (p1, w_in), = self.pre[t].items()
+            if w_in != 1 or p1 in self.post[t] or list(self.post[p1]) != [t] or self.final[p1]:
+                continue
+            outputs = sorted(self.post[t].items())
+            for source, source_weight in list(self.pre[p1].items()):
+                for target, weight in outputs:
+                    self._add_arc(source, target, source_weight * weight)
+            for target, weight in outputs:
+                self.tokens[target] += self.tokens[p1] * weight
+            self._absorb(outputs[0][0], [p1, t])
+            self._remove_node(t)
+            self._remove_node(p1)
+            count += 1
+        return count
+
+    def fusion_of_series_transitions(self) -> int:
+        """Unmarked p with •p={t1}, p•={t2} and one side silent: merge the silent side away"""
+        count = 0
+        for p in sorted(self.places):
+            if p not in self.places or self.tokens[p] or self.final[p]:
+                continue
+            if len(self.pre[p]) != 1 or len(self.post[p]) != 1:
+                continue
+            (t1, w_in), = self.pre[p].items()
+            (t2, w_out), = self.post[p].items()
+            if t1 == t2 or w_in != 1 or w_out != 1:
+                continue
+            if self.silent[t2] and list(self.pre[t2]) == [p]:
+                # t2 fires right after t1 without choice: t1 produces t2's outputs
+                for target, weight in list(self.post[t2].items()):
+                    self._add_arc(t1, target, weight)
+                self._absorb(t1, [p, t2])
+                self._remove_node(t2)
+                self._remove_node(p)
+                count += 1
+            elif self.silent[t1] and list(self.post[t1]) == [p] and list(self.pre[t2]) == [p]:
+                # t1 only prepares t2: t2 consumes t1's inputs directly
+                for source, weight in list(self.pre[t1].items()):
+                    self._add_arc(source, t2, weight)
+                self._absorb(t2, [p, t1])
+                self._remove_node(t1)
+                self._remove_node(p)
+                count += 1
+        return count
+
+    def fusion_of_silent_joins(self) -> int:
+        """Silent t with t•={p}, •p={t} and private inputs: p's consumers take t's inputs
+
+        Every input place of t feeds only t, so once t is enabled it stays
+        enabled and nothing competes for its tokens; skipping the detour
+        through p changes no visible behaviour.
+        """
+        count = 0
+        for t in sorted(self.transitions):
+            if t not in self.transitions or not self.silent[t]:
+                continue
+            if len(self.post[t]) != 1 or not self.pre[t]:
+                continue
+            (p, w_out), = self.post[t].items()
+            if w_out != 1 or p in self.pre[t] or list(self.pre[p]) != [t] or self.tokens[p] or self.final[p]:
+                continue
+            if not self.post[p] or any(list(self.post[q]) != [t] for q in self.pre[t]):
+                continue
+            consumers = sorted(self.post[p].items())
+            for source, source_weight in list(self.pre[t].items()):
+                for target, weight in consumers:
+                    self._add_arc(source, target, source_weight * weight)
+            self._absorb(consumers[0][0], [p, t])
+            self._remove_node(t)
+            self._remove_node(p)
+            count += 1
+        return count
+
+    def elimination_of_self_loop_places(self) -> int:
+        """Marked p whose only neighbour is t, in both directions with the same weight"""
+        count = 0
+        for p in sorted(self.places):
+            if p not in self.places or self.final[p]:
+                continue
+            if len(self.pre[p]) == 1 and self.pre[p] == self.post[p]:
+                (t, weight), = self.pre[p].items()
+                if self.tokens[p] >= weight:
+                    self._drop(t, p)
+                    count += 1
+        return count
+
+    def elimination_of_self_loop_transitions(self) -> int:
+        """Silent t with •t = t•: firing it never changes the marking"""
+        count = 0
+        for t in sorted(self.transitions):
+            if t in self.transitions and self.silent[t] and self.pre[t] and self.pre[t] == self.post[t]:
+                self._drop(next(iter(self.pre[t])), t)
+                count += 1
+        return count
+
+    def fusion_of_identical_places(self) -> int:
+        """Places with the same pre/post sets, weights and markings are redundant copies"""
+        count = 0
+        seen: Dict[tuple, str] = {}
+        for p in sorted(self.places):
+            key = (
+                frozenset(self.pre[p].items()), frozenset(self.post[p].items()),
+                self.tokens[p], self.final[p]
+            )
+            if not self.pre[p] and not self.post[p]:
+                continue
+            if key in seen:
+                self._drop(seen[key], p)
+                count += 1
+            else:
+                seen[key] = p
+        return count
+
+    def fusion_of_identical_transitions(self) -> int:
+        """Silent transitions with the same pre/post sets are interchangeable"""
+        count = 0
+        seen: Dict[tuple, str] = {}
+        for t in sorted(self.transitions):
+            if not self.silent[t]:
+                continue
+            key = (frozenset(self.pre[t].items()), frozenset(self.post[t].items()))
+            if key in seen:
+                self._drop(seen[key], t)
+                count += 1
+            else:
+                seen[key] = t
+        return count
+
+    def edge_members(self, reduced: PetriNetData) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+        """Original arcs per reduced arc, and per reduced node for arcs merged away inside it"""
+        owner = {member: element_id for element_id, members in self.members.items() for member in members}
+        reduced_edges = {(edge.source, edge.target): edge.id for edge in reduced.edges}
+        edges: Dict[str, List[str]] = {}
+        absorbed: Dict[str, List[str]] = {}
+        for edge in self.source.edges:
+            if edge.source not in owner or edge.target not in owner:
+                continue
+            source, target = owner[edge.source], owner[edge.target]
+            reduced_id = reduced_edges.get((source, target))
+            if reduced_id is not None:
+                edges.setdefault(reduced_id, []).append(edge.id)
+            else:
+                # Credit the arc to the node standing for its removed endpoint
+                absorbed.setdefault(source if source != edge.source else target, []).append(edge.id)
+        return (
+            {edge_id: sorted(members) for edge_id, members in edges.items()},
+            {node_id: sorted(members) for node_id, members in absorbed.items()}
+        )
+
+    def result(self, applied: Dict[str, int]) -> Dict[str, Any]:
+        """Reduced net, mappings and statistics in the form reduce() returns"""
+        reduced = self.to_petri_net_data()
+        edge_mapping, absorbed_edges = self.edge_members(reduced)
+        return {
+            "petri_net": reduced,
+            "mapping": {element_id: sorted(members) for element_id, members in self.members.items()},
+            "edge_mapping": edge_mapping,
+            "absorbed_edges": absorbed_edges,
+            "rules_applied": applied,
+            "original_statistics": net_statistics(self.source),
+            "reduced_statistics": reduced.statistics
+        }
+
+    def to_petri_net_data(self) -> PetriNetData:
+        """Materialize the reduced net, keeping original node and arc objects where possible"""
+        nodes = []
+        for node in self.source.nodes:
+            if node.id in self.places:
+                tokens = self.tokens[node.id]
+                data = node.data.model_copy(update={"tokens": tokens, "isInitialMarking": tokens > 0})
+                nodes.append(node.model_copy(update={"data": data}))
+            elif node.id in self.transitions:
+                nodes.append(node)
+
+        edges = []
+        for source in sorted(self.post):
+            for target, weight in sorted(self.post[source].items()):
+                original = self.original_edges.get((source, target))
+                if original is not None:
+                    edge_data = (original.data or EdgeData()).model_copy(update={"weight": weight})
+                    edges.append(original.model_copy(update={"data": edge_data}))
+                else:
+                    edges.append(Edge(
+                        id=f"{source}-{target}",
+                        source=source,
+                        target=target,
+                        data=EdgeData(weight=weight)
+                    ))
+
+        reduced = PetriNetData(
+            networkId=self.source.networkId,
+            networkName=self.source.networkName,
+            nodes=nodes,
+            edges=edges,
+            statistics={},
+            metadata={**(self.source.metadata or {}), "reduced": True}
+        )
+        reduced.statistics = net_statistics(reduced)
+        return reduced
@@ -0,0 +1,189 @@
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Any, Optional, Set
+from ..models.petri_net import PetriNetData
+
+SEARCH_MODES = ("substring", "prefix", "regex")
+NEIGHBORHOOD_DIRECTIONS = ("pre", "post", "both")
+# Length of the n-grams used for substring search
+NGRAM = 3
+# Longest regex accepted; matching runs in a worker thread and cannot be interrupted
+MAX_REGEX_LENGTH = 200
+
+
+class NetSearchIndex:
+    """Label/name search and k-hop neighbourhoods of one stored net
+
+    Every node is searchable by NodeData.label and NodeData.name, case
+    insensitively. Distinct terms are kept sorted for prefix search and
+    indexed by trigrams for substring search; regex search scans the
+    distinct terms only. Pre/post adjacency is built once so neighbourhood
+    queries only touch the nodes they return.
+    """
+
+    def __init__(self, petri_net_data: PetriNetData):
+        self.nodes = petri_net_data.nodes
+        self.edges = petri_net_data.edges
+        self.position = {node.id: i for i, node in enumerate(self.nodes)}
+
+        # Distinct lowercased terms and the nodes carrying each of them
+        term_nodes: Dict[str, Set[int]] = {}
+        for i, node in enumerate(self.nodes):
+            for value in (node.data.label, node.data.name):
+                if value:
+                    term_nodes.setdefault(value.lower(), set()).add(i)
+        self.terms = sorted(term_nodes)
+        self.term_nodes = [sorted(term_nodes[term]) for term in self.terms]
+
+        self.ngrams: Dict[str, List[int]] = {}
+        for t, term in enumerate(self.terms):
+            for gram in {term[k:k + NGRAM] for k in range(len(term) - NGRAM + 1)}:
+                self.ngrams.setdefault(gram, []).append(t)
+
+        self._build_adjacency()
+
+    def _build_adjacency(self) -> None:
+        """Adjacency as (neighbour, edge) pairs in both directions"""
+        self.pre: List[List[tuple]] = [[] for _ in self.nodes]
+        self.post: List[List[tuple]] = [[] for _ in self.nodes]
+        for e, edge in enumerate(self.edges):
+            source, target = self.position.get(edge.source), self.position.get(edge.target)
+            if source is not None and target is not None:
+                self.post[source].append((target, e))
+                self.pre[target].append((source, e))
+
+    def rebind(self, petri_net_data: PetriNetData, mapping: Dict[str, str]) -> Optional["NetSearchIndex"]:
+        """Same index over a structurally identical net with the same labels and names
+
+        mapping takes this index's node IDs to petri_net_data's. The terms and
+        trigrams are shared; None if any node's label or name differs from
+        its counterpart's, since the terms would then differ too.
+        """
+        index = NetSearchIndex.__new__(NetSearchIndex)
+        index.nodes = petri_net_data.nodes
+        index.edges = petri_net_data.edges
+        index.position = {node.id: i for i, node in enumerate(index.nodes)}
+
+        moved = []
+        for node in self.nodes:
+            i = index.position[mapping[node.id]]
+            counterpart = index.nodes[i]
+            if (counterpart.data.label, counterpart.data.name) != (node.data.label, node.data.name):
+                return None
+            moved.append(i)
+
+        index.terms = self.terms
+        index.term_nodes = [sorted(moved[i] for i in nodes) for nodes in self.term_nodes]
+        index.ngrams = self.ngrams
+        index._build_adjacency()
+        return index
+
+    def search(self, query: str, mode: str = "substring", node_type: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+        """Nodes whose label or name matches the query, in node order"""
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unsupported search mode: {mode}")
+
+        needle = query.lower()
+        if mode == "prefix":
+            start = bisect_left(self.terms, needle)
+            end = start
+            while end < len(self.terms) and self.terms[end].startswith(needle):
+                end += 1
+            term_ids = range(start, end)
+        elif mode == "substring":
+            term_ids = self._substring_terms(needle)
+        else:
+            pattern = re.compile(query, re.IGNORECASE)
+            term_ids = [t for t, term in enumerate(self.terms) if pattern.search(term)]
+
+        matched: Set[int] = set()
+        for t in term_ids:
+            matched.update(self.term_nodes[t])
+        if node_type is not None:
+            matched = {i for i in matched if self.nodes[i].type == node_type}
+
+        ordered = sorted(matched)
+        return {
+            "total": len(ordered),
+            "results": [self._summary(i) for i in ordered[:limit]]
+        }
+
+    def _substring_terms(self, needle: str) -> List[int]:
+        if len(needle) < NGRAM:
+            return [t for t, term in enumerate(self.terms) if needle in term]
+
+        # Intersect the posting lists of the needle's n-grams, smallest first
+        grams = sorted({needle[k:k + NGRAM] for k in range(len(needle) - NGRAM + 1)},
+                       key=lambda gram: len(self.ngrams.get(gram, ())))
+        candidates = set(self.ngrams.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(self.ngrams.get(gram, ()))
+        return sorted(t for t in candidates if needle in self.terms[t])
+
+    def neighborhood(self, node_id: str, hops: int = 1, direction: str = "both", limit: int = 1000) -> Dict[str, Any]:
+        """Subgraph of nodes within hops arcs of a node, following pre, post or both"""
+        if direction not in NEIGHBORHOOD_DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}")
+        start = self.position[node_id]
+
+        adjacency = []
+        if direction in ("pre", "both"):
+            adjacency.append(self.pre)
+        if direction in ("post", "both"):
+            adjacency.append(self.post)
+
+        distance = {start: 0}
+        queue = deque([start])
+        truncated = False
+        while queue and not truncated:
+            i = queue.popleft()
+            if distance[i] == hops:
+                continue
+            for neighbours in adjacency:
+                for j, _ in neighbours[i]:
+                    if j in distance:
+                        continue
+                    if len(distance) >= limit:
+                        truncated = True
+                        break
+                    distance[j] = distance[i] + 1
+                    queue.append(j)
+
+        edges = []
+        for i in distance:
+            for j, e in self.post[i]:
+                if j in distance:
+                    edges.append(self.edges[e])
+
+        nodes = []
+        for i in sorted(distance, key=lambda n: (distance[n], n)):
+            node = self.nodes[i]
+            nodes.append({
+                "id": node.id,
+                "type": node.type,
+                "position": node.position,
+                "data": node.data,
+                "distance": distance[i]
+            })
+
+        return {
+            "node_id": node_id,
+            "hops": hops,
+            "direction": direction,
+            "truncated": truncated,
+            "nodes": nodes,
+            "edges": edges
+        }
+
+    def _summary(self, i: int) -> Dict[str, Any]:
+        node = self.nodes[i]
+        return {
+            "id": node.id,
+            "type": node.type,
+            "label": node.data.label,
+            "name": node.data.name,
+            "isInvisible": node.data.isInvisible
+        }
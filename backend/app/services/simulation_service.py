@@ -0,0 +1,173 @@
+import random
+from typing import Dict, List, Any, Optional, Set, Tuple
+from ..models.petri_net import PetriNetData
+
+
+class TokenGameSession:
+    """Server-side token game on a Petri net
+
+    The enabled set is maintained incrementally: firing a transition only
+    re-checks the transitions consuming from the places it touched. Changes
+    are accumulated until flush_frame() so that any number of firings can be
+    pushed to the client as a single frame.
+    """
+
+    def __init__(self, petri_net_data: PetriNetData, seed: Optional[int] = None):
+        self.random = random.Random(seed)
+        self.step = 0
+
+        self.initial_marking: Dict[str, int] = {}
+        self.final_marking: Dict[str, int] = {}
+        for node in petri_net_data.nodes:
+            if node.type == "place":
+                self.initial_marking[node.id] = node.data.tokens or 0
+                if node.data.isFinalMarking:
+                    self.final_marking[node.id] = 1
+
+        # Pre/post sets as (place, weight) lists and place -> consuming transitions
+        self.pre: Dict[str, List[Tuple[str, int]]] = {}
+        self.post: Dict[str, List[Tuple[str, int]]] = {}
+        for node in petri_net_data.nodes:
+            if node.type == "transition":
+                self.pre[node.id] = []
+                self.post[node.id] = []
+        self.consumers: Dict[str, Set[str]] = {place_id: set() for place_id in self.initial_marking}
+        for edge in petri_net_data.edges:
+            weight = edge.data.weight if edge.data and edge.data.weight else 1
+            if edge.source in self.initial_marking and edge.target in self.pre:
+                self.pre[edge.target].append((edge.source, weight))
+                self.consumers[edge.source].add(edge.target)
+            elif edge.source in self.pre and edge.target in self.initial_marking:
+                self.post[edge.source].append((edge.target, weight))
+
+        self.reset()
+
+    def reset(self) -> None:
+        """Restore the initial marking and recompute the enabled set from scratch"""
+        self.step = 0
+        self.marking = dict(self.initial_marking)
+        self.total_tokens = sum(self.marking.values())
+
+        # Enabled transitions as list + position index for O(1) random choice and removal
+        self._enabled: List[str] = []
+        self._enabled_index: Dict[str, int] = {}
+        for transition_id in self.pre:
+            if self._is_enabled(transition_id):
+                self._add_enabled(transition_id)
+
+        self._changed_places: Set[str] = set()
+        self._enabled_added: Set[str] = set()
+        self._enabled_removed: Set[str] = set()
+        self._fired: List[str] = []
+
+    @property
+    def enabled(self) -> List[str]:
+        """Currently enabled transition IDs"""
+        return list(self._enabled)
+
+    def is_enabled(self, transition_id: str) -> bool:
+        """Check whether a transition is currently enabled"""
+        return transition_id in self._enabled_index
+
+    def is_deadlocked(self) -> bool:
+        """No transition can fire any more"""
+        return not self._enabled
+
+    def is_final(self) -> bool:
+        """The current marking equals the final marking"""
+        if not self.final_marking or self.total_tokens != sum(self.final_marking.values()):
+            return False
+        return all(self.marking[place_id] == tokens for place_id, tokens in self.final_marking.items())
+
+    def fire(self, transition_id: str) -> None:
+        """Fire an enabled transition and update the enabled set incrementally"""
+        if transition_id not in self.pre:
+            raise ValueError(f"Unknown transition: {transition_id}")
+        if not self.is_enabled(transition_id):
+            raise ValueError(f"Transition is not enabled: {transition_id}")
+
+        affected: Set[str] = set()
+        for place_id, weight in self.pre[transition_id]:
+            self.marking[place_id] -= weight
+            self.total_tokens -= weight
+            self._changed_places.add(place_id)
+            affected.update(self.consumers[place_id])
+        for place_id, weight in self.post[transition_id]:
+            self.marking[place_id] += weight
+            self.total_tokens += weight
+            self._changed_places.add(place_id)
+            affected.update(self.consumers[place_id])
+
+        for candidate in affected:
+            now_enabled = self._is_enabled(candidate)
+            if now_enabled and candidate not in self._enabled_index:
+                self._add_enabled(candidate)
+                self._record_enabled_change(candidate, True)
+            elif not now_enabled and candidate in self._enabled_index:
+                self._remove_enabled(candidate)
+                self._record_enabled_change(candidate, False)
+
+        self.step += 1
+        self._fired.append(transition_id)
+
+    def fire_random(self, steps: int = 1) -> int:
+        """Fire up to `steps` randomly chosen enabled transitions, return how many fired"""
+        fired = 0
+        while fired < steps and self._enabled:
+            self.fire(self._enabled[self.random.randrange(len(self._enabled))])
+            fired += 1
+        return fired
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full state, sent when a session starts or is reset"""
+        return {
+            "type": "init",
+            "step": self.step,
+            "marking": dict(self.marking),
+            "enabled": self.enabled,
+            "final_marking": dict(self.final_marking)
+        }
+
+    def has_pending_changes(self) -> bool:
+        """Whether anything happened since the last frame"""
+        return bool(self._fired)
+
+    def flush_frame(self) -> Dict[str, Any]:
+        """Return the changes accumulated since the previous frame and start a new one"""
+        frame = {
+            "type": "frame",
+            "step": self.step,
+            "fired": self._fired,
+            "marking": {place_id: self.marking[place_id] for place_id in self._changed_places},
+            "enabled_added": sorted(self._enabled_added),
+            "enabled_removed": sorted(self._enabled_removed)
+        }
+        self._changed_places = set()
+        self._enabled_added = set()
+        self._enabled_removed = set()
+        self._fired = []
+        return frame
+
+    def _is_enabled(self, transition_id: str) -> bool:
+        """Evaluate the enabling condition against the current marking"""
+        return all(self.marking[place_id] >= weight for place_id, weight in self.pre[transition_id])
+
+    def _add_enabled(self, transition_id: str) -> None:
+        self._enabled_index[transition_id] = len(self._enabled)
+        self._enabled.append(transition_id)
+
+    def _remove_enabled(self, transition_id: str) -> None:
+        # Swap with the last element to keep removal O(1)
+        index = self._enabled_index.pop(transition_id)
+        last = self._enabled.pop()
+        if last != transition_id:
+            self._enabled[index] = last
+            self._enabled_index[last] = index
+
+    def _record_enabled_change(self, transition_id: str, enabled: bool) -> None:
+        """Track enabled-set changes within a frame, cancelling out flip-flops"""
+        added, removed = (self._enabled_added, self._enabled_removed) if enabled else (self._enabled_removed, self._enabled_added)
+        if transition_id in removed:
+            removed.discard(transition_id)
+        else:
+            added.add(transition_id)
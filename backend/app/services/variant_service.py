@@ -0,0 +1,134 @@
+from typing import Dict, List, Any, Optional
+import numpy as np
+import pandas as pd
+from .encoded_log import EncodedEventLog, sequence_groups
+
+SORT_KEYS = ("count", "coverage", "length", "mean_duration", "median_duration")
+SORT_ORDERS = ("asc", "desc")
+
+
+class VariantIndex:
+    """Trace variants of an event log with counts and case durations
+
+    Cases are grouped into variants by hashing their activity-code slices of
+    the encoded log with vectorized passes (see sequence_groups), so only
+    one sequence per variant is handled in Python. The case -> variant
+    assignment is kept so that later filters can select cases by variant.
+    """
+
+    def __init__(self, log: EncodedEventLog):
+        self.activities = log.activities
+        activity_codes = log.activity_codes
+        timestamps = log.timestamps
+
+        # Case boundaries in the case-sorted event arrays
+        starts, ends = log.case_bounds()
+        self.case_ids = log.case_ids[log.case_codes[starts]]
+        case_durations = (timestamps[ends - 1] - timestamps[starts]) / 1e9 if len(starts) else np.array([])
+
+        # Variants numbered by first occurrence, and the sequence of each
+        case_variant, first_cases = sequence_groups(activity_codes, starts, ends)
+        self._sequences: List[np.ndarray] = [activity_codes[starts[i]:ends[i]] for i in first_cases]
+        self._variant_ids: Dict[bytes, int] = {sequence.tobytes(): v for v, sequence in enumerate(self._sequences)}
+        self.case_variant = case_variant
+
+        n_variants = len(self._sequences)
+        self.total_cases = len(starts)
+        self.counts = np.bincount(case_variant, minlength=n_variants)
+        self.lengths = (ends - starts)[first_cases].astype(np.int64)
+
+        durations = pd.DataFrame({"variant": case_variant, "duration": case_durations}).groupby("variant")["duration"]
+        self.mean_durations = durations.mean().reindex(range(n_variants)).to_numpy()
+        self.median_durations = durations.median().reindex(range(n_variants)).to_numpy()
+        self.min_durations = durations.min().reindex(range(n_variants)).to_numpy()
+        self.max_durations = durations.max().reindex(range(n_variants)).to_numpy()
+
+        self._sorted_orders: Dict[tuple, np.ndarray] = {}
+        self._activity_masks: Dict[int, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self._sequences)
+
+    def variant_of(self, activities: List[str]) -> Optional[int]:
+        """Look up the variant ID of an activity sequence"""
+        codes = self.activities.get_indexer(activities)
+        if (codes < 0).any():
+            return None
+        return self._variant_ids.get(codes.astype(np.int32).tobytes())
+
+    def cases_for_variants(self, variant_ids: List[int]) -> np.ndarray:
+        """Case IDs belonging to any of the given variants"""
+        return np.asarray(self.case_ids)[np.isin(self.case_variant, variant_ids)]
+
+    def top_k(self, k: int) -> List[int]:
+        """IDs of the k most frequent variants"""
+        return self._order("count", descending=True)[:k].tolist()
+
+    def query(
+        self,
+        page: int = 1,
+        page_size: int = 20,
+        sort: str = "count",
+        descending: bool = True,
+        activity: Optional[str] = None,
+        min_count: int = 1
+    ) -> Dict[str, Any]:
+        """Return one page of variants, optionally filtered by activity and frequency"""
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unsupported sort key: {sort}")
+
+        order = self._order(sort, descending)
+        mask = self.counts[order] >= min_count
+        if activity is not None:
+            code = self.activities.get_indexer([activity])[0]
+            if code < 0:
+                mask[:] = False
+            else:
+                mask &= self._variants_containing(code)[order]
+        selected = order[mask]
+
+        offset = (page - 1) * page_size
+        return {
+            "total_variants": len(self),
+            "total_cases": self.total_cases,
+            "matching_variants": int(len(selected)),
+            "page": page,
+            "page_size": page_size,
+            "variants": [self._describe(int(v)) for v in selected[offset:offset + page_size]]
+        }
+
+    def _order(self, sort: str, descending: bool) -> np.ndarray:
+        """Variant IDs sorted by the given key, cached per key and direction"""
+        cache_key = (sort, descending)
+        if cache_key not in self._sorted_orders:
+            values = {
+                "count": self.counts,
+                "coverage": self.counts,
+                "length": self.lengths,
+                "mean_duration": self.mean_durations,
+                "median_duration": self.median_durations
+            }[sort]
+            # Stable sort keeps ties in variant ID (first occurrence) order
+            self._sorted_orders[cache_key] = np.argsort(-values if descending else values, kind="stable")
+        return self._sorted_orders[cache_key]
+
+    def _variants_containing(self, code: int) -> np.ndarray:
+        """Boolean mask of variants containing an activity, cached per activity"""
+        if code not in self._activity_masks:
+            self._activity_masks[code] = np.array([(seq == code).any() for seq in self._sequences], dtype=bool)
+        return self._activity_masks[code]
+
+    def _describe(self, variant_id: int) -> Dict[str, Any]:
+        """JSON-friendly summary of one variant"""
+        count = int(self.counts[variant_id])
+        return {
+            "variant_id": variant_id,
+            "activities": [str(a) for a in self.activities[self._sequences[variant_id]]],
+            "count": count,
+            "coverage": count / self.total_cases if self.total_cases else 0.0,
+            "length": int(self.lengths[variant_id]),
+            "mean_duration": float(self.mean_durations[variant_id]),
+            "median_duration": float(self.median_durations[variant_id]),
+            "min_duration": float(self.min_durations[variant_id]),
+            "max_duration": float(self.max_durations[variant_id])
+        }
@@ -0,0 +1,288 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
+import numpy as np
+import pandas as pd
+from ..models.petri_net import PetriNetData
+from .encoded_log import EncodedEventLog
+from .fingerprint_service import canonical_form, net_fingerprint, structural_network_id, transition_label
+
+# How events are assigned to windows: each event by its own timestamp, or
+# whole cases by the timestamp of their first event
+WINDOW_ASSIGNMENTS = ("events", "cases")
+MAX_WINDOWS = 500
+
+# Per-process service instance, created on first use inside each worker
+_worker_service = None
+
+
+def _discover_worker(
+    log: EncodedEventLog,
+    settings: Dict[str, Any],
+    include_net: bool
+) -> Tuple[Dict[str, Any], Optional[PetriNetData], Optional[List[str]]]:
+    """Discover one window's net inside a worker process and summarize it
+
+    The net's canonical form is computed here once: its fingerprint goes into
+    the structure and its network ID, its canonical node order is returned
+    with the net for the store.
+    """
+    global _worker_service
+    if _worker_service is None:
+        from .pm4py_service import PM4PyService
+        _worker_service = PM4PyService()
+    petri_net_data = _worker_service.discover_petri_net(log.to_frame(), **settings)
+    fingerprint, canonical_order = canonical_form(petri_net_data)
+    petri_net_data.networkId = structural_network_id(fingerprint)
+    structure = net_structure(petri_net_data, fingerprint)
+    if not include_net:
+        return structure, None, None
+    return structure, petri_net_data, canonical_order
+
+
+def net_structure(petri_net_data: PetriNetData, fingerprint: Optional[str] = None) -> Dict[str, Any]:
+    """Label-level structure of a net, comparable across separately discovered nets
+
+    Relations are the (a, b) activity pairs connected through a place,
+    looking through invisible transitions on both sides. The fingerprint is
+    computed unless it is already known.
+    """
+    transitions = [node for node in petri_net_data.nodes if node.type == "transition"]
+    labels = {node.id: transition_label(node) for node in transitions}
+    pre: Dict[str, List[str]] = {node.id: [] for node in petri_net_data.nodes}
+    post: Dict[str, List[str]] = {node.id: [] for node in petri_net_data.nodes}
+    for edge in petri_net_data.edges:
+        if edge.source in post and edge.target in pre:
+            post[edge.source].append(edge.target)
+            pre[edge.target].append(edge.source)
+
+    def visible(place_id: str, neighbours: Dict[str, List[str]]) -> Set[str]:
+        result: Set[str] = set()
+        visited = {place_id}
+        stack = [place_id]
+        while stack:
+            for transition_id in neighbours[stack.pop()]:
+                if labels.get(transition_id):
+                    result.add(labels[transition_id])
+                    continue
+                for next_place in neighbours.get(transition_id, ()):
+                    if next_place not in visited:
+                        visited.add(next_place)
+                        stack.append(next_place)
+        return result
+
+    relations: Set[Tuple[str, str]] = set()
+    for node in petri_net_data.nodes:
+        if node.type == "place":
+            consumers = visible(node.id, post)
+            relations.update((a, b) for a in visible(node.id, pre) for b in consumers)
+
+    return {
+        "places": len(petri_net_data.nodes) - len(transitions),
+        "transitions": len(transitions),
+        "invisible_transitions": sum(1 for label in labels.values() if not label),
+        "arcs": len(petri_net_data.edges),
+        "fingerprint": fingerprint or net_fingerprint(petri_net_data),
+        "activities": sorted({label for label in labels.values() if label}),
+        "relations": sorted(relations)
+    }
+
+
+def structure_diff(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Changes between the structures of two consecutive windows"""
+    previous_relations = set(map(tuple, previous["relations"]))
+    current_relations = set(map(tuple, current["relations"]))
+    return {
+        "identical": previous["fingerprint"] == current["fingerprint"],
+        "activities_added": sorted(set(current["activities"]) - set(previous["activities"])),
+        "activities_removed": sorted(set(previous["activities"]) - set(current["activities"])),
+        "relations_added": [list(r) for r in sorted(current_relations - previous_relations)],
+        "relations_removed": [list(r) for r in sorted(previous_relations - current_relations)],
+        "places": current["places"] - previous["places"],
+        "transitions": current["transitions"] - previous["transitions"],
+        "arcs": current["arcs"] - previous["arcs"]
+    }
+
+
+# Structure of a window without events, so diffs against it show everything as added/removed
+EMPTY_STRUCTURE = {
+    "places": 0, "transitions": 0, "invisible_transitions": 0, "arcs": 0,
+    "fingerprint": None, "activities": [], "relations": []
+}
+
+
+class SlidingWindowDiscovery:
+    """Petri net discovery over sliding time windows of one log
+
+    Windows of a fixed size start every stride from the first timestamp.
+    Events (or case start times) are sorted by time once and every window's
+    slice is found by binary search, so cutting is a single pass whatever the
+    overlap. Windows are cut one at a time in a worker thread and discovered
+    in a process pool with at most max_in_flight windows submitted at once,
+    so heavily overlapping windows never hold more than a few copies of the
+    log. The parent only receives a label-level summary of each net, plus the
+    net itself when requested.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 2
+        self.max_in_flight = self.max_workers * 2
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def _replace_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Shut down a pool broken by a crashed worker; the next use starts a fresh one"""
+        if self._pool is broken:
+            self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, loop: asyncio.AbstractEventLoop, fn, *args) -> Tuple[asyncio.Future, ProcessPoolExecutor]:
+        """Run fn in the pool, replacing the pool first if it is already broken"""
+        pool = self.pool
+        try:
+            return loop.run_in_executor(pool, fn, *args), pool
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self.pool
+            return loop.run_in_executor(pool, fn, *args), pool
+
+    def windows(
+        self,
+        log: EncodedEventLog,
+        size: pd.Timedelta,
+        stride: pd.Timedelta,
+        assign: str = "events"
+    ) -> Iterator[Tuple[int, int, EncodedEventLog]]:
+        """(start, end, events) of every window, times in UTC nanoseconds
+
+        Each window's events are only copied out of the log when the iterator
+        reaches it; invalid arguments raise ValueError on the first step.
+        """
+        if assign not in WINDOW_ASSIGNMENTS:
+            raise ValueError(f"Unsupported window assignment: {assign}")
+        if pd.isna(size) or pd.isna(stride):
+            raise ValueError("Window size and stride must be durations")
+        if size <= pd.Timedelta(0) or stride <= pd.Timedelta(0):
+            raise ValueError("Window size and stride must be positive")
+        if len(log) == 0:
+            return
+
+        if assign == "events":
+            times = log.timestamps
+        else:
+            starts, _ = log.case_bounds()
+            times = log.timestamps[starts]
+        order = np.argsort(times, kind="stable")
+        sorted_times = times[order]
+
+        first, last = int(sorted_times[0]), int(sorted_times[-1])
+        n_windows = (last - first) // stride.value + 1
+        if n_windows > MAX_WINDOWS:
+            raise ValueError(f"{n_windows} windows exceed the limit of {MAX_WINDOWS}, use a larger stride")
+        window_starts = first + np.arange(n_windows, dtype=np.int64) * stride.value
+        window_ends = window_starts + size.value
+        lows = np.searchsorted(sorted_times, window_starts, side="left")
+        highs = np.searchsorted(sorted_times, window_ends, side="left")
+
+        for start, end, low, high in zip(window_starts.tolist(), window_ends.tolist(), lows, highs):
+            # Sorting the selected positions restores the case-grouped event order
+            selected = np.sort(order[low:high])
+            if assign == "cases":
+                keep_case = np.zeros(log.n_cases, dtype=bool)
+                keep_case[log.case_codes[starts[selected]]] = True
+                selected = np.flatnonzero(keep_case[log.case_codes])
+            yield start, end, log.take(selected)
+
+    async def discover(
+        self,
+        log: EncodedEventLog,
+        size: pd.Timedelta,
+        stride: pd.Timedelta,
+        settings: Dict[str, Any],
+        assign: str = "events",
+        include_nets: bool = False
+    ) -> Dict[str, Any]:
+        """Per-window summaries and diffs between consecutive windows
+
+        With include_nets every window summary carries its discovered net
+        under "petri_net" and the net's canonical node order under
+        "canonical_order". Windows whose discovery failed carry an "error"
+        and the diffs on either side of them are marked unavailable.
+        """
+        loop = asyncio.get_running_loop()
+        windows = self.windows(log, size, stride, assign)
+        summaries: List[Dict[str, Any]] = []
+        structures: Dict[int, Optional[Dict[str, Any]]] = {}
+        pending: Dict[asyncio.Future, Tuple[int, ProcessPoolExecutor]] = {}
+
+        async def submit_next() -> bool:
+            # Sorting and cutting copy events, so they run off the event loop
+            window = await loop.run_in_executor(None, next, windows, None)
+            if window is None:
+                return False
+            start, end, events = window
+            index = len(summaries)
+            summaries.append({
+                "index": index,
+                "start": pd.Timestamp(start, tz="UTC").isoformat(),
+                "end": pd.Timestamp(end, tz="UTC").isoformat(),
+                "cases": events.n_cases,
+                "events": len(events)
+            })
+            if len(events):
+                future, pool = self._submit(loop, _discover_worker, events, settings, include_nets)
+                pending[future] = (index, pool)
+            else:
+                structures[index] = EMPTY_STRUCTURE
+            return True
+
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_in_flight:
+                    exhausted = not await submit_next()
+                if not pending:
+                    break
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index, pool = pending.pop(future)
+                    try:
+                        structure, petri_net_data, canonical_order = future.result()
+                    except BrokenProcessPool:
+                        self._replace_pool(pool)
+                        summaries[index]["error"] = "Discovery worker process died"
+                        structure = None
+                    except Exception as e:
+                        summaries[index]["error"] = str(e)
+                        structure = None
+                    else:
+                        if petri_net_data is not None:
+                            summaries[index]["petri_net"] = petri_net_data
+                            summaries[index]["canonical_order"] = canonical_order
+                    structures[index] = structure
+        finally:
+            for future in pending:
+                future.cancel()
+
+        for index, summary in enumerate(summaries):
+            structure = structures[index]
+            if structure is None:
+                continue
+            summary.update({key: value for key, value in structure.items() if key != "relations"})
+            summary["activities"] = len(structure["activities"])
+
+        diffs = []
+        for i in range(1, len(summaries)):
+            previous, current = structures[i - 1], structures[i]
+            if previous is None or current is None:
+                diffs.append({"from": i - 1, "to": i, "available": False})
+            else:
+                diffs.append({"from": i - 1, "to": i, "available": True, **structure_diff(previous, current)})
+        return {"windows": summaries, "diffs": diffs}
@@ -0,0 +1,148 @@
+import gzip
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Any, Optional, IO
+import pandas as pd
+
+# Prefix PM4Py uses for trace-level attributes once flattened into a DataFrame
+CASE_ATTRIBUTE_PREFIX = "case:"
+
+ATTRIBUTE_TAGS = {"string", "date", "int", "float", "boolean", "id"}
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+class XESReader:
+    """Incremental XES / XES.gz reader producing columnar event data
+
+    The document is consumed with iterparse and every trace is cleared as soon
+    as its events have been copied into per-column lists, so memory grows with
+    the number of extracted values rather than with the size of the XML tree.
+    """
+
+    def read(
+        self,
+        file_path: str,
+        columns: Optional[List[str]] = None,
+        max_traces: Optional[int] = None
+    ) -> pd.DataFrame:
+        """Read an XES file into a DataFrame
+
+        columns uses the flattened PM4Py naming ('case:concept:name' for the
+        trace name, 'concept:name' for the event name, ...). When it is None,
+        every top-level trace and event attribute encountered is kept, which is
+        only sensible together with max_traces (e.g. for previews).
+        """
+        with self._open(file_path) as stream:
+            data, types, _ = self._parse(stream, columns, max_traces)
+        return self._to_dataframe(data, types)
+
+    def _open(self, file_path: str) -> IO[bytes]:
+        """Open plain or gzipped XES based on the file magic number"""
+        with open(file_path, 'rb') as probe:
+            magic = probe.read(2)
+        if magic == b'\x1f\x8b':
+            return gzip.open(file_path, 'rb')
+        return open(file_path, 'rb')
+
+    def _parse(
+        self,
+        stream: IO[bytes],
+        columns: Optional[List[str]],
+        max_traces: Optional[int]
+    ) -> tuple:
+        """Walk the document and fill one list per requested column"""
+        wanted = set(columns) if columns is not None else None
+        data: Dict[str, List[Any]] = {col: [] for col in (columns or [])}
+        types: Dict[str, str] = {}
+        rows = 0
+        traces = 0
+
+        trace_attrs: Dict[str, Any] = {}
+        event_attrs: Optional[Dict[str, Any]] = None
+        in_trace = False
+        # Depth of the current element below a trace/event; attributes are only
+        # read when they are direct children, nested meta-attributes are skipped
+        depth = 0
+        root = None
+
+        for action, elem in ET.iterparse(stream, events=("start", "end")):
+            tag = _local_name(elem.tag)
+
+            if action == "start":
+                if root is None:
+                    root = elem
+                if tag == "trace" and not in_trace:
+                    in_trace = True
+                    trace_attrs = {}
+                    depth = 0
+                elif tag == "event" and in_trace and depth == 0:
+                    event_attrs = {}
+                elif in_trace:
+                    depth += 1
+                continue
+
+            # action == "end"
+            if not in_trace:
+                if root is not None and elem is not root and tag != "log":
+                    # Global definitions, extensions and classifiers are not needed
+                    elem.clear()
+                continue
+
+            if tag == "trace" and depth == 0 and event_attrs is None:
+                in_trace = False
+                traces += 1
+                elem.clear()
+                root.clear()
+                if max_traces is not None and traces >= max_traces:
+                    break
+            elif tag == "event" and depth == 0 and event_attrs is not None:
+                row = {f"{CASE_ATTRIBUTE_PREFIX}{k}": v for k, v in trace_attrs.items()}
+                row.update(event_attrs)
+                self._append_row(data, row, wanted, rows)
+                rows += 1
+                event_attrs = None
+                elem.clear()
+            else:
+                depth -= 1
+                if depth == 0 and tag in ATTRIBUTE_TAGS:
+                    key = elem.get("key")
+                    if key is not None:
+                        if event_attrs is not None:
+                            event_attrs[key] = elem.get("value")
+                            types.setdefault(key, tag)
+                        else:
+                            trace_attrs[key] = elem.get("value")
+                            types.setdefault(f"{CASE_ATTRIBUTE_PREFIX}{key}", tag)
+
+        return data, types, traces
+
+    def _append_row(
+        self,
+        data: Dict[str, List[Any]],
+        row: Dict[str, Any],
+        wanted: Optional[set],
+        rows: int
+    ) -> None:
+        """Append one event to the column lists, padding missing values with None"""
+        if wanted is None:
+            for key in row:
+                if key not in data:
+                    data[key] = [None] * rows
+        for key, values in data.items():
+            values.append(row.get(key))
+
+    def _to_dataframe(self, data: Dict[str, List[Any]], types: Dict[str, str]) -> pd.DataFrame:
+        """Build the DataFrame and convert typed attributes once per column"""
+        df = pd.DataFrame(data)
+        for col in df.columns:
+            attr_type = types.get(col)
+            if attr_type == "date":
+                df[col] = pd.to_datetime(df[col], utc=True, errors="coerce")
+            elif attr_type in ("int", "float"):
+                df[col] = pd.to_numeric(df[col], errors="coerce")
+            elif attr_type == "boolean":
+                df[col] = df[col].map({"true": True, "false": False})
+        return df
@@ -0,0 +1,113 @@
+"""Benchmark the trusted PM4Py -> PetriNetData conversion path
+
+Builds a synthetic PM4Py net and converts it with the trusted converters
+and with the validated construction they replaced, on the same input, and
+compares response serialization against the previous dict()/
+jsonable_encoder path. Exits non-zero if any output differs.
+
+Usage (from backend/): python -m benchmarks.conversion --elements 100000
+"""
+import argparse
+import json
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from unittest.mock import patch
+from fastapi.encoders import jsonable_encoder
+from pydantic_core import to_json
+from pm4py.objects.petri_net.obj import PetriNet, Marking
+from pm4py.objects.petri_net.utils import petri_utils
+from app.models.petri_net import PetriNetData, Node, NodeData, Edge, EdgeData, Position
+from app.services import petri_net_service, pm4py_service
+from app.services.petri_net_service import PetriNetService
+from app.services.pm4py_service import PM4PyService
+
+
+def build_net(elements: int):
+    """Sequence of place -> transition pairs with every tenth transition silent"""
+    net = PetriNet("benchmark")
+    places, transitions = [], []
+    for i in range(elements // 2):
+        place = PetriNet.Place(f"p{i}")
+        transition = PetriNet.Transition(f"t{i}", None if i % 10 == 0 else f"activity {i % 50}")
+        net.places.add(place)
+        net.transitions.add(transition)
+        places.append(place)
+        transitions.append(transition)
+    for i, (place, transition) in enumerate(zip(places, transitions)):
+        petri_utils.add_arc_from_to(place, transition, net)
+        if i + 1 < len(places):
+            petri_utils.add_arc_from_to(transition, places[i + 1], net)
+    final = PetriNet.Place("sink")
+    net.places.add(final)
+    petri_utils.add_arc_from_to(transitions[-1], final, net)
+    return net, Marking({places[0]: 1}), Marking({final: 1})
+
+
+@contextmanager
+def validated_construction():
+    """Run the converters as they were before trusted construction
+
+    Every model_construct call validates through the model's constructor
+    and the GC threshold stays at its default, which is the validated path
+    the converters replaced, applied to the same PM4Py input.
+    """
+    models = (PetriNetData, Node, NodeData, Edge, EdgeData, Position)
+    originals = {model: model.__dict__["model_construct"] for model in models if "model_construct" in model.__dict__}
+    try:
+        for model in models:
+            model.model_construct = classmethod(lambda cls, _fields_set=None, **values: cls(**values))
+        with patch.object(petri_net_service, "bulk_construction", nullcontext), \
+                patch.object(pm4py_service, "bulk_construction", nullcontext):
+            yield
+    finally:
+        for model in models:
+            if model in originals:
+                model.model_construct = originals[model]
+            else:
+                del model.model_construct
+
+
+def timed(label: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print(f"  {label:<40} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--elements", type=int, default=100000, help="approximate number of places and transitions")
+    args = parser.parse_args()
+
+    net, initial_marking, final_marking = build_net(args.elements)
+    print(f"{len(net.places)} places, {len(net.transitions)} transitions, {len(net.arcs)} arcs")
+    identical = True
+
+    print("PM4PyService._convert_to_react_flow")
+    service = PM4PyService()
+    nodes, edges = timed("trusted construction", service._convert_to_react_flow, net, initial_marking, final_marking, {})
+    with validated_construction():
+        reference = timed("validated construction", service._convert_to_react_flow, net, initial_marking, final_marking, {})
+    identical &= [n.model_dump() for n in reference[0]] == [n.model_dump() for n in nodes]
+    identical &= [e.model_dump() for e in reference[1]] == [e.model_dump() for e in edges]
+
+    print("PetriNetService.convert_pm4py_to_frontend")
+    converter = PetriNetService()
+    discovered = timed("trusted construction", converter.convert_pm4py_to_frontend, net, initial_marking, final_marking)
+    with validated_construction():
+        reference = timed("validated construction", converter.convert_pm4py_to_frontend, net, initial_marking, final_marking)
+    identical &= reference.model_dump() == discovered.model_dump()
+
+    print("Response serialization")
+    previous = timed("model_dump + jsonable_encoder + json.dumps",
+                     lambda data: json.dumps(jsonable_encoder({"petri_net": data.model_dump()})), discovered)
+    current = timed("pydantic_core.to_json", lambda data: to_json({"petri_net": data}), discovered)
+    identical &= json.loads(previous) == json.loads(current)
+
+    print("outputs identical" if identical else "OUTPUTS DIFFER")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Benchmark encoded event-log ingestion against the PM4Py-formatted DataFrame
+
+Writes a synthetic CSV event log in each timestamp format, then reads it
+both the previous way (read_csv + pm4py.format_dataframe, string columns)
+and into an EncodedEventLog, reporting ingestion time, peak traced memory
+and the size of the stored log, and the time of log statistics and
+directly-follows counting on each. Exits non-zero if the statistics or
+counts differ.
+
+Usage (from backend/): python -m benchmarks.event_log --events 2000000 [--timestamp-format sample]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import pm4py
+from app.services.encoded_log import EncodedEventLog, CASE_KEY, ACTIVITY_KEY, TIMESTAMP_KEY
+
+# ISO timestamps, and the format of the bundled frontend/public/Event_Log.csv (1/2/2023 12:27)
+TIMESTAMP_FORMATS = {
+    "iso": "%Y-%m-%d %H:%M:%S",
+    "sample": "%-m/%-d/%Y %H:%M"
+}
+
+
+def write_log(path: str, events: int, timestamp_format: str, seed: int = 0) -> None:
+    """Cases of 5-25 events over 40 activities and 200 resources, in random row order"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(5, 26, size=events // 5)
+    lengths = lengths[np.cumsum(lengths) <= events]
+    cases = np.repeat(np.arange(len(lengths)), lengths)
+    starts = rng.integers(0, 365 * 86400, size=len(lengths))
+    offsets = rng.integers(60, 86400, size=len(cases)).cumsum()
+    offsets -= np.repeat(np.r_[0, offsets[np.cumsum(lengths)[:-1] - 1]], lengths)
+    seconds = np.repeat(starts, lengths) + offsets
+    df = pd.DataFrame({
+        "case_id": np.char.add("case-", cases.astype(str)),
+        "activity": np.char.add("activity ", rng.integers(0, 40, size=len(cases)).astype(str)),
+        "resource": np.char.add("user ", rng.integers(0, 200, size=len(cases)).astype(str)),
+        "timestamp": pd.to_datetime(seconds + 1672531200, unit="s").strftime(timestamp_format)
+    }).sample(frac=1, random_state=seed)
+    df.to_csv(path, index=False)
+
+
+def measured(label: str, fn, *args):
+    """Time one untraced run, then trace a second run for its peak memory"""
+    start = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<36} {elapsed:8.3f} s  peak {peak / 2**20:8.1f} MiB")
+    return result
+
+
+def read_formatted(path: str) -> pd.DataFrame:
+    df = pd.read_csv(path, usecols=["case_id", "activity", "resource", "timestamp"])
+    return pm4py.format_dataframe(df, case_id="case_id", activity_key="activity", timestamp_key="timestamp")
+
+
+def read_encoded(path: str) -> EncodedEventLog:
+    columns = ["case_id", "activity", "resource"]
+    df = pd.read_csv(path, usecols=columns + ["timestamp"], dtype={col: "category" for col in columns})
+    return EncodedEventLog.from_frame(df, "case_id", "activity", "timestamp", "resource")
+
+
+def frame_statistics(df: pd.DataFrame):
+    cases, activities = df[CASE_KEY], df[ACTIVITY_KEY]
+    same_case = cases.eq(cases.shift(-1))
+    pairs = pd.DataFrame({"source": activities[same_case.values].values,
+                          "target": activities.shift(-1)[same_case.values].values})
+    statistics = {"total_traces": cases.nunique(), "total_events": len(df), "unique_activities": activities.nunique()}
+    return statistics, {key: int(count) for key, count in pairs.value_counts().items()}
+
+
+def encoded_statistics(log: EncodedEventLog):
+    return log.statistics(), log.directly_follows_counts()
+
+
+def benchmark(events: int, timestamp_format: str) -> bool:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "log.csv")
+        write_log(path, events, TIMESTAMP_FORMATS[timestamp_format])
+        print(f"{timestamp_format} timestamps, {os.path.getsize(path) / 2**20:.1f} MiB CSV")
+
+        print("Ingestion")
+        df = measured("read_csv + pm4py.format_dataframe", read_formatted, path)
+        log = measured("read_csv + EncodedEventLog", read_encoded, path)
+
+    stored = df[[CASE_KEY, ACTIVITY_KEY, TIMESTAMP_KEY, "resource"]].memory_usage(deep=True).sum()
+    encoded = sum(array.nbytes for array in (log.case_codes, log.activity_codes, log.timestamps, log.resource_codes))
+    encoded += sum(index.memory_usage(deep=True) for index in (log.case_ids, log.activities, log.resources))
+    print(f"{len(log)} events, {log.n_cases} cases")
+    print(f"  stored log: DataFrame {stored / 2**20:.1f} MiB, encoded {encoded / 2**20:.1f} MiB")
+
+    print("Statistics and directly-follows counts")
+    previous = measured("string columns (pandas)", frame_statistics, df)
+    current = measured("codes (numpy)", encoded_statistics, log)
+    identical = previous == current
+
+    print("outputs identical" if identical else "OUTPUTS DIFFER")
+    return identical
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=2000000, help="approximate number of events")
+    parser.add_argument("--timestamp-format", choices=list(TIMESTAMP_FORMATS), action="append",
+                        help="timestamp format of the written log, repeatable (default: all)")
+    args = parser.parse_args()
+
+    results = [benchmark(args.events, name) for name in args.timestamp_format or TIMESTAMP_FORMATS]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
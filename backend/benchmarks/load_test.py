@@ -0,0 +1,267 @@
+"""Concurrent load test of the API with weighted scenario mixes
+
+Drives the FastAPI app either in-process through its ASGI interface or over
+HTTP against a running server, with a fixed number of concurrent clients
+each picking operations at random according to the scenario's weights.
+Operations use the bundled samples in frontend/public (complex-sample.pnml
+and Event_Log.csv); IDs created by uploads and imports are reused by the
+read operations. Reports throughput, p50/p95/p99 latency and error rate
+per operation, and the server's resident memory over time (in-process, or
+with --server-pid for a local server).
+
+Scenarios are the built-in SCENARIOS or a JSON file mapping scenario names
+to {operation: weight}, e.g. {"reads": {"get_petri_net": 9, "statistics": 1}}.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --scenario mixed --concurrency 16 --duration 30
+    python -m benchmarks.load_test --url http://localhost:8000 --server-pid 1234
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import warnings
+from collections import defaultdict
+from typing import Dict, List, Any, Optional, Tuple
+import httpx
+import numpy as np
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "public")
+PNML_SAMPLE = "complex-sample.pnml"
+EVENT_LOG_SAMPLE = "Event_Log.csv"
+EVENT_LOG_CONFIG = {"case_id_column": "people_id", "activity_column": "concept:name", "timestamp_column": "datetime"}
+
+OPERATIONS = (
+    "upload_pnml", "import_event_log", "discover_dfg",
+    "get_petri_net", "statistics", "export_pnml", "variants", "dfg"
+)
+
+SCENARIOS: Dict[str, Dict[str, int]] = {
+    "mixed": {
+        "upload_pnml": 2, "get_petri_net": 10, "statistics": 4, "export_pnml": 3,
+        "import_event_log": 1, "variants": 3, "dfg": 3
+    },
+    "read_heavy": {"get_petri_net": 10, "statistics": 5, "export_pnml": 2, "variants": 2, "dfg": 2},
+    "uploads": {"upload_pnml": 1},
+    "imports": {"import_event_log": 3, "discover_dfg": 1},
+}
+
+# Seconds between server memory samples
+MEMORY_INTERVAL = 1.0
+
+
+class LoadTest:
+    """Shared state of one run: sample files, created IDs and recorded results"""
+
+    def __init__(self, client: httpx.AsyncClient, weights: Dict[str, int]):
+        self.client = client
+        self.operations = list(weights)
+        self.weights = [weights[op] for op in self.operations]
+        with open(os.path.join(SAMPLES_DIR, PNML_SAMPLE), "rb") as f:
+            self.pnml = f.read()
+        with open(os.path.join(SAMPLES_DIR, EVENT_LOG_SAMPLE), "rb") as f:
+            self.event_log = f.read()
+        self.petri_net_ids: List[str] = []
+        self.event_log_ids: List[str] = []
+        # operation -> list of (latency in seconds, status code or 0 on transport error)
+        self.results: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+
+    async def upload_pnml(self) -> httpx.Response:
+        response = await self.client.post("/api/upload-pnml", files={"file": (PNML_SAMPLE, self.pnml, "application/xml")})
+        if response.status_code == 200:
+            self.petri_net_ids.append(response.json()["petri_net_id"])
+        return response
+
+    async def import_event_log(self) -> httpx.Response:
+        response = await self.client.post(
+            "/api/import-event-log",
+            files={"file": (EVENT_LOG_SAMPLE, self.event_log, "text/csv")},
+            data={"config": json.dumps(EVENT_LOG_CONFIG)}
+        )
+        if response.status_code == 200:
+            body = response.json()
+            self.event_log_ids.append(body["event_log_id"])
+            self.petri_net_ids.append(body["petri_net_id"])
+        return response
+
+    async def discover_dfg(self) -> httpx.Response:
+        return await self.client.post(
+            "/api/discover-dfg",
+            files={"file": (EVENT_LOG_SAMPLE, self.event_log, "text/csv")},
+            data={"config": json.dumps(EVENT_LOG_CONFIG)}
+        )
+
+    async def get_petri_net(self) -> httpx.Response:
+        return await self.client.get(f"/api/petri-net/{random.choice(self.petri_net_ids)}")
+
+    async def statistics(self) -> httpx.Response:
+        return await self.client.get(f"/api/statistics/{random.choice(self.petri_net_ids)}")
+
+    async def export_pnml(self) -> httpx.Response:
+        return await self.client.get(f"/api/export-pnml/{random.choice(self.petri_net_ids)}")
+
+    async def variants(self) -> httpx.Response:
+        return await self.client.get(f"/api/variants/{random.choice(self.event_log_ids)}")
+
+    async def dfg(self) -> httpx.Response:
+        return await self.client.get(f"/api/dfg/{random.choice(self.event_log_ids)}")
+
+    async def seed(self) -> None:
+        """Create one net and one event log so read operations have targets"""
+        for operation in (self.upload_pnml, self.import_event_log):
+            response = await operation()
+            response.raise_for_status()
+
+    async def run_one(self, operation: str) -> None:
+        start = time.perf_counter()
+        try:
+            response = await getattr(self, operation)()
+            status = response.status_code
+        except httpx.HTTPError:
+            status = 0
+        self.results[operation].append((time.perf_counter() - start, status))
+
+    async def worker(self, deadline: float, remaining: List[int]) -> None:
+        while time.perf_counter() < deadline and remaining[0] != 0:
+            remaining[0] -= 1
+            await self.run_one(random.choices(self.operations, self.weights)[0])
+
+
+def rss_bytes(pid: Optional[int]) -> Optional[int]:
+    """Resident set size of a process from /proc, None where unavailable"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+async def sample_memory(pid: Optional[int], samples: List[Tuple[float, int]], started: float) -> None:
+    while True:
+        rss = rss_bytes(pid)
+        if rss is not None:
+            samples.append((time.perf_counter() - started, rss))
+        await asyncio.sleep(MEMORY_INTERVAL)
+
+
+def summarize(results: List[Tuple[float, int]], elapsed: float) -> Dict[str, Any]:
+    latencies = np.array([latency for latency, _ in results]) * 1000
+    statuses: Dict[str, int] = defaultdict(int)
+    for _, status in results:
+        statuses[str(status)] += 1
+    errors = sum(count for status, count in statuses.items() if not status.startswith("2"))
+    return {
+        "requests": len(results),
+        "throughput": len(results) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "error_rate": errors / len(results),
+        "statuses": dict(statuses)
+    }
+
+
+def load_scenarios(path: Optional[str]) -> Dict[str, Dict[str, int]]:
+    if path is None:
+        return SCENARIOS
+    with open(path) as f:
+        return json.load(f)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = load_scenarios(args.scenario_file)
+    if args.scenario not in scenarios:
+        raise SystemExit(f"Unknown scenario {args.scenario}, expected one of: {', '.join(scenarios)}")
+    weights = scenarios[args.scenario]
+    unknown = [op for op in weights if op not in OPERATIONS]
+    if unknown:
+        raise SystemExit(f"Unknown operations in scenario {args.scenario}: {', '.join(unknown)}")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        pid = args.server_pid
+    else:
+        # PM4Py warns on every PNML import; keep the report readable
+        warnings.filterwarnings("ignore")
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=args.timeout)
+        pid = None
+    memory_available = bool(args.url is None or args.server_pid)
+
+    async with client:
+        test = LoadTest(client, weights)
+        await test.seed()
+
+        samples: List[Tuple[float, int]] = []
+        started = time.perf_counter()
+        sampler = asyncio.create_task(sample_memory(pid, samples, started)) if memory_available else None
+        remaining = [args.requests or -1]
+        deadline = started + args.duration
+        await asyncio.gather(*(test.worker(deadline, remaining) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        if sampler is not None:
+            sampler.cancel()
+            rss = rss_bytes(pid)
+            if rss is not None:
+                samples.append((elapsed, rss))
+
+    everything = [result for results in test.results.values() for result in results]
+    return {
+        "scenario": args.scenario,
+        "target": args.url or "in-process",
+        "concurrency": args.concurrency,
+        "elapsed": elapsed,
+        "total": summarize(everything, elapsed) if everything else None,
+        "operations": {op: summarize(results, elapsed) for op, results in sorted(test.results.items())},
+        "memory": [{"t": round(t, 2), "rss_mb": round(rss / 2**20, 1)} for t, rss in samples]
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"scenario {report['scenario']} against {report['target']}, "
+          f"{report['concurrency']} clients, {report['elapsed']:.1f} s")
+    print(f"  {'operation':<18} {'requests':>8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    rows = list(report["operations"].items())
+    if report["total"]:
+        rows.append(("total", report["total"]))
+    for name, stats in rows:
+        print(f"  {name:<18} {stats['requests']:>8} {stats['throughput']:>8.1f} {stats['p50_ms']:>9.1f} "
+              f"{stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f} {stats['error_rate']:>6.1%}")
+        failed = {status: count for status, count in stats["statuses"].items() if not status.startswith("2")}
+        if failed:
+            print(f"  {'':<18} non-2xx: {failed}")
+    if report["memory"]:
+        print("  server memory (s: MiB) " + ", ".join(f"{m['t']:.0f}: {m['rss_mb']:.0f}" for m in report["memory"]))
+    else:
+        print("  server memory not sampled (pass --server-pid for a local server)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", default="mixed", help="scenario name")
+    parser.add_argument("--scenario-file", help="JSON file with scenario definitions")
+    parser.add_argument("--concurrency", type=int, default=8, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="run time in seconds")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0: no limit)")
+    parser.add_argument("--url", help="base URL of a running server; in-process if omitted")
+    parser.add_argument("--server-pid", type=int, help="PID of the local server process serving requests (the reloader's child with --reload), for memory sampling")
+    parser.add_argument("--timeout", type=float, default=120, help="per-request timeout in seconds")
+    parser.add_argument("--json", help="also write the full report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["total"] and report["total"]["error_rate"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import os
+import sys
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLES_DIR = os.path.join(BACKEND_DIR, "..", "frontend", "public")
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def sample_path(filename: str) -> str:
+    """Path of a sample file bundled with the frontend"""
+    return os.path.join(SAMPLES_DIR, filename)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """API client on empty net and event log stores"""
+    from fastapi.testclient import TestClient
+    from app.api import petri_net
+    from app.main import app
+    from app.services.fingerprint_service import FingerprintIndex
+
+    for store in ("petri_nets", "event_logs", "reduced_nets", "cluster_hierarchies", "search_indexes"):
+        monkeypatch.setattr(petri_net, store, {})
+    monkeypatch.setattr(petri_net, "fingerprint_index", FingerprintIndex())
+    with TestClient(app) as test_client:
+        yield test_client
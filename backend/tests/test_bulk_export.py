@@ -0,0 +1,33 @@
+import io
+import json
+import threading
+import zipfile
+from conftest import sample_path
+
+
+def _upload(client, filename):
+    with open(sample_path(filename), "rb") as f:
+        return client.post("/api/upload-pnml", files={"file": (filename, f, "application/xml")}).json()["petri_net_id"]
+
+
+def test_bulk_export_deflates_off_the_event_loop(client, monkeypatch):
+    ids = [_upload(client, "sample.pnml"), _upload(client, "complex-sample.pnml")]
+    writers = []
+    writestr = zipfile.ZipFile.writestr
+
+    def recording_writestr(archive, info, data, *args, **kwargs):
+        writers.append(threading.current_thread().name)
+        return writestr(archive, info, data, *args, **kwargs)
+
+    monkeypatch.setattr(zipfile.ZipFile, "writestr", recording_writestr)
+    with client:
+        loop_thread = client.portal.call(lambda: threading.current_thread().name)
+        response = client.post("/api/export-bulk", json={"petri_net_ids": ids})
+    assert response.status_code == 200
+
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    manifest = json.loads(archive.read("manifest.json"))
+    assert sorted(entry["petri_net_id"] for entry in manifest["files"]) == sorted(ids)
+    assert manifest["errors"] == []
+    assert all(archive.read(entry["file"]).startswith(b"<?xml") for entry in manifest["files"])
+    assert len(writers) == 3 and loop_thread not in writers
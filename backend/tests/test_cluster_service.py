@@ -0,0 +1,36 @@
+from conftest import sample_path
+
+
+def _upload(client, filename):
+    with open(sample_path(filename), "rb") as f:
+        return client.post("/api/upload-pnml", files={"file": (filename, f, "application/xml")}).json()["petri_net_id"]
+
+
+def test_level_zero_is_the_net(client):
+    petri_net_id = _upload(client, "complex-sample.pnml")
+    net = client.get(f"/api/petri-net/{petri_net_id}").json()
+
+    view = client.get(f"/api/clusters/{petri_net_id}", params={"level": 0}).json()
+    assert view["level"] == 0
+    assert sorted(view["nodes"], key=lambda n: n["id"]) == sorted(net["nodes"], key=lambda n: n["id"])
+    assert sorted(view["edges"], key=lambda e: e["id"]) == sorted(net["edges"], key=lambda e: e["id"])
+
+
+def test_coarsest_view_covers_every_node(client):
+    petri_net_id = _upload(client, "complex-sample.pnml")
+    view = client.get(f"/api/clusters/{petri_net_id}").json()
+
+    assert view["level"] == view["levels"] > 0
+    sizes = [n["data"].get("size", 1) for n in view["nodes"]]
+    assert sum(sizes) == view["clusters_per_level"][0]
+
+    cluster = next(n for n in view["nodes"] if n["type"] == "cluster")
+    expanded = client.get(f"/api/clusters/{petri_net_id}", params={"expand": cluster["id"]}).json()
+    assert cluster["id"] not in {n["id"] for n in expanded["nodes"]}
+    assert set(cluster["data"]["children"]) <= {n["id"] for n in expanded["nodes"]}
+
+
+def test_unknown_net_or_cluster_is_not_found(client):
+    petri_net_id = _upload(client, "sample.pnml")
+    assert client.get("/api/clusters/missing").status_code == 404
+    assert client.get(f"/api/clusters/{petri_net_id}", params={"expand": "cluster_9_9"}).status_code == 404
@@ -0,0 +1,22 @@
+import gc
+import pytest
+from app.models.petri_net import PetriNetData, bulk_construction
+from app.services.pm4py_service import PM4PyService
+from conftest import sample_path
+
+
+def test_converted_nets_match_validated_models():
+    petri_net_data = PM4PyService().parse_pnml_path(sample_path("complex-sample.pnml"))
+    dumped = petri_net_data.model_dump()
+    assert PetriNetData.model_validate(dumped).model_dump() == dumped
+
+
+def test_bulk_construction_restores_the_gc_threshold():
+    threshold = gc.get_threshold()
+    with pytest.raises(RuntimeError):
+        with bulk_construction():
+            with bulk_construction():
+                assert gc.get_threshold()[0] > threshold[0]
+            assert gc.get_threshold()[0] > threshold[0]
+            raise RuntimeError("conversion failed")
+    assert gc.get_threshold() == threshold
@@ -0,0 +1,74 @@
+import io
+import json
+import pandas as pd
+import pytest
+from app.services.encoded_log import EncodedEventLog
+from app.services.incremental_service import IncrementalLogState
+
+CONFIG = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time"}
+EVENTS = [
+    ("c1", "a", "2024-01-01 08:00"), ("c1", "b", "2024-01-01 09:00"),
+    ("c2", "a", "2024-01-01 10:00"),
+]
+HEADER_ONLY = b"case,activity,time\n"
+INVALID_ROWS = b"case,activity,time\nc1,a,not a time\n,b,2024-01-01 08:00\nc2,,2024-01-01 09:00\n"
+
+
+def _log(rows):
+    df = pd.DataFrame(rows, columns=["case", "activity", "time"])
+    return EncodedEventLog.from_frame(df, "case", "activity", "time")
+
+
+def _csv(rows):
+    return pd.DataFrame(rows, columns=["case", "activity", "time"]).to_csv(index=False).encode("utf-8")
+
+
+def _import(client, content):
+    return client.post(
+        "/api/import-event-log",
+        files={"file": ("log.csv", io.BytesIO(content), "text/csv")},
+        data={"config": json.dumps(CONFIG)}
+    )
+
+
+def test_case_bounds():
+    starts, ends = _log(EVENTS).case_bounds()
+    assert starts.tolist() == [0, 2]
+    assert ends.tolist() == [2, 3]
+
+
+def test_empty_log_has_no_cases():
+    log = _log([])
+    starts, ends = log.case_bounds()
+    assert len(starts) == len(ends) == 0
+    assert log.start_activity_counts() == {}
+    assert log.end_activity_counts() == {}
+    assert log.directly_follows_counts() == {}
+    assert IncrementalLogState(log).statistics() == {"total_traces": 0, "total_events": 0, "unique_activities": 0}
+
+
+@pytest.mark.parametrize("content", [HEADER_ONLY, INVALID_ROWS])
+def test_import_without_valid_events_is_rejected(client, content):
+    response = _import(client, content)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("content", [HEADER_ONLY, INVALID_ROWS])
+def test_append_without_valid_events_is_rejected(client, content):
+    imported = _import(client, _csv(EVENTS))
+    assert imported.status_code == 200
+    event_log_id = imported.json()["event_log_id"]
+
+    response = client.post(
+        f"/api/event-log/{event_log_id}/append",
+        files={"file": ("batch.csv", io.BytesIO(content), "text/csv")}
+    )
+    assert response.status_code == 400
+
+    # The stored log is untouched and still accepts valid batches
+    response = client.post(
+        f"/api/event-log/{event_log_id}/append",
+        files={"file": ("batch.csv", io.BytesIO(_csv([("c3", "a", "2024-01-02 08:00")])), "text/csv")}
+    )
+    assert response.status_code == 200
+    assert response.json()["statistics"]["total_events"] == 4
@@ -0,0 +1,180 @@
+import io
+import json
+import pandas as pd
+import pytest
+from app.services.encoded_log import EncodedEventLog
+from app.services.log_filter_service import EventLogFilterChain
+from conftest import sample_path
+
+# Four cases over two days; variant a,b,c occurs twice
+EVENTS = [
+    ("c1", "a", "2024-01-01 08:00"), ("c1", "b", "2024-01-01 09:00"), ("c1", "c", "2024-01-01 10:00"),
+    ("c2", "a", "2024-01-01 11:00"), ("c2", "b", "2024-01-01 12:00"), ("c2", "c", "2024-01-02 09:00"),
+    ("c3", "a", "2024-01-02 08:00"), ("c3", "d", "2024-01-02 09:00"),
+    ("c4", "b", "2024-01-02 10:00"), ("c4", "a", "2024-01-02 11:00"), ("c4", "x", "2024-01-02 12:00"),
+]
+
+
+@pytest.fixture
+def log():
+    df = pd.DataFrame(EVENTS, columns=["case", "activity", "time"])
+    return EncodedEventLog.from_frame(df, "case", "activity", "time")
+
+
+def _cases(log):
+    return sorted(log.case_ids[log.case_codes[i]] for i in log.case_bounds()[0])
+
+
+def _activities(log):
+    return sorted(log.activity_counts())
+
+
+def test_empty_chain_returns_the_log(log):
+    chain = EventLogFilterChain([])
+    assert not chain
+    assert chain.apply(log) is log
+
+
+@pytest.mark.parametrize("mode, cases, events", [
+    ("events", ["c1", "c2"], 5),
+    ("contained", ["c1"], 3),
+    ("intersecting", ["c1", "c2"], 6),
+])
+def test_time_window_modes(log, mode, cases, events):
+    chain = EventLogFilterChain([{"type": "time_window", "end": "2024-01-01T23:59:59", "mode": mode}])
+    filtered = chain.apply(log)
+    assert _cases(filtered) == cases
+    assert len(filtered) == events
+
+
+def test_time_window_with_timezone(log):
+    # 10:30+02:00 is 08:30 UTC, so only c1's first event is before it
+    chain = EventLogFilterChain([{"type": "time_window", "end": "2024-01-01T10:30:00+02:00"}])
+    assert len(chain.apply(log)) == 1
+
+
+def test_top_k_variants(log):
+    filtered = EventLogFilterChain([{"type": "top_k_variants", "k": 1}]).apply(log)
+    assert _cases(filtered) == ["c1", "c2"]
+
+
+def test_cases_containing(log):
+    any_of = EventLogFilterChain([{"type": "cases_containing", "activities": ["d", "x"]}]).apply(log)
+    assert _cases(any_of) == ["c3", "c4"]
+    all_of = EventLogFilterChain([{"type": "cases_containing", "activities": ["a", "c"], "mode": "all"}]).apply(log)
+    assert _cases(all_of) == ["c1", "c2"]
+    excluded = EventLogFilterChain([{"type": "cases_containing", "activities": ["c"], "exclude": True}]).apply(log)
+    assert _cases(excluded) == ["c3", "c4"]
+    unknown = EventLogFilterChain([{"type": "cases_containing", "activities": ["missing"]}]).apply(log)
+    assert len(unknown) == 0
+
+
+def test_remove_rare_activities(log):
+    filtered = EventLogFilterChain([{"type": "remove_rare_activities", "min_count": 2}]).apply(log)
+    assert _activities(filtered) == ["a", "b", "c"]
+    # Unused dictionary entries are dropped along with the events
+    assert list(filtered.activities) == ["a", "b", "c"]
+    by_fraction = EventLogFilterChain([{"type": "remove_rare_activities", "min_fraction": 0.3}]).apply(log)
+    assert _activities(by_fraction) == ["a"]
+
+
+def test_filters_see_only_events_kept_before_them(log):
+    # Only c3 and c4 lie within day two, and the tie between their variants goes to c3;
+    # the other way round the top variant's cases c1 and c2 both start on day one
+    day_two = {"type": "time_window", "start": "2024-01-02", "mode": "contained"}
+    top = {"type": "top_k_variants", "k": 1}
+    assert _cases(EventLogFilterChain([day_two, top]).apply(log)) == ["c3"]
+    assert _cases(EventLogFilterChain([top, day_two]).apply(log)) == []
+
+
+@pytest.mark.parametrize("spec", [
+    {"type": "unknown"},
+    {"type": "time_window"},
+    {"type": "time_window", "start": "not a date"},
+    {"type": "time_window", "end": "NaT"},
+    {"type": "time_window", "start": "2024-01-01", "mode": "sideways"},
+    {"type": "top_k_variants", "k": 0},
+    {"type": "top_k_variants", "k": "3"},
+    {"type": "top_k_variants", "k": True},
+    {"type": "cases_containing", "activities": []},
+    {"type": "cases_containing", "activities": "abc"},
+    {"type": "cases_containing", "activities": ["a", 1]},
+    {"type": "cases_containing", "activities": ["a"], "mode": "some"},
+    {"type": "cases_containing", "activities": ["a"], "exclude": "yes"},
+    {"type": "remove_rare_activities"},
+    {"type": "remove_rare_activities", "min_count": "5"},
+    {"type": "remove_rare_activities", "min_count": 2.5},
+    {"type": "remove_rare_activities", "min_count": -1},
+    {"type": "remove_rare_activities", "min_count": True},
+    {"type": "remove_rare_activities", "min_fraction": "0.5"},
+    {"type": "remove_rare_activities", "min_fraction": 1.5},
+    {"type": "remove_rare_activities", "min_fraction": -0.1},
+])
+def test_invalid_filters_are_rejected(spec):
+    with pytest.raises(ValueError):
+        EventLogFilterChain([spec])
+
+
+@pytest.mark.parametrize("spec", [
+    {"type": "remove_rare_activities", "min_count": "5"},
+    {"type": "remove_rare_activities", "min_fraction": 2},
+    {"type": "cases_containing", "activities": "abc"},
+])
+def test_import_rejects_mistyped_filters(client, spec):
+    config = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time", "filters": [spec]}
+    response = client.post(
+        "/api/import-event-log",
+        files={"file": ("log.csv", io.BytesIO(_csv(EVENTS)), "text/csv")},
+        data={"config": json.dumps(config)}
+    )
+    assert response.status_code == 400
+
+
+def _csv(rows):
+    return pd.DataFrame(rows, columns=["case", "activity", "time"]).to_csv(index=False).encode("utf-8")
+
+
+def _import(client, rows, filters):
+    config = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time", "filters": filters}
+    response = client.post(
+        "/api/import-event-log",
+        files={"file": ("log.csv", io.BytesIO(_csv(rows)), "text/csv")},
+        data={"config": json.dumps(config)}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_append_reapplies_the_filters(client):
+    filters = [{"type": "remove_rare_activities", "min_count": 2}]
+    imported = _import(client, EVENTS[:8], filters)
+    # The batch makes d frequent enough to pass the filter
+    batch = [("c5", "a", "2024-01-03 08:00"), ("c5", "d", "2024-01-03 09:00")]
+    response = client.post(
+        f"/api/event-log/{imported['event_log_id']}/append",
+        files={"file": ("batch.csv", io.BytesIO(_csv(batch)), "text/csv")}
+    )
+    assert response.status_code == 200, response.text
+
+    fresh = _import(client, EVENTS[:8] + batch, filters)
+    assert response.json()["statistics"] == {"total_traces": 4, "total_events": 10, "unique_activities": 4}
+    for endpoint in ("dfg", "variants"):
+        appended = client.get(f"/api/{endpoint}/{imported['event_log_id']}").json()
+        imported_fresh = client.get(f"/api/{endpoint}/{fresh['event_log_id']}").json()
+        appended.pop("event_log_id", None), imported_fresh.pop("event_log_id", None)
+        assert appended == imported_fresh
+
+
+@pytest.mark.parametrize("bound", ["start", "end"])
+def test_import_rejects_invalid_time_window(client, bound):
+    config = {
+        "case_id_column": "people_id", "activity_column": "concept:name", "timestamp_column": "datetime",
+        "filters": [{"type": "time_window", bound: "yesterday-ish"}]
+    }
+    with open(sample_path("Event_Log.csv"), "rb") as f:
+        response = client.post(
+            "/api/import-event-log",
+            files={"file": ("Event_Log.csv", f, "text/csv")},
+            data={"config": json.dumps(config)}
+        )
+    assert response.status_code == 400
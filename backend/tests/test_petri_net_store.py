@@ -0,0 +1,146 @@
+import io
+import re
+from app.api import petri_net
+from app.services.search_service import NetSearchIndex
+from conftest import sample_path
+
+
+def _upload(client, filename):
+    with open(sample_path(filename), "rb") as f:
+        response = client.post("/api/upload-pnml", files={"file": (filename, f, "application/xml")})
+    assert response.status_code == 200
+    return response.json()["petri_net_id"]
+
+
+def test_identical_uploads_get_their_own_ids(client):
+    first = _upload(client, "complex-sample.pnml")
+    second = _upload(client, "complex-sample.pnml")
+
+    assert first != second
+    # The content is stored once and shared between both IDs
+    assert petri_net.petri_nets[first] is petri_net.petri_nets[second]
+    fingerprint = client.get(f"/api/fingerprint/{first}").json()
+    assert fingerprint["duplicates"] == [second]
+    listed = client.get(f"/api/petri-nets/by-fingerprint/{fingerprint['fingerprint']}").json()
+    assert listed["petri_net_ids"] == sorted([first, second])
+
+
+def test_delete_removes_only_the_deleted_upload(client):
+    first = _upload(client, "complex-sample.pnml")
+    second = _upload(client, "complex-sample.pnml")
+    fingerprint = client.get(f"/api/fingerprint/{first}").json()["fingerprint"]
+    assert client.get(f"/api/search/{first}", params={"q": "p"}).status_code == 200
+
+    assert client.delete(f"/api/petri-net/{first}").status_code == 200
+
+    assert client.get(f"/api/petri-net/{first}").status_code == 404
+    assert client.get(f"/api/statistics/{first}").status_code == 404
+    assert client.delete(f"/api/petri-net/{first}").status_code == 404
+    # The analyses of the shared object stay with the remaining ID
+    fingerprint_entries = petri_net.search_indexes[fingerprint]
+    assert [entry[0] for entry in fingerprint_entries] == [petri_net.petri_nets[second]]
+    assert client.get(f"/api/petri-net/{second}").status_code == 200
+    listed = client.get(f"/api/petri-nets/by-fingerprint/{fingerprint}").json()
+    assert listed["petri_net_ids"] == [second]
+
+
+def test_deleting_every_duplicate_forgets_the_fingerprint(client):
+    ids = [_upload(client, "sample.pnml") for _ in range(3)]
+    fingerprint = client.get(f"/api/fingerprint/{ids[0]}").json()["fingerprint"]
+
+    for petri_net_id in ids:
+        assert client.delete(f"/api/petri-net/{petri_net_id}").status_code == 200
+
+    assert petri_net.petri_nets == {}
+    assert client.get(f"/api/petri-nets/by-fingerprint/{fingerprint}").json()["petri_net_ids"] == []
+    assert fingerprint not in petri_net.fingerprint_index.nets_by_fingerprint
+
+
+def test_different_nets_are_not_shared(client):
+    first = _upload(client, "sample.pnml")
+    second = _upload(client, "complex-sample.pnml")
+
+    assert petri_net.petri_nets[first] is not petri_net.petri_nets[second]
+    assert client.get(f"/api/fingerprint/{first}").json()["duplicates"] == []
+    # Statistics are those of each upload's own content
+    assert client.get(f"/api/statistics/{first}").json() != client.get(f"/api/statistics/{second}").json()
+
+
+def _upload_variant(client, filename, **replacements):
+    """Upload a sample with text replaced, e.g. element IDs or the net's name"""
+    with open(sample_path(filename), encoding="utf-8") as f:
+        content = f.read()
+    for pattern, replacement in replacements.items():
+        content = re.sub(pattern, replacement, content)
+    response = client.post("/api/upload-pnml", files={"file": (filename, io.BytesIO(content.encode("utf-8")), "application/xml")})
+    assert response.status_code == 200
+    return response.json()["petri_net_id"]
+
+
+def _renamed(client, filename):
+    return _upload_variant(client, filename, **{r'\b(id|source|target)="([^"]+)"': r'\1="copy_\2"'})
+
+
+def test_structural_duplicates_share_analyses(client, monkeypatch):
+    first = _upload(client, "complex-sample.pnml")
+    second = _renamed(client, "complex-sample.pnml")
+    fingerprint = petri_net.fingerprint_index.fingerprints[first]
+    assert petri_net.fingerprint_index.fingerprints[second] == fingerprint
+    assert petri_net.petri_nets[first] is not petri_net.petri_nets[second]
+
+    original = client.get(f"/api/reduce/{first}").json()
+    # The second net's reduction is carried over instead of recomputed
+    monkeypatch.setattr(petri_net.petri_net_reducer, "reduce", None)
+    reduced = client.get(f"/api/reduce/{second}").json()
+
+    assert reduced["mapping"] == {
+        f"copy_{element_id}": [f"copy_{member}" for member in members]
+        for element_id, members in original["mapping"].items()
+    }
+    assert reduced["reduced_statistics"] == original["reduced_statistics"]
+    node_ids = {node["id"] for node in client.get(f"/api/petri-net/{second}").json()["nodes"]}
+    assert {node["id"] for node in reduced["petri_net"]["nodes"]} <= node_ids
+    assert len(petri_net.reduced_nets[fingerprint]) == 2
+
+    levels = client.get(f"/api/clusters/{first}").json()["clusters_per_level"]
+    view = client.get(f"/api/clusters/{second}", params={"level": 1}).json()
+    assert view["clusters_per_level"] == levels
+    assert {n["id"] for n in view["nodes"] if n["type"] != "cluster"} <= node_ids
+    assert all(set(n["data"]["children"]) <= node_ids for n in view["nodes"] if n["type"] == "cluster")
+
+
+def _sorted_results(response):
+    # Results come in node order, which depends on the order PM4Py parsed the file in
+    return sorted(response.json()["results"], key=lambda result: result["id"])
+
+
+class _Unbuildable(NetSearchIndex):
+    def __init__(self, petri_net_data):
+        raise AssertionError("search index built although it could be shared")
+
+
+def test_search_index_is_shared_only_with_matching_labels(client, monkeypatch):
+    first = _upload(client, "complex-sample.pnml")
+    relabelled = _renamed(client, "complex-sample.pnml")
+    renamed = _upload_variant(client, "complex-sample.pnml", **{"Complex Business Process": "Renamed Process"})
+    assert petri_net.petri_nets[renamed] is not petri_net.petri_nets[first]
+
+    expected = _sorted_results(client.get(f"/api/search/{first}", params={"q": "valid"}))
+    # Different element IDs mean different labels, so that net gets its own index
+    assert client.get(f"/api/search/{relabelled}", params={"q": "valid"}).json()["total"] == len(expected)
+    monkeypatch.setattr(petri_net, "NetSearchIndex", _Unbuildable)
+    assert _sorted_results(client.get(f"/api/search/{renamed}", params={"q": "valid"})) == expected
+    assert len(petri_net.search_indexes[petri_net.fingerprint_index.fingerprints[first]]) == 3
+
+
+def test_deleting_a_net_drops_only_its_analyses(client):
+    first = _upload(client, "sample.pnml")
+    second = _renamed(client, "sample.pnml")
+    fingerprint = petri_net.fingerprint_index.fingerprints[first]
+    for petri_net_id in (first, second):
+        assert client.get(f"/api/reduce/{petri_net_id}").status_code == 200
+
+    assert client.delete(f"/api/petri-net/{first}").status_code == 200
+    assert [entry[0] for entry in petri_net.reduced_nets[fingerprint]] == [petri_net.petri_nets[second]]
+    assert client.delete(f"/api/petri-net/{second}").status_code == 200
+    assert fingerprint not in petri_net.reduced_nets
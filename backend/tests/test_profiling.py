@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from app.api import profiling
+
+TOKEN = "secret"
+
+
+@pytest.fixture
+def profiled_client(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", TOKEN)
+    monkeypatch.setattr(profiling, "profile_store", profiling.ProfileStore(5))
+
+    app = FastAPI()
+    app.add_middleware(profiling.RequestProfilingMiddleware)
+    app.include_router(profiling.router)
+
+    @app.get("/api/echo")
+    async def echo(request: Request):
+        return {"query": list(request.query_params.multi_items()), "header": request.headers.get(profiling.PROFILE_HEADER)}
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("params, headers", [
+    ({"profile": "1", "profile_token": TOKEN}, {}),
+    ({"profile": "1"}, {"X-Profile-Token": TOKEN}),
+])
+def test_opted_in_request_is_profiled_and_stripped(profiled_client, params, headers):
+    response = profiled_client.get("/api/echo", params={"a": "x y", **params, "b": "2"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"query": [["a", "x y"], ["b", "2"]], "header": None}
+    assert "x-profile-id" in response.headers
+
+
+@pytest.mark.parametrize("params, headers", [
+    ({"profile_token": TOKEN}, {}),
+    ({}, {"X-Profile-Token": TOKEN}),
+    ({"profile": "0", "profile_token": TOKEN}, {}),
+    ({"profile": "1", "profile_token": "wrong"}, {}),
+])
+def test_request_without_flag_or_token_is_not_profiled(profiled_client, params, headers):
+    response = profiled_client.get("/api/echo", params={"a": "1", **params}, headers=headers)
+    assert response.json() == {"query": [["a", "1"]], "header": None}
+    assert "x-profile-id" not in response.headers
+
+
+def test_admin_endpoints_take_the_profile_token(profiled_client):
+    profile_id = profiled_client.get("/api/echo", params={"profile": "1", "profile_token": TOKEN}).headers["x-profile-id"]
+
+    listed = profiled_client.get("/api/admin/profiles", params={"profile_token": TOKEN})
+    assert listed.status_code == 200
+    assert [p["profile_id"] for p in listed.json()["profiles"]] == [profile_id]
+    assert profiled_client.get(f"/api/admin/profiles/{profile_id}", headers={"X-Profile-Token": TOKEN}).status_code == 200
+    assert profiled_client.get("/api/admin/profiles", params={"token": TOKEN}).status_code == 403
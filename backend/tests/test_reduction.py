@@ -0,0 +1,181 @@
+import json
+from collections import Counter
+import pytest
+from app.models.petri_net import PetriNetData, Node, NodeData, Edge, EdgeData, Position
+from app.services.fingerprint_service import transition_label
+from app.services.pm4py_service import PM4PyService
+from app.services.reduction_service import PetriNetReducer, RULES
+from conftest import sample_path
+
+BUNDLED_NETS = [
+    "sample.pnml",
+    "complex-sample.pnml",
+    "illegal.pnml",
+    "student_learning_process.pnml",
+    "student_learning_process (1).apnml",
+]
+
+
+def _net(places, transitions, arcs, tokens=(), final=(), silent=()):
+    """Small net from element IDs; transitions are labelled with their ID"""
+    nodes = []
+    for p in places:
+        nodes.append(Node(id=p, type="place", position=Position(x=0, y=0), data=NodeData(
+            id=p, type="place", label=p, name=p,
+            tokens=1 if p in tokens else 0, isInitialMarking=p in tokens, isFinalMarking=p in final
+        )))
+    for t in transitions:
+        nodes.append(Node(id=t, type="transition", position=Position(x=0, y=0), data=NodeData(
+            id=t, type="transition", label=t, name=t, isInvisible=t in silent
+        )))
+    edges = [
+        Edge(id=f"{source}->{target}", source=source, target=target, data=EdgeData(weight=1))
+        for source, target in arcs
+    ]
+    return PetriNetData(nodes=nodes, edges=edges, statistics={})
+
+
+def _visible_labels(petri_net_data):
+    return Counter(
+        transition_label(node) for node in petri_net_data.nodes
+        if node.type == "transition" and not node.data.isInvisible
+    )
+
+
+def _check_reduction(original, result):
+    """Properties every reduction has to keep"""
+    reduced = result["petri_net"]
+    assert _visible_labels(reduced) == _visible_labels(original)
+    # Every original element is represented by exactly one reduced element
+    members = sorted(m for group in result["mapping"].values() for m in group)
+    assert members == sorted(node.id for node in original.nodes)
+    assert set(result["mapping"]) == {node.id for node in reduced.nodes}
+    node_ids = {node.id for node in reduced.nodes}
+    assert all(edge.source in node_ids and edge.target in node_ids for edge in reduced.edges)
+    # Every original arc is carried by one reduced arc or absorbed into one reduced node
+    assert set(result["edge_mapping"]) <= {edge.id for edge in reduced.edges}
+    assert set(result["absorbed_edges"]) <= node_ids
+    edge_members = [m for group in (*result["edge_mapping"].values(), *result["absorbed_edges"].values()) for m in group]
+    assert sorted(edge_members) == sorted(edge.id for edge in original.edges)
+    # The rules run to a fixpoint, so reducing again changes nothing
+    again = PetriNetReducer().reduce(reduced)
+    assert not any(again["rules_applied"].values())
+
+
+@pytest.fixture(scope="module")
+def pm4py_service():
+    return PM4PyService()
+
+
+@pytest.mark.parametrize("filename", BUNDLED_NETS)
+def test_bundled_nets_are_already_reduced(pm4py_service, filename):
+    original = pm4py_service.parse_pnml_path(sample_path(filename))
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    assert set(result["rules_applied"]) == set(RULES)
+    assert not any(result["rules_applied"].values())
+    assert result["reduced_statistics"] == result["original_statistics"]
+
+
+def test_discovered_net_loses_only_silent_transitions(client):
+    config = {"case_id_column": "people_id", "activity_column": "concept:name", "timestamp_column": "datetime"}
+    with open(sample_path("Event_Log.csv"), "rb") as f:
+        response = client.post(
+            "/api/import-event-log",
+            files={"file": ("Event_Log.csv", f, "text/csv")},
+            data={"config": json.dumps(config)}
+        )
+    assert response.status_code == 200
+    original = PetriNetData.model_validate(response.json()["petri_net"])
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    before, after = result["original_statistics"], result["reduced_statistics"]
+    assert after["transitions"] - after["invisible_transitions"] == before["transitions"] - before["invisible_transitions"]
+    assert after["invisible_transitions"] <= before["invisible_transitions"]
+    assert any(result["rules_applied"].values())
+    assert after["final_places"] == before["final_places"]
+
+
+def test_silent_chain_is_fused():
+    # p0 -a-> p1 -tau1-> p2 -tau2-> p3 -b-> p4
+    original = _net(
+        ["p0", "p1", "p2", "p3", "p4"], ["a", "tau1", "tau2", "b"],
+        [("p0", "a"), ("a", "p1"), ("p1", "tau1"), ("tau1", "p2"),
+         ("p2", "tau2"), ("tau2", "p3"), ("p3", "b"), ("b", "p4")],
+        tokens={"p0"}, final={"p4"}, silent={"tau1", "tau2"}
+    )
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    reduced = result["petri_net"]
+    assert result["reduced_statistics"]["invisible_transitions"] == 0
+    assert sorted(n.id for n in reduced.nodes if n.type == "transition") == ["a", "b"]
+    assert result["reduced_statistics"]["places"] == 3
+    # a now feeds b's input place directly; the silent detour lives on inside that place
+    (place,) = [e.target for e in reduced.edges if e.source == "a"]
+    assert result["edge_mapping"][f"a-{place}"] == ["a->p1"]
+    assert result["absorbed_edges"][place] == ["p1->tau1", "p2->tau2", "tau1->p2", "tau2->p3"]
+
+
+def test_identical_places_are_fused():
+    original = _net(
+        ["start", "left", "right", "end"], ["a", "b"],
+        [("start", "a"), ("a", "left"), ("a", "right"), ("left", "b"), ("right", "b"), ("b", "end")],
+        tokens={"start"}, final={"end"}
+    )
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    assert result["rules_applied"]["fusion_of_identical_places"] == 1
+    assert result["reduced_statistics"]["places"] == 3
+
+
+def test_marked_self_loop_place_is_removed():
+    original = _net(
+        ["start", "loop", "end"], ["a"],
+        [("start", "a"), ("a", "end"), ("loop", "a"), ("a", "loop")],
+        tokens={"start", "loop"}, final={"end"}
+    )
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    assert result["rules_applied"]["elimination_of_self_loop_places"] == 1
+    assert "loop" in result["mapping"]["a"]
+
+
+def test_visible_transitions_are_never_merged():
+    # Two visible transitions with identical pre and post sets stay apart
+    original = _net(
+        ["start", "end"], ["a", "b"],
+        [("start", "a"), ("a", "end"), ("start", "b"), ("b", "end")],
+        tokens={"start"}, final={"end"}
+    )
+    result = PetriNetReducer().reduce(original)
+
+    _check_reduction(original, result)
+    assert result["reduced_statistics"]["transitions"] == 2
+
+
+def test_reduced_endpoints_share_one_reduction(client):
+    config = {"case_id_column": "people_id", "activity_column": "concept:name", "timestamp_column": "datetime"}
+    with open(sample_path("Event_Log.csv"), "rb") as f:
+        imported = client.post(
+            "/api/import-event-log",
+            files={"file": ("Event_Log.csv", f, "text/csv")},
+            data={"config": json.dumps(config)}
+        ).json()
+    petri_net_id = imported["petri_net_id"]
+
+    reduction = client.get(f"/api/reduce/{petri_net_id}").json()
+    reduced_edges = {edge["id"] for edge in reduction["petri_net"]["edges"]}
+    assert set(reduction["edge_mapping"]) <= reduced_edges
+    statistics = client.get(f"/api/statistics/{petri_net_id}", params={"reduced": True}).json()
+    assert statistics == reduction["reduced_statistics"]
+    exported = client.get(f"/api/export-pnml/{petri_net_id}", params={"reduced": True})
+    assert exported.status_code == 200
+    with client.websocket_connect(f"/api/simulate/{petri_net_id}?reduced=true") as ws:
+        init = ws.receive_json()
+        assert set(init["marking"]) == {n["id"] for n in reduction["petri_net"]["nodes"] if n["type"] == "place"}
+    assert client.get("/api/reduce/missing").status_code == 404
@@ -0,0 +1,53 @@
+import pytest
+from app.services.search_service import MAX_REGEX_LENGTH
+from conftest import sample_path
+
+
+@pytest.fixture
+def petri_net_id(client):
+    with open(sample_path("complex-sample.pnml"), "rb") as f:
+        return client.post("/api/upload-pnml", files={"file": ("complex-sample.pnml", f, "application/xml")}).json()["petri_net_id"]
+
+
+def _ids(response):
+    return sorted(result["id"] for result in response.json()["results"])
+
+
+def test_search_modes_agree(client, petri_net_id):
+    substring = client.get(f"/api/search/{petri_net_id}", params={"q": "valid"})
+    regex = client.get(f"/api/search/{petri_net_id}", params={"q": "valid", "mode": "regex"})
+    prefix = client.get(f"/api/search/{petri_net_id}", params={"q": "valid", "mode": "prefix"})
+    assert substring.status_code == regex.status_code == prefix.status_code == 200
+    assert _ids(substring) == _ids(regex)
+    assert set(_ids(prefix)) <= set(_ids(substring))
+    assert substring.json()["total"] > 0
+
+
+@pytest.mark.parametrize("params", [
+    {"q": "(", "mode": "regex"},
+    {"q": "a" * (MAX_REGEX_LENGTH + 1), "mode": "regex"},
+    {"q": "a", "mode": "fuzzy"},
+])
+def test_invalid_searches_are_rejected(client, petri_net_id, params):
+    assert client.get(f"/api/search/{petri_net_id}", params=params).status_code == 400
+
+
+def test_neighborhood_grows_with_hops(client, petri_net_id):
+    node_id = client.get(f"/api/petri-net/{petri_net_id}").json()["nodes"][0]["id"]
+    sizes = []
+    for hops in range(3):
+        response = client.get(f"/api/neighborhood/{petri_net_id}/{node_id}", params={"hops": hops})
+        assert response.status_code == 200
+        neighborhood = response.json()
+        assert neighborhood["nodes"][0]["id"] == node_id
+        assert max(node["distance"] for node in neighborhood["nodes"]) <= hops
+        node_ids = {node["id"] for node in neighborhood["nodes"]}
+        assert all(edge["source"] in node_ids and edge["target"] in node_ids for edge in neighborhood["edges"])
+        sizes.append(len(node_ids))
+    assert sizes[0] == 1
+    assert sizes == sorted(sizes) and sizes[-1] > 1
+
+
+def test_unknown_net_or_node_is_not_found(client, petri_net_id):
+    assert client.get("/api/search/missing", params={"q": "a"}).status_code == 404
+    assert client.get(f"/api/neighborhood/{petri_net_id}/missing").status_code == 404
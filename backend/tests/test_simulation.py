@@ -0,0 +1,66 @@
+import pytest
+from app.api import petri_net
+from app.models.petri_net import PetriNetData
+
+
+@pytest.fixture
+def loop_net_id(client):
+    """Stored net whose only transition can fire forever: p -> t -> p"""
+    position = {"x": 0, "y": 0}
+    petri_net.petri_nets["loop"] = PetriNetData.model_validate({
+        "nodes": [
+            {"id": "p", "type": "place", "position": position,
+             "data": {"id": "p", "type": "place", "label": "p", "name": "p", "tokens": 1}},
+            {"id": "t", "type": "transition", "position": position,
+             "data": {"id": "t", "type": "transition", "label": "t", "name": "t"}},
+        ],
+        "edges": [
+            {"id": "p-t", "source": "p", "target": "t"},
+            {"id": "t-p", "source": "t", "target": "p"},
+        ],
+        "statistics": {}
+    })
+    return "loop"
+
+
+def test_random_steps_are_capped_per_message(client, loop_net_id, monkeypatch):
+    monkeypatch.setattr(petri_net, "SIMULATION_MAX_STEPS_PER_FRAME", 5)
+    with client.websocket_connect(f"/api/simulate/{loop_net_id}") as ws:
+        assert ws.receive_json()["type"] == "init"
+        ws.send_json({"action": "random", "steps": 10 ** 12})
+        frame = ws.receive_json()
+        assert frame["type"] == "frame"
+        assert frame["step"] == 5
+
+
+def test_run_stops_at_the_step_limit(client, loop_net_id, monkeypatch):
+    monkeypatch.setattr(petri_net, "SIMULATION_MAX_RUN_STEPS", 7)
+    with client.websocket_connect(f"/api/simulate/{loop_net_id}") as ws:
+        ws.receive_json()
+        ws.send_json({"action": "run", "max_steps": 10 ** 12})
+        message = ws.receive_json()
+        while message["type"] == "frame":
+            message = ws.receive_json()
+        assert message == {"type": "done", "step": 7, "reason": "max_steps"}
+
+
+@pytest.mark.parametrize("message", [
+    {"action": "random", "steps": 0},
+    {"action": "random", "steps": -3},
+    {"action": "random", "steps": 2.5},
+    {"action": "random", "steps": "10"},
+    {"action": "random", "steps": True},
+    {"action": "run", "rate": -1},
+    {"action": "run", "rate": "fast"},
+    {"action": "run", "max_steps": 0},
+    {"action": "run", "max_steps": -100},
+])
+def test_invalid_step_counts_and_rates_get_an_error_frame(client, loop_net_id, message):
+    with client.websocket_connect(f"/api/simulate/{loop_net_id}") as ws:
+        ws.receive_json()
+        ws.send_json(message)
+        reply = ws.receive_json()
+        assert reply["type"] == "error"
+        # The session stays usable and nothing was fired
+        ws.send_json({"action": "random", "steps": 1})
+        assert ws.receive_json()["step"] == 1
@@ -0,0 +1,80 @@
+import io
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from app.services import encoded_log
+from app.services.encoded_log import EncodedEventLog, sequence_groups
+from app.services.variant_service import VariantIndex
+
+# c1 and c3 share a variant; c2 and c4 contain the same activities in another order
+EVENTS = [
+    ("c1", "a", "2024-01-01 08:00"), ("c1", "b", "2024-01-01 09:00"),
+    ("c2", "b", "2024-01-01 08:00"), ("c2", "a", "2024-01-01 10:00"),
+    ("c3", "a", "2024-01-02 08:00"), ("c3", "b", "2024-01-02 12:00"),
+    ("c4", "b", "2024-01-02 08:00"), ("c4", "a", "2024-01-02 09:00"), ("c4", "a", "2024-01-02 10:00"),
+]
+
+
+@pytest.fixture
+def log():
+    df = pd.DataFrame(EVENTS, columns=["case", "activity", "time"])
+    return EncodedEventLog.from_frame(df, "case", "activity", "time")
+
+
+def _exact_groups(codes, starts, ends):
+    ids = {}
+    return [ids.setdefault(codes[s:e].tobytes(), len(ids)) for s, e in zip(starts, ends)]
+
+
+def test_variants_in_first_occurrence_order(log):
+    index = VariantIndex(log)
+    assert len(index) == 3
+    assert index.case_variant.tolist() == [0, 1, 0, 2]
+    assert index.counts.tolist() == [2, 1, 1]
+    assert index.lengths.tolist() == [2, 2, 3]
+    assert index.variant_of(["b", "a", "a"]) == 2
+    # c1 takes one hour and c3 four
+    assert index.mean_durations[0] == 2.5 * 3600
+
+
+def test_sequence_groups_match_exact_grouping():
+    rng = np.random.default_rng(7)
+    lengths = rng.integers(1, 6, size=2000)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    codes = rng.integers(0, 3, size=int(ends[-1])).astype(np.int32)
+
+    groups, first = sequence_groups(codes, starts, ends)
+    assert groups.tolist() == _exact_groups(codes, starts, ends)
+    assert (groups[first] == np.arange(len(first))).all()
+
+
+def test_sequence_groups_survive_hash_collisions(monkeypatch):
+    # Every slice of the same length hashes alike, so the check must catch it
+    monkeypatch.setattr(encoded_log, "_mix", lambda values: values * np.uint64(0))
+    codes = np.array([0, 1, 1, 0, 0, 1, 2], dtype=np.int32)
+    starts, ends = np.array([0, 2, 4, 6]), np.array([2, 4, 6, 7])
+    groups, first = sequence_groups(codes, starts, ends)
+    assert groups.tolist() == [0, 1, 0, 2]
+    assert first.tolist() == [0, 1, 3]
+
+
+@pytest.mark.parametrize("params, status", [
+    ({"sort": "length", "order": "asc"}, 200),
+    ({"sort": "frequency"}, 400),
+    ({"order": "descending"}, 400),
+])
+def test_endpoint_validates_sort_and_order(client, params, status):
+    csv = pd.DataFrame(EVENTS, columns=["case", "activity", "time"]).to_csv(index=False).encode("utf-8")
+    config = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time"}
+    imported = client.post(
+        "/api/import-event-log",
+        files={"file": ("log.csv", io.BytesIO(csv), "text/csv")},
+        data={"config": json.dumps(config)}
+    ).json()
+
+    response = client.get(f"/api/variants/{imported['event_log_id']}", params=params)
+    assert response.status_code == status
+    if status == 200:
+        assert [v["length"] for v in response.json()["variants"]] == [2, 2, 3]
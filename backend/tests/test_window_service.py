@@ -0,0 +1,133 @@
+import asyncio
+import io
+import json
+import pandas as pd
+import pytest
+from app.services.encoded_log import EncodedEventLog
+from app.services.window_service import SlidingWindowDiscovery
+
+DAY = pd.Timedelta("1D")
+
+# c1 runs over days one and two, c2 over days two and three, c3 on day three
+EVENTS = [
+    ("c1", "a", "2024-01-01 08:00"), ("c1", "b", "2024-01-02 08:00"),
+    ("c2", "a", "2024-01-02 09:00"), ("c2", "b", "2024-01-02 10:00"), ("c2", "c", "2024-01-03 09:00"),
+    ("c3", "a", "2024-01-03 10:00"), ("c3", "c", "2024-01-03 11:00"),
+]
+
+
+@pytest.fixture
+def log():
+    df = pd.DataFrame(EVENTS, columns=["case", "activity", "time"])
+    return EncodedEventLog.from_frame(df, "case", "activity", "time")
+
+
+def _events(window_log):
+    """(case, activity) pairs of a window, in the log's event order"""
+    return [
+        (window_log.case_ids[case], window_log.activities[activity])
+        for case, activity in zip(window_log.case_codes, window_log.activity_codes)
+    ]
+
+
+def test_tumbling_windows_split_events_by_timestamp(log):
+    windows = list(SlidingWindowDiscovery(max_workers=1).windows(log, DAY, DAY))
+
+    # Windows start at the first event, not at midnight
+    first = pd.Timestamp("2024-01-01 08:00", tz="UTC").value
+    assert [(start, end) for start, end, _ in windows] == [
+        (first + i * DAY.value, first + (i + 1) * DAY.value) for i in range(3)
+    ]
+    assert [_events(w) for _, _, w in windows] == [
+        [("c1", "a")],
+        [("c1", "b"), ("c2", "a"), ("c2", "b")],
+        [("c2", "c"), ("c3", "a"), ("c3", "c")],
+    ]
+    assert sum(len(w) for _, _, w in windows) == len(log)
+
+
+def test_overlapping_windows_share_events(log):
+    windows = list(SlidingWindowDiscovery(max_workers=1).windows(log, 2 * DAY, DAY))
+
+    assert len(windows) == 3
+    assert [len(w) for _, _, w in windows] == [4, 6, 3]
+    # Every window keeps events grouped by case and ordered by time
+    for _, _, window_log in windows:
+        assert list(window_log.case_codes) == sorted(window_log.case_codes)
+
+
+def test_case_assignment_keeps_whole_cases(log):
+    windows = list(SlidingWindowDiscovery(max_workers=1).windows(log, DAY, DAY, assign="cases"))
+
+    assert [sorted(set(w.case_ids)) for _, _, w in windows] == [["c1"], ["c2"], ["c3"]]
+    assert [len(w) for _, _, w in windows] == [2, 3, 2]
+
+
+def test_windows_are_cut_lazily(log):
+    windows = SlidingWindowDiscovery(max_workers=1).windows(log, DAY, DAY)
+    _, _, window_log = next(windows)
+    assert len(window_log) == 1
+    assert len(list(windows)) == 2
+
+
+def test_empty_log_has_no_windows(log):
+    empty = log.take(log.case_codes < 0)
+    assert list(SlidingWindowDiscovery(max_workers=1).windows(empty, DAY, DAY)) == []
+
+
+@pytest.mark.parametrize("size, stride, assign", [
+    (DAY, pd.Timedelta(0), "events"),
+    (-DAY, DAY, "events"),
+    (pd.NaT, DAY, "events"),
+    (DAY, DAY, "traces"),
+    # More than MAX_WINDOWS windows over the log's two days
+    (DAY, pd.Timedelta("1s"), "events"),
+])
+def test_invalid_windows_are_rejected(log, size, stride, assign):
+    with pytest.raises(ValueError):
+        next(SlidingWindowDiscovery(max_workers=1).windows(log, size, stride, assign))
+
+
+def test_discover_summarizes_windows_and_diffs(log):
+    discovery = SlidingWindowDiscovery(max_workers=1)
+    settings = {"algorithm": "inductive", "noise_threshold": 0.0, "dependency_threshold": 0.5, "and_threshold": 0.65}
+    try:
+        result = asyncio.run(discovery.discover(log, DAY, DAY, settings))
+    finally:
+        discovery.pool.shutdown()
+
+    assert [w["index"] for w in result["windows"]] == [0, 1, 2]
+    assert [(d["from"], d["to"], d["available"]) for d in result["diffs"]] == [(0, 1, True), (1, 2, True)]
+    # b appears in the second window; c replaces it in the third
+    assert result["diffs"][0]["activities_added"] == ["b"]
+    assert result["diffs"][1]["activities_added"] == ["c"]
+    assert result["diffs"][1]["activities_removed"] == ["b"]
+
+
+@pytest.mark.parametrize("window", ["nan", "NaT", "soon"])
+def test_endpoint_rejects_invalid_window(client, window):
+    csv = pd.DataFrame(EVENTS, columns=["case", "activity", "time"]).to_csv(index=False).encode("utf-8")
+    config = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time"}
+    response = client.post(
+        "/api/discover-windows",
+        files={"file": ("log.csv", io.BytesIO(csv), "text/csv")},
+        data={"config": json.dumps(config), "window": window}
+    )
+    assert response.status_code == 400
+
+
+def test_endpoint_stores_window_nets_with_their_fingerprint(client):
+    csv = pd.DataFrame(EVENTS, columns=["case", "activity", "time"]).to_csv(index=False).encode("utf-8")
+    config = {"case_id_column": "case", "activity_column": "activity", "timestamp_column": "time"}
+    response = client.post(
+        "/api/discover-windows",
+        files={"file": ("log.csv", io.BytesIO(csv), "text/csv")},
+        data={"config": json.dumps(config), "window": "1D", "include_nets": "true"}
+    )
+    assert response.status_code == 200
+
+    for summary in response.json()["windows"]:
+        assert "canonical_order" not in summary
+        assert summary["petri_net"]["networkId"] == f"net_{summary['fingerprint'][:16]}"
+        stored = client.get(f"/api/fingerprint/{summary['petri_net_id']}").json()
+        assert stored["fingerprint"] == summary["fingerprint"]